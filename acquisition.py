@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Per source acquisition periods
+#  File : acquisition.py
+# ----------------------------------------------------------------------
+""" Acquisition plan ('acquisition_plan')
+
+    Period in seconds per input class and per channel, the others are read
+    every polling_time:
+
+      {'di': 1, 'ai': 5, '1w': 60}      digital every second, analog every 5 s, 1-Wire every minute
+      {'ai': 5, 'ai2': 10}              AI 2 every 10 s, the other analog inputs every 5 s
+
+    Periods divide store_time. The polling thread ticks at their greatest
+    common divisor and reads the sources due, the sample of a tick carries
+    the (section, id) read (Sample.read) - data rows and ced aggregates use
+    those channels only. Counters and outputs rows are written every
+    polling_time. 1-Wire conversions (750 ms per probe) run on their own
+    thread (OneWireReader), a slow or dead probe never delays the fast
+    reads - its sample has the time of the tick it was due.
+"""
+import sys
+import math
+import logging
+import threading
+from functools import reduce
+from collections import namedtuple
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# plan key -> section, channel ids
+CLASSES = {'di': 'digital', 'ai': 'analog', '1w': '1wire'}
+CHANNELS = {'ai': range(1, 5), '1w': range(1, 2)}
+
+# sources due at a tick - analog and one_wire channel ids, digital and base (counters, outputs) flags
+Due = namedtuple('Due', 'analog digital one_wire base')
+
+def check_plan(value):
+    """ None or a valid plan dictionary """
+    if value is None:
+        return True
+    if not isinstance(value, dict):
+        return False
+    keys = set(CLASSES) | {prefix + str(idx) for prefix, ids in CHANNELS.items() for idx in ids}
+    return all(key in keys and isinstance(period, int) and not isinstance(period, bool) and period > 0
+               for key, period in value.items())
+
+class AcquisitionPlan:
+    """ Periods of the enabled sources """
+
+    def __init__(self, conf, module):
+        """ Constructor - conf already checked """
+        plan = conf['acquisition_plan'] or {}
+        polling_time = conf['polling_time']
+        self.polling_time = polling_time
+        self.digital = plan.get('di', polling_time)
+        self.analog = {ain['id']: plan.get('ai' + str(ain['id']), plan.get('ai', polling_time)) for ain in module.analog_inputs}
+        self.one_wire = {owi['id']: plan.get('1w' + str(owi['id']), plan.get('1w', polling_time)) for owi in module.one_wire_inputs}
+
+        periods = [polling_time]
+        if conf['use_io']:
+            periods.append(self.digital)
+        if conf['use_ai']:
+            periods.extend(self.analog.values())
+        if conf['use_1w']:
+            periods.extend(self.one_wire.values())
+        self.tick = reduce(math.gcd, periods)
+
+    def due(self, ptime):
+        """ Sources to read at ptime (epoch seconds, a tick) """
+        return Due(tuple(idx for idx, period in self.analog.items() if ptime % period == 0),
+                   ptime % self.digital == 0,
+                   tuple(idx for idx, period in self.one_wire.items() if ptime % period == 0),
+                   ptime % self.polling_time == 0)
+
+    def describe(self):
+        """ Log line """
+        return 'tick %s s, digital %s s, analog %s, 1-Wire %s' % (self.tick, self.digital, self.analog, self.one_wire)
+
+def read_set(module, due):
+    """ (section, id) written for the sources of a tick (Sample.read) """
+    conf = module.conf
+    read = set()
+    if conf['use_ai']:
+        read.update(('analog', idx) for idx in due.analog)
+    if conf['use_io'] and (due.digital or due.base):
+        read.update(('digital', din['id']) for din in module.digital_inputs)
+    if due.base:
+        if conf['use_pc']:
+            read.update(('counters', din['id']) for din in module.digital_inputs)
+        if conf['use_ro']:
+            read.update(('relay', rel['id']) for rel in module.relay_outputs)
+        if conf['use_oc']:
+            read.update(('open collector', opc['id']) for opc in module.open_collector_outputs)
+    return frozenset(read)
+
+class OneWireReader:
+    """ 1-Wire conversions on their own thread, one at a time """
+
+    def __init__(self, module, done):
+        """ Constructor - done(sample) gets the sample of every read """
+        self.module = module
+        self.done = done
+        self.lock = threading.Lock()
+        self.thread = None
+        self.skipped = 0
+
+    def request(self, ids, date_time):
+        """ Read the channels ids for the tick date_time, skipped while the previous read runs """
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                self.skipped += 1
+                logging.warning("1-Wire read still running, %s skipped (%s so far)", date_time.strftime('%H:%M:%S'), self.skipped)
+                return
+            self.thread = threading.Thread(target=self._read, args=[ids, date_time], daemon=True)
+            self.thread.start()
+
+    def _read(self, ids, date_time):
+        """ Reader thread """
+        try:
+            module = self.module
+            module.get_one_wire_input(ids)
+            self.done(module.take_sample(date_time, read=frozenset(('1wire', idx) for idx in ids)))
+        except Exception as ex:
+            logging.error("An exception was encountered in OneWireReader _read: %s", str(ex))
+
+    def join(self, timeout=None):
+        """ Wait for the read running """
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Adaptive polling interval
+#  File : adaptive.py
+# ----------------------------------------------------------------------
+""" Adaptive polling ('adaptive_polling' : True)
+
+    The polling thread ticks every 'adaptive_fast' seconds and polls when
+    the current interval says so. After every polling the interval is
+
+      adaptive_fast   alarm_cur not zero, or an analog / 1-Wire value moving
+                      faster than 'adaptive_rate_ai' / 'adaptive_rate_1w'
+                      (units per minute) since the previous polling
+      doubled         otherwise, up to 'adaptive_slow'
+
+    An alarm raised by an edge polls at the next tick. Intervals are
+    multiples of adaptive_fast dividing store_time, pollings stay on the
+    same boundaries as with a fixed polling_time.
+
+    Sample.period carries the interval, the data files get a polling line
+    when it changes ('# polling', date, seconds). The hourly ced figures
+    weight every value by the time to the next one, whatever the interval.
+"""
+import sys
+import math
+import logging
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+class AdaptivePolling:
+    """ Polling interval from the alarm and signal activity """
+
+    def __init__(self, conf):
+        """ Constructor - conf already checked """
+        fast = conf['adaptive_fast']
+        slow = conf['adaptive_slow']
+        # intervals on the store_time boundaries
+        self.ladder = [period for period in range(fast, slow + 1, fast) if conf['store_time'] % period == 0]
+        self.fast = fast
+        self.interval = slow
+        self.rates = {'analog': conf['adaptive_rate_ai'] / 60.0, '1wire': conf['adaptive_rate_1w'] / 60.0}
+        self.last = {}      # (section, id) -> value of the previous polling
+        self.last_at = None # time.monotonic() of the previous polling
+
+    def due(self, ptime, alarm):
+        """ Poll at this tick (ptime epoch seconds) """
+        if alarm and self.interval != self.fast:
+            return True
+        return ptime % self.interval == 0
+
+    def _moving(self, module, now):
+        """ A value moved faster than its rate since the previous polling """
+        moving = False
+        elapsed = now - self.last_at if self.last_at is not None else None
+        for section, channels in (('analog', module.analog_inputs), ('1wire', module.one_wire_inputs)):
+            if not module.conf['use_ai' if section == 'analog' else 'use_1w']:
+                continue
+            for chn in channels:
+                value = chn['value']
+                if value is None or (isinstance(value, float) and math.isnan(value)):
+                    continue
+                old = self.last.get((section, chn['id']))
+                if old is not None and elapsed and abs(value - old) / elapsed > self.rates[section]:
+                    moving = True
+                self.last[(section, chn['id'])] = value
+        self.last_at = now
+        return moving
+
+    def update(self, module, now):
+        """ Interval after a polling (now time.monotonic()), the new interval """
+        moving = self._moving(module, now)
+        if module.alarm_cur or moving:
+            interval = self.fast
+        else:
+            # relax, smallest interval at least twice the current one
+            interval = next((period for period in self.ladder if period >= 2 * self.interval), self.ladder[-1])
+        if interval != self.interval:
+            logging.info("Polling every %s s (alarm %s, moving %s)", interval, module.alarm_cur, moving)
+            self.interval = interval
+        return interval
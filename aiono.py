@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : asyncio facade of the Iono driver
+#  File : aiono.py
+# ----------------------------------------------------------------------
+""" asyncio facade of the Iono driver
+
+    For services embedding the acquisition in their own event loop (web
+    app, gateway), instead of the pydas.py polling thread.
+
+      aio = AsyncIono(IonoW1(settings), workers=4)
+      values = await aio.read_analog()       # (AI 1, AI 2)
+      statuses = await aio.read_digital()    # (DI 1, ... DI 6)
+      temps = await aio.read_one_wire()      # sensors read in parallel
+      sample = await aio.read_all()          # iono_w1.Sample, all sources overlapped
+      await aio.set_relay(1, True)
+      async for edge in aio.edges():         # Edge(id, name, status, time, monotonic)
+          ...
+      aio.close()
+
+    Blocking hardware access (spi, gpio, w1 sysfs) runs in a bounded thread
+    pool, the loop never waits on it. Edges come from the listener interface
+    (on_edge, IonoW1 parse_event) and are moved to the loop thread, each
+    edges() iterator has its own bounded queue - a slow consumer loses its
+    oldest edges, never the GPIO thread.
+"""
+import sys
+import asyncio
+import logging
+import functools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# time datetime of the notification, monotonic the (kernel) edge timestamp
+Edge = namedtuple('Edge', 'id name status time monotonic')
+
+class AsyncIono:
+    """ Awaitable reads and setters, async iterator of edges """
+
+    def __init__(self, module, workers=4, loop=None):
+        """ Constructor - call from the event loop """
+        logging.debug("Function AsyncIono __init__")
+        self.module = module
+        self.loop = loop or asyncio.get_running_loop()
+        # bounded, at most workers blocking calls at once
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='aiono')
+        self.subscribers = [] # edges() queues, loop thread only
+        module.listeners.append(self)
+
+    def close(self):
+        """ Stop the edges and the worker threads """
+        logging.debug("Function AsyncIono close")
+        if self in self.module.listeners:
+            self.module.listeners.remove(self)
+        self.executor.shutdown(wait=False)
+
+    def _run(self, func, *args):
+        """ Blocking call in the pool """
+        return self.loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    # listener interface (polling, GPIO and alarm threads)
+
+    def on_poll(self, module):
+        """ Nothing to do, reads are awaited """
+
+    def on_alarm(self, alarm_cur, alarm_old):
+        """ Nothing to do """
+
+    def on_edge(self, din, now):
+        """ New edge, handed over to the loop thread """
+        edge = Edge(din['id'], din['name'], din['status_ev'], now, din['last_edge'])
+        try:
+            self.loop.call_soon_threadsafe(self._dispatch, edge)
+        except RuntimeError:
+            # loop closed
+            pass
+
+    def _dispatch(self, edge):
+        """ Queue an edge for every iterator (loop thread) """
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                logging.warning("AsyncIono edge queue full, oldest edge dropped")
+            queue.put_nowait(edge)
+
+    async def edges(self, maxsize=256):
+        """ Async iterator of the input edges from now on """
+        queue = asyncio.Queue(maxsize)
+        self.subscribers.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.subscribers.remove(queue)
+
+    # reads
+
+    async def read_analog(self):
+        """ Analog input values """
+        await self._run(self.module.get_analog_input)
+        return tuple(ain['value'] for ain in self.module.analog_inputs)
+
+    async def read_digital(self):
+        """ Digital input statuses """
+        await self._run(self.module.get_digital_input)
+        return tuple(din['status'] for din in self.module.digital_inputs)
+
+    async def read_one_wire(self):
+        """ 1-Wire values, every sensor read at the same time """
+        module = self.module
+        try:
+            # background bus probe still running
+            if module.probe_thread is not None:
+                await self._run(module.probe_thread.join)
+                module.probe_thread = None
+
+            # a conversion takes up to 750 ms, sensors overlap
+            values = await asyncio.gather(*(self._run(module._read_one_wire, owi) # pylint: disable=protected-access
+                                            for owi in module.one_wire_inputs))
+            for owi, value in zip(module.one_wire_inputs, values):
+                owi['value'] = value
+
+        except Exception as ex:
+            logging.critical("An exception was encountered in AsyncIono read_one_wire: %s", str(ex))
+
+        return tuple(owi['value'] for owi in module.one_wire_inputs)
+
+    async def read_all(self, store=False):
+        """ Enabled sources read at once, Sample of the acquisition """
+        conf = self.module.conf
+        reads = []
+        if conf['use_ai']:
+            reads.append(self.read_analog())
+        if conf['use_io']:
+            reads.append(self.read_digital())
+        if conf['use_1w']:
+            reads.append(self.read_one_wire())
+        await asyncio.gather(*reads)
+        return self.module.take_sample(store=store)
+
+    # setters
+
+    async def set_relay(self, channel, status):
+        """ Relay output on/off """
+        await self._run(self.module.set_relay_status, channel, status)
+
+    async def set_open_collector(self, channel, status):
+        """ Open collector output on/off """
+        await self._run(self.module.set_open_collector_status, channel, status)
+
+    async def set_led(self, status):
+        """ On board led on/off """
+        await self._run(self.module.set_led_status, status)
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Rebuild hourly ced files from raw daily files
+#  File : backfill.py
+# ----------------------------------------------------------------------
+""" Rebuild hourly ced files (store_ced_data_csv) from data/<header>_YYYY-MM-DD.dat
+
+    python3 backfill.py 2026-01-01 2026-12-31 [--force] [--workers 4]
+
+    One worker process per day, settings from config.py. For every
+    store_time window the samples of the first 1-Wire input (use_1w) and
+    of the first acquired analog input (use_ai, ai_channels) are
+    aggregated like store_ced_data_csv: same dbid, values kept
+    (functions.ced_value) and time weights (functions.window_weights), row
+    time one hour before the store boundary, hourly file named after the
+    boundary. A day job rebuilds the windows stored that day, the last one
+    of the day before included, up to the last store boundary passed (the
+    window in progress is the running pydas one). Raw files hold values rounded to 2
+    decimals, so rebuilt means can differ in the last digit from the ones
+    computed live, and nan readings are left out (that is what a rebuild
+    is for).
+
+    By default only hourly files missing from ftp/ and ftp_back/, or with a
+    nan row, are written; --force rewrites every file of the range.
+"""
+import sys
+import os
+import logging
+import argparse
+import calendar
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+# custom
+from functions import window_weights, ced_value, unix_time
+from iono import Iono
+from settings import load_settings
+from serializers import FORMATS, TsvSerializer
+import reader
+import rtsched
+
+BASE_PATH = os.path.dirname(os.path.realpath(__file__))
+
+def _hour_file(conf, folder, stored):
+    """ Hourly file name, named after the hour it is stored """
+    return os.path.join(folder, conf['file_header']+"_"+stored.strftime('%Y-%m-%d-%H')+".dat")
+
+def _needs_backfill(conf, stored, back_path):
+    """ Missing or nan/empty hourly file """
+    for folder in (conf['ftp_path'], back_path):
+        file_name = _hour_file(conf, folder, stored)
+        if os.path.exists(file_name):
+            with open(file_name, 'r') as file:
+                content = file.read()
+            return not content.strip() or 'nan' in content
+    return True
+
+def backfill_day(job):
+    """ Rebuild the hourly files of one day (worker process), return files written """
+    conf, day, back_path, force = job
+    extension = FORMATS[conf['data_format']].extension
+    file_names = [os.path.join(conf['data_path'], conf['file_header']+"_"+when.strftime('%Y-%m-%d')+extension)
+                  for when in (day - timedelta(days=1), day)]
+    file_names = [file_name for file_name in file_names if os.path.exists(file_name)]
+    if not file_names:
+        return 0
+
+    # the channels of a running IonoW1, rows built by its ftp serializer
+    channels = SimpleNamespace(analog_inputs=Iono.acquired_analog_inputs(conf), digital_inputs=Iono.digital_inputs,
+                               one_wire_inputs=Iono.one_wire_inputs, relay_outputs=Iono.relay_outputs,
+                               open_collector_outputs=Iono.open_collector_outputs)
+    serializer = TsvSerializer().compile(channels)
+
+    # series rebuilt, in the store_ced_data_csv order
+    data = reader.read_data(file_names, dense=True)
+    series = []
+    if conf['use_1w']:
+        owi = channels.one_wire_inputs[0]
+        series.append((('1wire', owi['id']), owi['dbid']))
+    if conf['use_ai']:
+        ain = channels.analog_inputs[0]
+        series.append((('analog', ain['id']), ain['dbid']))
+
+    # store windows whose boundary falls in the day, same epoch as reader (local time taken as utc),
+    # closed ones only - the window in progress is left to the running pydas
+    store_time = conf['store_time']
+    midnight = calendar.timegm(day.timetuple())
+    first = -(-midnight // store_time) * store_time
+    last = min(midnight + 86400, unix_time(datetime.now()) + 1)
+    files = {} # hourly file -> (store datetime, rows)
+    for boundary in range(first, last, store_time):
+        stored = datetime.utcfromtimestamp(boundary)
+        rows = files.setdefault(stored.strftime('%Y-%m-%d-%H'), (stored, []))[1]
+        for key, dbid in series:
+            if key not in data:
+                continue
+            times = data[key]['time']
+            inside = (times >= boundary - store_time) & (times < boundary)
+            # values kept live, nan readings out
+            kept_times = []
+            values = []
+            for acquired_at, value in zip(times[inside].tolist(), data[key]['value'][inside].tolist()):
+                value = None if np.isnan(value) else ced_value(value)
+                if value is not None:
+                    kept_times.append(acquired_at)
+                    values.append(value)
+            if not values:
+                logging.warning("%s %s: no samples, skipped", stored.strftime('%Y-%m-%d %H:%M'), key)
+                continue
+            rows.append(serializer.ced_row((stored - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:00'), dbid, values, 2,
+                                           window_weights(kept_times, boundary, store_time)))
+
+    written = 0
+    for stored, rows in files.values():
+        if not rows or (not force and not _needs_backfill(conf, stored, back_path)):
+            continue
+        with open(_hour_file(conf, conf['ftp_path'], stored), 'w') as file:
+            file.write(''.join(rows))
+        written += 1
+    return written
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description='Rebuild pydas hourly ced files from raw daily files')
+    parser.add_argument('date_from', help='first day YYYY-MM-DD')
+    parser.add_argument('date_to', help='last day YYYY-MM-DD')
+    parser.add_argument('--data', default=os.path.join(BASE_PATH, 'data'), help='raw daily files folder')
+    parser.add_argument('--ftp', default=os.path.join(BASE_PATH, 'ftp'), help='hourly files output folder')
+    parser.add_argument('--ftp-back', default=os.path.join(BASE_PATH, 'ftp_back'), help='already uploaded hourly files')
+    parser.add_argument('--force', action='store_true', help='rewrite every hour of the range')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s: %(message)s')
+
+    # validated, with the defaults of the keys an older config.py lacks
+    conf = load_settings(os.path.join(BASE_PATH, 'config.py')).main
+    conf['data_path'] = args.data
+    conf['ftp_path'] = args.ftp
+    os.makedirs(args.ftp, exist_ok=True)
+
+    date_from = datetime.strptime(args.date_from, '%Y-%m-%d')
+    date_to = datetime.strptime(args.date_to, '%Y-%m-%d')
+    days = [date_from + timedelta(days=idx) for idx in range((date_to - date_from).days + 1)]
+    jobs = [(conf, day, args.ftp_back, args.force) for day in days]
+
+    # a running pydas goes first, the workers inherit it
+    rtsched.idle_priority()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        written = sum(pool.map(backfill_day, jobs))
+    logging.info("Done: %s days, %s hourly files written to %s", len(days), written, args.ftp)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Micro benchmarks of the polling hot paths
+#  File : bench_pydas.py
+# ----------------------------------------------------------------------
+""" Hot path benchmark
+
+    Runs on any linux box: RPi.GPIO, spidev and the 1-Wire sysfs tree are
+    faked (see bench_stubs.py), files are written to a temporary folder.
+
+    python3 bench_pydas.py [--filter store] [--repeat 5]
+    python3 bench_pydas.py --baseline [--threshold 0.25]   compare with bench_baseline.json
+    python3 bench_pydas.py --save                          write the baseline
+
+    Every benchmark is timed --repeat times, in turns with a fixed pure
+    python workload (reference). The best time per call divided by the
+    best reference time gives reference units, comparable across boxes.
+    With --baseline, units above the baseline ones * (1 + threshold) are a
+    regression and the exit code is 1. File writes also depend on the
+    disk, save a baseline on the box you compare on for those.
+
+    Save the baseline again in the change that alters what a benchmark
+    measures.
+"""
+import sys
+import os
+import json
+import time
+import timeit
+import shutil
+import logging
+import argparse
+import platform
+from datetime import datetime
+
+import bench_stubs
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'bench_baseline.json')
+
+# samples per store window: 3600 / 30s polling and 3600 / 1s polling
+SAMPLES = (120, 3600)
+
+# edges per burst (parse_event/store_event)
+BURST = 100
+
+def reference():
+    """ Fixed pure python workload, the unit of the comparisons """
+    row = ''
+    for idx in range(200):
+        row += '%s\t%.2f\n' % (idx, idx / 3.0)
+    return len(row)
+
+def build_module():
+    """ IonoW1 on fake hardware, all inputs enabled """
+    bench_stubs.install()
+    from iono import Iono # pylint: disable=import-outside-toplevel
+    from iono_w1 import IonoW1 # pylint: disable=import-outside-toplevel
+    Iono.one_wire_base_dir = bench_stubs.w1_tree()
+
+    conf = bench_stubs.bench_conf(use_ai=True, use_1w=True)
+    conf['use_io'] = True
+    conf['use_ev'] = True
+    conf['use_pc'] = True
+    module = IonoW1(conf)
+
+    # no http alarms from here
+    module._start_alarm = lambda code: None # pylint: disable=protected-access
+
+    # one polling worth of values
+    module.get_digital_input()
+    module.get_analog_input()
+    module.get_one_wire_input()
+    return module
+
+def benchmarks(module):
+    """ Name -> (callable, calls per run) """
+    import functions # pylint: disable=import-outside-toplevel
+    owi = module.one_wire_inputs[0]
+    din = module.digital_inputs[0]
+    din['hold'] = 0.0
+    samples = {count: [20.0 + (idx % 50) / 10.0 for idx in range(count)] for count in SAMPLES}
+    now = datetime(2026, 10, 19, 12, 30, 15)
+    clock = [time.monotonic()]
+
+    def store_ced_data_csv():
+        # the store resets the arrays
+        module.data_temperature1 = list(samples[SAMPLES[0]])
+        module.data_analogic1 = list(samples[SAMPLES[0]])
+        module.store_ced_data_csv()
+
+    bursts = module.bursts
+
+    def edge_burst():
+        # debounce, reverse, parse_event, pulse counter, store_event - one row per edge
+        module.bursts = {}
+        for _ in range(BURST):
+            clock[0] += 0.001
+            module._io_event(din, 1 - din['status_ev'], clock[0]) # pylint: disable=protected-access
+
+    def edge_coalesced():
+        # chattering input, edges counted in the burst summary
+        module.bursts = bursts
+        for _ in range(BURST):
+            clock[0] += 0.001
+            module._io_event(din, 1 - din['status_ev'], clock[0]) # pylint: disable=protected-access
+
+    def store_event_burst():
+        for _ in range(BURST):
+            module.store_event(din)
+
+
+    sample = module.take_sample()
+
+    table = {
+        'take_sample': (module.take_sample, 1), # the polling thread hand over
+        'store_data_csv': (lambda: module.store_data_csv([sample]), 1),
+        'store_ced_data_csv': (store_ced_data_csv, 1),
+        'analyze_alarm': (lambda: module.analyze_alarm(sample), 1), # polling reconciliation, no input changed
+        'parse_event_burst': (edge_burst, BURST),
+        'parse_event_coalesced': (edge_coalesced, BURST),
+        'store_event_burst': (store_event_burst, BURST),
+        'read_temp': (lambda: module._read_temp(owi['code']), 1), # pylint: disable=protected-access
+        'unix_time': (lambda: functions.unix_time(now), 1),
+    }
+    for count, lst in samples.items():
+        table['mean_%s' % count] = ((lambda lst=lst: module._mean(lst)), 1) # pylint: disable=protected-access
+        table['stddev_%s' % count] = ((lambda lst=lst: module._stddev(lst)), 1) # pylint: disable=protected-access
+    return table
+
+def measure(func, calls, repeat):
+    """ Best time per call and best reference time (microseconds), timed in turns """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    ref_timer = timeit.Timer(reference)
+    ref_number, _ = ref_timer.autorange()
+    best = ref_best = float('inf')
+    for _ in range(repeat):
+        ref_best = min(ref_best, ref_timer.timeit(ref_number))
+        best = min(best, timer.timeit(number))
+    return best / number / calls * 1e6, ref_best / ref_number * 1e6
+
+def load_baseline(path):
+    """ Load the baseline results {name: reference units} """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as file:
+        baseline = json.load(file)
+    if 'units' not in baseline:
+        # absolute times of one box, nothing to compare with
+        print("Baseline %s has no reference units, save it again" % path)
+        return {}
+    return baseline['units']
+
+def save_baseline(path, units):
+    """ Save the results as baseline """
+    baseline = {
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'python': platform.python_version(),
+        'units': units,
+    }
+    with open(path, 'w') as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description='pydas hot path benchmark')
+    parser.add_argument('--filter', default='', help='run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown (0.25 = 25%%)')
+    parser.add_argument('--baseline', nargs='?', const=BASELINE_FILE, help='compare with a baseline json file (bench_baseline.json)')
+    parser.add_argument('--save', action='store_true', help='save the results as baseline')
+    args = parser.parse_args()
+
+    # as on the station, only warnings and errors
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s-%(levelname)s: %(message)s')
+
+    module = build_module()
+    # compared on demand only, a baseline from another box is a hint
+    path = args.baseline or BASELINE_FILE
+    baseline = load_baseline(path) if args.baseline or args.save else {}
+    units = {}
+    regressions = []
+    try:
+        print("%-22s %12s %12s %10s %10s %8s" % ('benchmark', 'usec/call', 'reference', 'units', 'baseline', 'ratio'))
+        for name, (func, calls) in benchmarks(module).items():
+            if args.filter not in name:
+                continue
+            # reference timed in turns with every benchmark, it sees the same cpu speed
+            usec, reference_usec = measure(func, calls, args.repeat)
+            units[name] = round(usec / reference_usec, 4)
+            base = baseline.get(name)
+            if base:
+                ratio = units[name] / base
+                flag = ''
+                if ratio > 1 + args.threshold:
+                    flag = '  REGRESSION'
+                    regressions.append(name)
+                print("%-22s %12.3f %12.3f %10.4f %10.4f %8.2f%s" % (name, usec, reference_usec, units[name], base, ratio, flag))
+            else:
+                print("%-22s %12.3f %12.3f %10.4f %10s %8s" % (name, usec, reference_usec, units[name], '-', '-'))
+    finally:
+        module.cleanup()
+        shutil.rmtree(os.path.dirname(module.conf['data_path']), ignore_errors=True)
+        shutil.rmtree(module.one_wire_base_dir, ignore_errors=True)
+
+    if args.save:
+        # keep the benchmarks not run this time
+        merged = dict(baseline)
+        merged.update(units)
+        save_baseline(path, merged)
+        print("Baseline saved to %s" % path)
+        return 0
+
+    if regressions:
+        print("%s regression(s) over %.0f%%: %s" % (len(regressions), args.threshold * 100, ', '.join(regressions)))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
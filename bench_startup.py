@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Import time and startup benchmark
+#  File : bench_startup.py
+# ----------------------------------------------------------------------
+""" Startup benchmark
+
+    Every run is a fresh python process:
+      import   -> time to import pydas (and everything it pulls in)
+      init     -> time to build the IonoW1 object
+      poll     -> time of the first polling
+      total    -> interpreter start to first polling stored
+
+    python3 bench_startup.py [--runs 5] [--stubs] [--importtime]
+
+    --stubs       use fake RPi.GPIO/spidev (see bench_stubs.py) on a non Pi box
+    --importtime  also show the slowest modules (python -X importtime)
+"""
+import sys
+import os
+import json
+import argparse
+import subprocess
+import statistics
+
+# code run by each child process
+CHILD = r'''
+import sys, time, json, os
+t_start = time.perf_counter()
+sys.path.insert(0, {path!r})
+if {stubs!r}:
+    import bench_stubs
+    bench_stubs.install()
+t0 = time.perf_counter()
+import pydas
+t1 = time.perf_counter()
+import bench_stubs
+conf = bench_stubs.bench_conf(use_ai={stubs!r}, use_1w=True)
+if {stubs!r}:
+    from iono import Iono
+    Iono.one_wire_base_dir = bench_stubs.w1_tree()
+module = pydas.IonoW1(conf)
+t2 = time.perf_counter()
+pydas.poll(module, conf)
+t3 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'init': t2 - t1, 'poll': t3 - t2, 'total': t3 - t_start}}))
+'''
+
+def run_child(stubs):
+    """ Run one startup in a fresh interpreter """
+    path = os.path.dirname(os.path.realpath(__file__))
+    code = CHILD.format(path=path, stubs=stubs)
+    out = subprocess.run([sys.executable, '-c', code], check=True,
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return json.loads(out.stdout.decode().strip().splitlines()[-1])
+
+def import_time(stubs, top=15):
+    """ Show the slowest imports (cumulative) """
+    path = os.path.dirname(os.path.realpath(__file__))
+    code = "import sys; sys.path.insert(0, %r)\n" % path
+    if stubs:
+        code += "import bench_stubs; bench_stubs.install()\n"
+    code += "import pydas\n"
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], check=True,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    rows = []
+    for line in out.stderr.decode().splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # import time:  self [us] | cumulative | imported package
+        self_us, cumul_us, name = [item.strip() for item in line[len('import time:'):].split('|')]
+        rows.append((int(cumul_us), int(self_us), name))
+    rows.sort(reverse=True)
+    print("%10s %10s  module" % ('cumul[ms]', 'self[ms]'))
+    for cumul_us, self_us, name in rows[:top]:
+        print("%10.1f %10.1f  %s" % (cumul_us / 1000, self_us / 1000, name))
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description='pydas startup benchmark')
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes to start')
+    parser.add_argument('--stubs', action='store_true', help='use fake hardware modules')
+    parser.add_argument('--importtime', action='store_true', help='show slowest imports')
+    args = parser.parse_args()
+
+    results = [run_child(args.stubs) for _ in range(args.runs)]
+    print("%-8s %10s %10s %10s" % ('phase', 'median[ms]', 'min[ms]', 'max[ms]'))
+    for phase in ('import', 'init', 'poll', 'total'):
+        values = [res[phase] * 1000 for res in results]
+        print("%-8s %10.1f %10.1f %10.1f" % (phase, statistics.median(values), min(values), max(values)))
+
+    if args.importtime:
+        print()
+        import_time(args.stubs)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+# pylint: disable=line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Hardware stubs for benchmarks on any linux box
+#  File : bench_stubs.py
+# ----------------------------------------------------------------------
+""" Hardware stubs
+
+    install() registers fake RPi.GPIO and spidev modules, so pydas can run
+    without an Iono Pi. Nothing here is used by the station itself.
+
+    w1_tree() builds a fake /sys/bus/w1/devices tree with DS18B20 sensors
+
+    FakeGpioChip stands in for /dev/gpiochipN (Iono.gpiochip_ioctl = fake.ioctl)
+
+    FakeMqttLink stands in for the mqtt broker (MqttPublisher(conf, link=fake))
+"""
+import sys
+import os
+import types
+import struct
+import tempfile
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+def _fake_gpio():
+    """ Build a fake RPi.GPIO module """
+    gpio = types.ModuleType('RPi.GPIO')
+    gpio.BCM = 11
+    gpio.IN = 1
+    gpio.OUT = 0
+    gpio.RISING = 31
+    gpio.FALLING = 32
+    gpio.BOTH = 33
+    gpio.PUD_DOWN = 21
+    gpio.PUD_UP = 22
+    gpio.levels = {}
+    gpio.callbacks = {}
+
+    def setup(channel, mode, **kwargs): # pylint: disable=unused-argument
+        gpio.levels.setdefault(channel, 0)
+
+    def input(channel): # pylint: disable=redefined-builtin
+        return gpio.levels.get(channel, 0)
+
+    def output(channel, value):
+        gpio.levels[channel] = int(bool(value))
+
+    def add_event_detect(channel, edge, callback=None, bouncetime=None): # pylint: disable=unused-argument
+        gpio.callbacks[channel] = callback
+
+    def remove_event_detect(channel):
+        gpio.callbacks.pop(channel, None)
+
+    def fire(channel, level):
+        """ Simulate an edge on channel """
+        gpio.levels[channel] = level
+        callback = gpio.callbacks.get(channel)
+        if callback:
+            callback(channel)
+
+    gpio.setmode = lambda mode: None
+    gpio.setwarnings = lambda flag: None
+    gpio.cleanup = lambda *args: None
+    gpio.setup = setup
+    gpio.input = input
+    gpio.output = output
+    gpio.add_event_detect = add_event_detect
+    gpio.remove_event_detect = remove_event_detect
+    gpio.fire = fire
+    return gpio
+
+def _fake_spidev():
+    """ Build a fake spidev module """
+    spidev = types.ModuleType('spidev')
+
+    class SpiDev:
+        """ Fake spi device - every channel reads adc code 2000 """
+        max_speed_hz = 0
+        mode = 0
+
+        def open(self, bus, device):
+            """ Open """
+
+        def xfer2(self, data): # pylint: disable=unused-argument
+            """ Transfer """
+            return [0, 0x07, 0xd0]
+
+        def close(self):
+            """ Close """
+
+    spidev.SpiDev = SpiDev
+    return spidev
+
+def install():
+    """ Register fake hardware modules, return the fake RPi.GPIO """
+    if 'RPi.GPIO' in sys.modules and hasattr(sys.modules['RPi.GPIO'], 'fire'):
+        return sys.modules['RPi.GPIO']
+    gpio = _fake_gpio()
+    rpi = types.ModuleType('RPi')
+    rpi.GPIO = gpio
+    sys.modules['RPi'] = rpi
+    sys.modules['RPi.GPIO'] = gpio
+    sys.modules['spidev'] = _fake_spidev()
+    return gpio
+
+def w1_tree(sensors=1, base_dir=None):
+    """ Build a fake 1-Wire sysfs tree, return its path (with trailing slash) """
+    base_dir = base_dir or tempfile.mkdtemp(prefix='w1_')
+    for idx in range(sensors):
+        folder = os.path.join(base_dir, '28-%012x' % (idx + 1))
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, 'w1_slave'), 'w') as file:
+            file.write("72 01 4b 46 7f ff 0e 10 57 : crc=57 YES\n")
+            file.write("72 01 4b 46 7f ff 0e 10 57 t=23125\n")
+    return base_dir + '/'
+
+def bench_conf(use_ai=True, use_1w=True, base_dir=None):
+    """ Build a pydas configuration writing into a temporary folder """
+    import config # pylint: disable=import-outside-toplevel
+    conf = dict(config.main)
+    base_dir = base_dir or tempfile.mkdtemp(prefix='pydas_')
+    conf['data_path'] = os.path.join(base_dir, 'data')
+    conf['ftp_path'] = os.path.join(base_dir, 'ftp')
+    os.makedirs(conf['data_path'], exist_ok=True)
+    os.makedirs(conf['ftp_path'], exist_ok=True)
+    conf['use_ai'] = use_ai
+    conf['use_1w'] = use_1w
+    conf['use_api'] = False
+    return conf
+
+class FakeGpioChip:
+    """ Fake gpio character device, pass fake.ioctl to gpiocdev.GpioChipInputs
+
+        The line request fd is a pipe, fire() writes kernel like events to it.
+        Use os.devnull as chip path.
+    """
+
+    def __init__(self):
+        """ Constructor """
+        self.levels = {}
+        self.offsets = []
+        self.seqno = 0
+        self.read_fd, self.write_fd = os.pipe()
+
+    def ioctl(self, fd, request, buf, mutate=True): # pylint: disable=unused-argument
+        """ fcntl.ioctl replacement """
+        import gpiocdev # pylint: disable=import-outside-toplevel
+        if request == gpiocdev.GPIO_V2_GET_LINE_IOCTL:
+            fields = gpiocdev.LINE_REQUEST.unpack(buf)
+            num_lines = fields[-8]
+            self.offsets = list(fields[:num_lines])
+            struct.pack_into('<i', buf, gpiocdev.LINE_REQUEST.size - 4, self.read_fd)
+        elif request == gpiocdev.GPIO_V2_LINE_GET_VALUES_IOCTL:
+            _, mask = gpiocdev.LINE_VALUES.unpack(buf)
+            bits = 0
+            for idx, gpio in enumerate(self.offsets):
+                if mask & (1 << idx) and self.levels.get(gpio, 0):
+                    bits |= 1 << idx
+            gpiocdev.LINE_VALUES.pack_into(buf, 0, bits, mask)
+        return 0
+
+    def fire(self, edges):
+        """ Write [(gpio, level, timestamp seconds)] events in one go """
+        import gpiocdev # pylint: disable=import-outside-toplevel
+        data = b''
+        for gpio, level, timestamp in edges:
+            self.levels[gpio] = level
+            self.seqno += 1
+            event_id = gpiocdev.GPIO_V2_LINE_EVENT_RISING_EDGE if level else gpiocdev.GPIO_V2_LINE_EVENT_FALLING_EDGE
+            data += gpiocdev.LINE_EVENT.pack(int(timestamp * 1e9), event_id, gpio, self.seqno, self.seqno)
+        os.write(self.write_fd, data)
+
+class FakeMqttLink:
+    """ Fake broker link, acknowledges while online """
+
+    def __init__(self, online=True):
+        """ Constructor """
+        self.online = online
+        self.acks = None    # acknowledgements left before the ack waits time out, None no limit
+        self.published = [] # (topic, payload, retain) acknowledged
+
+    def is_connected(self):
+        """ Broker reachable """
+        return self.online
+
+    def publish(self, topic, payload, retain=False):
+        """ Publish with qos 1, return True when acknowledged """
+        if not self.online or self.acks == 0:
+            return False
+        if self.acks is not None:
+            self.acks -= 1
+        self.published.append((topic, payload, retain))
+        return True
+
+    def close(self):
+        """ Disconnect """
+        self.online = False
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+# pylint: disable=line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Edge burst coalescing for chattering digital inputs
+#  File : burst.py
+# ----------------------------------------------------------------------
+""" Edge burst coalescing
+
+    One EdgeBurst per digital input ('burst_edges' not None). An input
+    with more than 'burst_edges' edges within 'burst_interval' seconds (a
+    failing door switch, a noisy contact) goes to summary mode: its edges
+    are counted only and one summary per interval is written to the events
+    file - edges, first and last edge time, final status. Pulse counters,
+    alarms and the live snapshot still see every edge.
+
+    The input goes back to one row per edge after an interval with at most
+    burst_edges / 2 edges. Every edge is O(1), the per edge memory is
+    bounded by burst_edges.
+"""
+import sys
+import threading
+from collections import deque, namedtuple
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# edge() results
+RECORD = 0     # write the edge row
+STARTED = 1    # summary mode from this edge on
+COALESCED = 2  # counted in the summary
+
+# edges of one interval, first and last are datetimes
+Summary = namedtuple('Summary', 'edges first last status')
+
+class EdgeBurst:
+    """ Burst detector of one digital input """
+
+    def __init__(self, max_edges, interval):
+        """ Constructor """
+        self.max_edges = max_edges
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=max_edges + 1) # monotonic of the last edges
+        self.active = False
+        self._start(None)
+
+    def _start(self, now):
+        """ New summary interval """
+        self.since = now
+        self.edges = 0
+        self.first = None
+        self.last = None
+        self.status = None
+
+    def edge(self, status, now, date_time):
+        """ Debounced edge, now monotonic, date_time datetime - RECORD, STARTED or COALESCED """
+        with self.lock:
+            if not self.active:
+                recent = self.recent
+                recent.append(now)
+                if len(recent) < recent.maxlen or now - recent[0] > self.interval:
+                    return RECORD
+                # too many edges, this one is the first of the summary
+                self.active = True
+                recent.clear()
+                self._start(now)
+                result = STARTED
+            else:
+                result = COALESCED
+
+            self.edges += 1
+            if self.first is None:
+                self.first = date_time
+            self.last = date_time
+            self.status = status
+            return result
+
+    def flush(self, now, force=False):
+        """ Summary of an elapsed interval (all pending with force), None otherwise """
+        with self.lock:
+            if not self.active or (not force and now - self.since < self.interval):
+                return None
+            summary = Summary(self.edges, self.first, self.last, self.status)
+            if force or self.edges <= self.max_edges // 2:
+                # calm again
+                self.active = False
+            self._start(now)
+            return summary
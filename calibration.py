@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Analog inputs calibration tables
+#  File : calibration.py
+# ----------------------------------------------------------------------
+""" Analog inputs calibration
+
+    The MCP3204 returns a 12 bit code. Every analog input gets a table of
+    the 4096 codes in engineering units, built on startup and on
+    configuration reload, so a conversion is one indexed read (one numpy
+    take for a burst).
+
+    Calibration per channel (config.py ac1..ac4), applied to the volts:
+
+      None                          volts, range of the input
+      {'gain': 2.5, 'offset': -2}   offset + gain * volts
+      {'poly': [c0, c1, c2]}        c0 + c1 * volts + c2 * volts^2 ...
+      {'range': '3v', ...}          input range, AI1/AI2 default '30v', AI3/AI4 '3v'
+      {..., 'min': 0, 'max': 100}   clipped
+"""
+import sys
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+ADC_CODES = 4096 # 12 bit
+
+# volts per code, the Iono Pi library factors
+RANGES = {
+    '30v': 0.007319, # AI1, AI2 (terminal block)
+    '3v': 0.000725,  # AI3, AI4 (pin header)
+}
+
+KEYS = ('range', 'gain', 'offset', 'poly', 'min', 'max')
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def check_calibration(value):
+    """ None or a valid calibration dictionary """
+    if value is None:
+        return True
+    if not isinstance(value, dict) or any(key not in KEYS for key in value):
+        return False
+    if 'range' in value and value['range'] not in RANGES:
+        return False
+    if 'poly' in value:
+        if 'gain' in value or 'offset' in value:
+            return False
+        poly = value['poly']
+        if not isinstance(poly, (list, tuple)) or not poly or not all(_number(coef) for coef in poly):
+            return False
+    return all(_number(value[key]) for key in ('gain', 'offset', 'min', 'max') if key in value)
+
+class AdcTable:
+    """ Code to engineering units of one channel """
+
+    def __init__(self, default_range, calibration=None):
+        """ Constructor - calibration already checked """
+        calibration = calibration or {}
+        factor = RANGES[calibration.get('range', default_range)]
+        poly = calibration.get('poly')
+        gain = calibration.get('gain', 1.0)
+        offset = calibration.get('offset', 0.0)
+        low = calibration.get('min')
+        high = calibration.get('max')
+
+        table = []
+        for code in range(ADC_CODES):
+            volts = code * factor
+            if poly:
+                # horner
+                value = 0.0
+                for coef in reversed(poly):
+                    value = value * volts + coef
+            elif calibration:
+                value = offset + gain * volts
+            else:
+                # plain volts, as the Iono Pi library
+                value = volts
+            if low is not None:
+                value = max(low, value)
+            if high is not None:
+                value = min(high, value)
+            table.append(value)
+        self.table = tuple(table)
+        self.array = None # numpy copy, on first burst
+
+    def __call__(self, code):
+        """ One code """
+        return self.table[code]
+
+    def convert(self, codes):
+        """ Burst of codes, numpy array """
+        import numpy # pylint: disable=import-outside-toplevel
+        if self.array is None:
+            self.array = numpy.array(self.table)
+        return self.array.take(numpy.asarray(codes, dtype=numpy.intp))
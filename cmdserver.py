@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Local command server for the outputs
+#  File : cmdserver.py
+# ----------------------------------------------------------------------
+""" Local command server for relay and open collector outputs
+
+    Unix socket ('cmd_socket'), one json request per line, one json reply
+    per line, the connection can stay open:
+
+      {"set": [{"output": "relay", "id": 1, "status": 1}]}
+      {"set": [{"output": "relay", "id": 2, "status": 1}, {"output": "oc", "id": 1, "status": 0}]}
+      {"set": [{"output": "relay", "id": 3, "status": 1, "pulse": 2.5}]}
+      {"get": true}
+
+      -> {"ok": true, "us": 41.3, "relay": [1, 1, 1, 0], "oc": [0, 0, 0]}
+      -> {"ok": false, "error": "..."}
+
+    A batch is checked first and applied in one pass (all or nothing), us
+    is the time spent setting the pins. A pulse sets status and switches
+    it back after pulse seconds, timed here - a new set of the same output
+    cancels it, pending pulses are switched back on shutdown.
+
+      echo '{"get": true}' | nc -U /tmp/pydas.sock
+"""
+import sys
+import os
+import json
+import time
+import heapq
+import logging
+import threading
+import socketserver
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# request output name -> enabling key, module channel list
+OUTPUTS = {
+    'relay': ('use_ro', 'relay_outputs'),
+    'oc': ('use_oc', 'open_collector_outputs'),
+}
+
+class _Handler(socketserver.StreamRequestHandler):
+    """ One client connection """
+
+    # set by CommandServer
+    commands = None
+
+    def handle(self):
+        """ Reply to every request line """
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                reply = self.commands.execute(line)
+                self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class CommandServer:
+    """ Output commands server running on its own threads """
+
+    def __init__(self, module, path):
+        """ Constructor """
+        logging.debug("Function CommandServer __init__")
+        self.module = module
+        self.path = path
+
+        # one batch at a time, pulses included
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.pulses = []    # heap of (deadline, seq, kind, id, status)
+        self.pending = {}   # (kind, id) -> seq of the pulse to end
+        self.seq = 0
+        self.running = False
+        self.pulse_thread = None
+
+        # stale socket of a previous run
+        if os.path.exists(path):
+            os.unlink(path)
+        handler = type('CommandHandler', (_Handler,), {'commands': self})
+        self.server = socketserver.ThreadingUnixStreamServer(path, handler)
+        self.server.daemon_threads = True
+        os.chmod(path, 0o660)
+        self.thread = None
+
+    def start(self):
+        """ Start serving """
+        logging.info("Starting command server on %s", self.path)
+        self.running = True
+        self.pulse_thread = threading.Thread(target=self._pulses, daemon=True)
+        self.pulse_thread.start()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """ Stop serving, pending pulses end now """
+        logging.debug("Function CommandServer stop")
+        try:
+            self.server.shutdown()
+            self.server.server_close()
+            os.unlink(self.path)
+        except Exception as ex:
+            logging.error("An exception was encountered in CommandServer stop: %s", str(ex))
+
+        with self.lock:
+            self.running = False
+            self._end_pulses(float('inf'))
+            self.wake.notify()
+
+    # requests
+
+    def _resolve(self, items):
+        """ Checked batch, [(kind, output, status, pulse)] """
+        conf = self.module.conf
+        if not isinstance(items, list) or not items:
+            raise ValueError("set needs a list of outputs")
+        changes = []
+        for item in items:
+            kind = item.get('output')
+            if kind not in OUTPUTS or not conf[OUTPUTS[kind][0]]:
+                raise ValueError("output %s not enabled" % kind)
+            out = self.module.outputs[kind].get(item.get('id'))
+            if out is None:
+                raise ValueError("no %s %s" % (kind, item.get('id')))
+            status = item.get('status')
+            if status not in (0, 1):
+                raise ValueError("status of %s %s must be 0 or 1" % (kind, out['id']))
+            pulse = item.get('pulse')
+            if pulse is not None and (isinstance(pulse, bool) or not isinstance(pulse, (int, float)) or pulse <= 0):
+                raise ValueError("pulse of %s %s must be positive seconds" % (kind, out['id']))
+            changes.append((kind, out, int(status), pulse))
+        return changes
+
+    def _statuses(self):
+        """ Output statuses of the reply """
+        return {kind: [out['status'] for out in getattr(self.module, channels)]
+                for kind, (key, channels) in OUTPUTS.items() if self.module.conf[key]}
+
+    def execute(self, line):
+        """ Run one request line, reply dictionary """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be an object")
+            reply = {'ok': True}
+
+            if 'set' in request:
+                changes = self._resolve(request['set'])
+                with self.lock:
+                    start = time.perf_counter()
+                    self.module.set_outputs([(out, status) for _, out, status, _ in changes])
+                    reply['us'] = round((time.perf_counter() - start) * 1000000, 1)
+
+                    now = time.monotonic()
+                    for kind, out, status, pulse in changes:
+                        # a new set of the output ends its pulse timing
+                        self.pending.pop((kind, out['id']), None)
+                        if pulse is not None:
+                            self.seq += 1
+                            self.pending[(kind, out['id'])] = self.seq
+                            heapq.heappush(self.pulses, (now + pulse, self.seq, kind, out['id'], int(not status)))
+                    self.wake.notify()
+
+                logging.info("Command set %s", ', '.join(
+                    '%s %s %s%s' % (kind, out['id'], status, '' if pulse is None else ' pulse %s s' % pulse)
+                    for kind, out, status, pulse in changes))
+
+            elif not request.get('get'):
+                raise ValueError("unknown request")
+
+            reply.update(self._statuses())
+            return reply
+
+        except (ValueError, TypeError, AttributeError) as ex:
+            return {'ok': False, 'error': str(ex)}
+        except Exception as ex:
+            logging.error("An exception was encountered in CommandServer execute: %s", str(ex))
+            return {'ok': False, 'error': str(ex)}
+
+    # pulses
+
+    def _end_pulses(self, now):
+        """ Switch back the pulses due by now, lock held """
+        changes = []
+        while self.pulses and self.pulses[0][0] <= now:
+            _, seq, kind, out_id, status = heapq.heappop(self.pulses)
+            if self.pending.get((kind, out_id)) != seq:
+                # cancelled by a later set
+                continue
+            del self.pending[(kind, out_id)]
+            changes.append((self.module.outputs[kind][out_id], status))
+        if changes:
+            try:
+                self.module.set_outputs(changes)
+                logging.info("Pulse end %s", ', '.join('%s %s' % (out['name'], status) for out, status in changes))
+            except Exception as ex:
+                logging.error("An exception was encountered in CommandServer _end_pulses: %s", str(ex))
+
+    def _pulses(self):
+        """ Pulse timing thread """
+        logging.debug("Function CommandServer _pulses")
+        with self.lock:
+            while self.running:
+                self._end_pulses(time.monotonic())
+                timeout = self.pulses[0][0] - time.monotonic() if self.pulses else None
+                self.wake.wait(timeout)
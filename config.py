@@ -16,20 +16,79 @@ main = {
     # generic
     'polling_time' : 30,            # polling (seconds)
     'store_time' : 3600,            # store data (seconds)
+    'acquisition_plan' : None,      # periods (seconds) per source, e.g. {'di': 1, 'ai': 5, '1w': 60, 'ai2': 10} - None all at polling_time (see acquisition.py)
+    'adaptive_polling' : False,     # poll faster during alarms and fast changes, slower when stable (see adaptive.py)
+    'adaptive_fast' : 5,            # polling while active (seconds)
+    'adaptive_slow' : 120,          # polling floor while stable (seconds)
+    'adaptive_rate_ai' : 0.5,       # analog input change that keeps fast polling (units per minute)
+    'adaptive_rate_1w' : 0.2,       # 1-Wire temperature change that keeps fast polling (°C per minute)
     'data_path' : None,             # data path - set later on
     'ftp_path' : None,              # data path for ftp export - set later on
     'file_header' : 'xxxxxxxxxxxx', # data file header
     'ws_url' : 'https://rmqa.arpal.gov.it/loggeralarms/0000/', # web service url
     'reset_alarm_msg_dealy' : 3600, # send a message to ackoledge no alarms (seconds)
+    'first_poll_now' : True,        # poll at startup without waiting for polling_time
+    'shutdown_timeout' : 10,        # max seconds to drain writes and alarms on exit
+    'config_watch' : 5,             # reload this file when changed, check every (seconds) - 0 SIGHUP only
+    'data_format' : 'tsv',          # data and events files: 'tsv' (.dat), 'csv' (.csv), 'jsonl' (.jsonl) - ftp files always tsv
+    'data_delta' : False,           # data files rows only for channels that changed, plus keyframes (see delta.py)
+    'delta_keyframe' : 3600,        # every channel written every (seconds)
+    'delta_deadband_ai' : 0.05,     # analog input change worth a row (units)
+    'delta_deadband_1w' : 0.1,      # 1-Wire temperature change worth a row (°C)
+    'burst_edges' : 30,             # more edges than this within burst_interval: one events row per interval (see burst.py), None off
+    'burst_interval' : 60,          # chattering inputs summary interval (seconds)
+    'pipeline_queue' : 16,          # samples waiting per stage (store, aggregate, alarm), oldest dropped when full
 
     # specific for iono modules
     'use_ai' : False, # analog input
+    'ai_channels' : (1, 2), # analog inputs acquired - AI1, AI2 terminal block, AI3, AI4 pin header
     'use_io' : True,  # digital io
     'use_ev' : True,  # digital io events
     'use_1w' : False, # one wire input (temperature)
+    'w1_fail_threshold' : 3,  # 1-Wire failed reads in a row before the sensor is skipped (see w1health.py)
+    'w1_retry' : 60,          # skipped sensor read again after (seconds), doubled at every failed retry
+    'w1_retry_max' : 3600,    # skipped sensor retry ceiling (seconds)
+    'w1_rescan' : 60,         # 1-Wire bus rescan for reconnected or replaced sensors (seconds)
     'use_ro' : False, # relay outputs
     'use_oc' : False, # open collectors
     'use_ld' : False, # on board led
+    'use_pc' : False, # digital inputs pulse counters and duty cycle
+
+    # digital inputs backend
+    # 'rpigpio'  -> RPi.GPIO (callback thread, one edge at a time)
+    # 'gpiochip' -> /dev/gpiochipN character device (kernel timestamps, batched reads)
+    'di_backend' : 'rpigpio',
+    'gpiochip_path' : '/dev/gpiochip0',
+
+    # digital io events debounce (ms), override per channel with dh1..dh6
+    'debounce_time' : 500,
+
+    # acquisition threads scheduling, needs privileges (see rtsched.py)
+    'rt_policy' : None,             # polling and edge threads: None default, 'fifo' or 'rr' real time
+    'rt_priority' : 10,             # real time priority 1..99
+    'rt_nice' : None,               # polling and edge threads nice level -20..19, None default
+    'rt_cpus' : None,               # polling and edge threads cpus, e.g. [3], None all
+    'rt_mlock' : False,             # lock the process memory in ram
+
+    # live data http api (served from memory)
+    'use_api' : False,              # enable http api
+    'api_host' : '127.0.0.1',       # listen address
+    'api_port' : 8081,              # listen port
+    'api_history' : 120,            # pollings kept in memory
+
+    # relay and open collector commands, local unix socket (see cmdserver.py)
+    'use_cmd' : False,              # enable command server
+    'cmd_socket' : '/tmp/pydas.sock', # socket path
+
+    # mqtt publishing, qos 1 (needs paho-mqtt)
+    'use_mqtt' : False,             # publish pollings, edges and alarms
+    'mqtt_host' : '127.0.0.1',      # broker address
+    'mqtt_port' : 1883,             # broker port
+    'mqtt_user' : None,             # broker user - None no authentication
+    'mqtt_password' : None,         # broker password
+    'mqtt_topic' : 'pydas',         # topics are <mqtt_topic>/<file_header>/...
+    'mqtt_batch' : 20,              # more messages waiting than this are packed in batch messages
+    'mqtt_spool_size' : 1024,       # kB on disk while the broker is unreachable
 
     # override default configuration
 
@@ -47,10 +106,24 @@ main = {
     'dn4' : None,
     'dn5' : None,
     'dn6' : None,
+    # digital input debounce hold time (ms)
+    'dh1' : None,
+    'dh2' : None,
+    'dh3' : None,
+    'dh4' : None,
+    'dh5' : None,
+    'dh6' : None,
 
     # analog input name
     'an1' : None,
     'an2' : None,
+    'an3' : None,
+    'an4' : None,
+    # analog input calibration, None volts - {'gain': 1.0, 'offset': 0.0}, {'poly': [c0, c1, c2]}, 'range', 'min', 'max' (see calibration.py)
+    'ac1' : None,
+    'ac2' : None,
+    'ac3' : None,
+    'ac4' : None,
 
     # one wire input name
     '1wn1' : None,
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Change only data files
+#  File : delta.py
+# ----------------------------------------------------------------------
+""" Change only (delta) data files ('data_delta' : True)
+
+    A polling writes the rows of the channels that changed since the
+    row last written for them:
+
+      analog, 1wire    moved more than the deadband (or became / stopped being None)
+      digital          status or status_ev
+      counters         any column
+      relay, oc        status
+
+    A keyframe - every channel, after a keyframe line - is written every
+    'delta_keyframe' seconds, at the first polling of a file and after a
+    restart or a configuration reload. The keyframe line carries
+    polling_time and delta_keyframe, reader.read_data(dense=True) expands
+    the rows back to one per polling (the pollings after the last row of a
+    file are known at its next keyframe only).
+"""
+import sys
+import math
+from serializers import DATA_SECTIONS
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+def _missing(value):
+    """ None or nan """
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+class DeltaFilter:
+    """ Which channels of a sample need a row """
+
+    def __init__(self, keyframe_time, deadbands):
+        """ Constructor - deadbands {section: units}, sections without one write any change """
+        self.keyframe_time = keyframe_time
+        self.deadbands = deadbands
+        self.last = {}           # (section, id) -> value last written
+        self.keyframe_at = None  # epoch of the last keyframe
+        self.file_name = None    # file of the last keyframe
+
+    def _changed(self, section, old, new):
+        """ New value worth a row """
+        deadband = self.deadbands.get(section)
+        if deadband is None:
+            return old != new
+        if _missing(old) or _missing(new):
+            return _missing(old) != _missing(new)
+        return abs(new - old) > deadband
+
+    def select(self, module, sample, ptime, file_name):
+        """ None for a keyframe, else the set of (section, id) to write - within sample.read """
+        keyframe = (self.keyframe_at is None or file_name != self.file_name
+                    or ptime - self.keyframe_at >= self.keyframe_time)
+        changed = set()
+        for section, key, channels, field, _, _, _ in DATA_SECTIONS:
+            if not module.conf[key]:
+                continue
+            for chn, value in zip(getattr(module, channels), getattr(sample, field)):
+                name = (section, chn['id'])
+                if not keyframe and sample.read is not None and name not in sample.read:
+                    # not acquired with this sample (acquisition_plan), compared when it is
+                    continue
+                if keyframe or name not in self.last or self._changed(section, self.last[name], value):
+                    self.last[name] = value
+                    changed.add(name)
+        if keyframe:
+            self.keyframe_at = ptime
+            self.file_name = file_name
+            return None
+        return changed
@@ -17,6 +17,7 @@ import os
 import logging
 from logging.handlers import TimedRotatingFileHandler
 from datetime import datetime
+from math import sqrt
 
 if __name__ == '__main__':
     sys.exit(1)
@@ -68,12 +69,11 @@ def create_log(logging_level):
 
 def clear_screen():
     """ Clear screen """
-    if os.name == "posix":
-        # Unix/Linux/MacOS/BSD/etc
-        os.system('clear')
-    elif os.name in ("nt", "dos", "ce"):
-        # DOS/Windows
-        os.system('cls')
+    # no shell out, just ansi escape codes and only on a real terminal
+    # (started from cron or start_pydas.sh there is nothing to clear)
+    if sys.stdout.isatty():
+        sys.stdout.write("\033[2J\033[H")
+        sys.stdout.flush()
 
 def unix_time(date_time):
     """ Get unit epoch time """
@@ -84,3 +84,50 @@ def unix_time(date_time):
 def unix_time_minutes(date_time):
     """ Get unit epoch time in minutes """
     return int(unix_time(date_time) / 60)
+
+def mean(lst, weights=None):
+    """ Calculate mean, weights (seconds each value stands for) for a time weighted one """
+    if not lst:
+        return float(None)
+
+    if weights is not None and sum(weights) > 0:
+        return float(sum(item * weight for item, weight in zip(lst, weights))) / sum(weights)
+
+    return float(sum(lst)) / len(lst)
+
+def stddev(lst, weights=None):
+    """ Calculate standard deviation, same as the plain one with equal weights """
+    data_mean = mean(lst, weights)
+    data_sum = 0
+
+    # one sample per window (acquisition_plan period as long as store_time)
+    if len(lst) == 1:
+        return 0.0
+
+    if weights is not None and sum(weights) > 0:
+        for item, weight in zip(lst, weights):
+            data_sum += weight * pow(item - data_mean, 2)
+        # frequency weights scaled to the number of values
+        return sqrt(float(data_sum) / sum(weights) * len(lst) / (len(lst) - 1))
+
+    for item in lst:
+        data_sum += pow(item - data_mean, 2)
+
+    return sqrt(float(data_sum) / (len(lst) - 1))
+
+def time_weights(times, end):
+    """ Seconds from every time to the next one, the last one to end """
+    return [following - time for time, following in zip(times, list(times[1:]) + [end])]
+
+def window_weights(times, end, store_time):
+    """ Time weights of a store window up to end (epoch seconds), None (plain figures) without times """
+    if not times or None in times:
+        return None
+    # up to the store boundary, never past the window of the values
+    end = min(end, (int(times[0] / store_time) + 1) * store_time)
+    weights = time_weights(times, end)
+    return weights if min(weights) >= 0 else None
+
+def ced_value(value):
+    """ Value for the ced aggregates, None when skipped (no reading or 0) """
+    return float(value) if value else None
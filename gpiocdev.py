@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Linux gpio character device inputs
+#  File : gpiocdev.py
+# ----------------------------------------------------------------------
+""" Digital inputs through /dev/gpiochipN (gpio uAPI v2, raw ioctl)
+
+    All lines are requested at once (GPIO_V2_GET_LINE_IOCTL); edges come
+    from the line request fd, many events per read(), with kernel
+    CLOCK_MONOTONIC timestamps (same clock as time.monotonic()).
+    One reader thread waits on epoll for the line fd and a wake up pipe.
+
+    On the Raspberry Pi gpiochip0 line offsets are the BCM numbers.
+
+    The ioctl function can be replaced to test without a chip (see
+    bench_stubs.FakeGpioChip).
+"""
+import sys
+import os
+import fcntl
+import select
+import struct
+import logging
+import threading
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# linux/gpio.h
+GPIO_V2_LINES_MAX = 64
+GPIO_V2_LINE_NUM_ATTRS_MAX = 10
+GPIO_V2_LINE_FLAG_INPUT = 1 << 2
+GPIO_V2_LINE_FLAG_EDGE_RISING = 1 << 4
+GPIO_V2_LINE_FLAG_EDGE_FALLING = 1 << 5
+GPIO_V2_LINE_EVENT_RISING_EDGE = 1
+GPIO_V2_LINE_EVENT_FALLING_EDGE = 2
+
+# struct gpio_v2_line_config: flags, num_attrs, padding[5], attrs[10] (id, padding, value, mask)
+LINE_CONFIG = '<QI5I' + 'IIQQ' * GPIO_V2_LINE_NUM_ATTRS_MAX
+# struct gpio_v2_line_request: offsets[64], consumer[32], config, num_lines, event_buffer_size, padding[5], fd
+LINE_REQUEST = struct.Struct('<64I32s' + LINE_CONFIG[1:] + 'II5Ii')
+# struct gpio_v2_line_values: bits, mask
+LINE_VALUES = struct.Struct('<QQ')
+# struct gpio_v2_line_event: timestamp_ns, id, offset, seqno, line_seqno, padding[6]
+LINE_EVENT = struct.Struct('<QIIII24x')
+
+def _iowr(nr, size):
+    """ _IOWR(0xB4, nr, size) """
+    return (3 << 30) | (size << 16) | (0xB4 << 8) | nr
+
+GPIO_V2_GET_LINE_IOCTL = _iowr(0x07, LINE_REQUEST.size)
+GPIO_V2_LINE_GET_VALUES_IOCTL = _iowr(0x0E, LINE_VALUES.size)
+
+# events read per syscall
+EVENT_BATCH = 16
+
+def parse_events(data, offsets):
+    """ Raw events to [(gpio, level, timestamp seconds)] """
+    events = []
+    for pos in range(0, len(data) - LINE_EVENT.size + 1, LINE_EVENT.size):
+        timestamp_ns, event_id, offset, _, _ = LINE_EVENT.unpack_from(data, pos)
+        if offset in offsets:
+            events.append((offset, 1 if event_id == GPIO_V2_LINE_EVENT_RISING_EDGE else 0, timestamp_ns / 1e9))
+    return events
+
+class GpioChipInputs:
+    """ Digital inputs requested from a gpio character device """
+
+    def __init__(self, path, gpios, edges=True, consumer='pydas', ioctl=fcntl.ioctl):
+        """ Constructor - raise OSError """
+        logging.debug("Function GpioChipInputs __init__ - %s lines %s", path, gpios)
+
+        if len(gpios) > GPIO_V2_LINES_MAX:
+            raise ValueError("too many lines")
+        self.gpios = list(gpios)
+        self.ioctl = ioctl
+        self.thread = None
+        self.wake_r, self.wake_w = os.pipe()
+
+        flags = GPIO_V2_LINE_FLAG_INPUT
+        if edges:
+            flags |= GPIO_V2_LINE_FLAG_EDGE_RISING | GPIO_V2_LINE_FLAG_EDGE_FALLING
+
+        # one request for all the lines
+        offsets = self.gpios + [0] * (GPIO_V2_LINES_MAX - len(self.gpios))
+        config = [flags, 0] + [0] * 5 + [0] * (4 * GPIO_V2_LINE_NUM_ATTRS_MAX)
+        request = bytearray(LINE_REQUEST.pack(*offsets, consumer.encode()[:31], *config,
+                                              len(self.gpios), EVENT_BATCH * 4, *([0] * 5), 0))
+
+        chip = os.open(path, os.O_RDWR | os.O_CLOEXEC)
+        try:
+            self.ioctl(chip, GPIO_V2_GET_LINE_IOCTL, request, True)
+        finally:
+            os.close(chip)
+        self.fd = LINE_REQUEST.unpack(request)[-1]
+
+    def get_values(self):
+        """ Current levels {gpio: 0|1} in one ioctl """
+        values = bytearray(LINE_VALUES.pack(0, (1 << len(self.gpios)) - 1))
+        self.ioctl(self.fd, GPIO_V2_LINE_GET_VALUES_IOCTL, values, True)
+        bits = LINE_VALUES.unpack(values)[0]
+        return {gpio: (bits >> idx) & 1 for idx, gpio in enumerate(self.gpios)}
+
+    def read_events(self):
+        """ Read pending edges, many per syscall """
+        data = os.read(self.fd, LINE_EVENT.size * EVENT_BATCH)
+        return parse_events(data, self.gpios)
+
+    def _run(self, callback):
+        """ Reader loop """
+        logging.debug("Function GpioChipInputs _run")
+        poller = select.epoll()
+        poller.register(self.fd, select.EPOLLIN)
+        poller.register(self.wake_r, select.EPOLLIN)
+        try:
+            while True:
+                for fileno, _ in poller.poll():
+                    if fileno == self.wake_r:
+                        return
+                    for gpio, level, timestamp in self.read_events():
+                        try:
+                            callback(gpio, level, timestamp)
+                        except Exception as ex:
+                            logging.error("An exception was encountered in GpioChipInputs callback: %s", str(ex))
+        except Exception as ex:
+            logging.critical("An exception was encountered in GpioChipInputs _run: %s", str(ex))
+        finally:
+            poller.close()
+
+    def start(self, callback):
+        """ Start the reader thread, callback(gpio, level, timestamp) """
+        self.thread = threading.Thread(target=self._run, daemon=True, args=[callback])
+        self.thread.start()
+
+    def close(self):
+        """ Stop the reader thread and release the lines """
+        logging.debug("Function GpioChipInputs close")
+        os.write(self.wake_w, b'x')
+        if self.thread:
+            self.thread.join(1)
+        for fileno in (self.fd, self.wake_r, self.wake_w):
+            try:
+                os.close(fileno)
+            except OSError:
+                pass
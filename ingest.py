@@ -0,0 +1,231 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Fleet ingestion of uploaded ced files
+#  File : ingest.py
+# ----------------------------------------------------------------------
+""" Ingest hourly ced files (store_ced_data_csv) from every station
+
+    python3 ingest.py /srv/ftp/dati_iono --store /srv/iono_store [--workers 4] [--hash]
+
+    Source folders are scanned recursively for <file_header>_YYYY-MM-DD-HH.dat
+    files, parsed in a process pool and merged into a columnar store
+
+      <store>/manifest.json                 already ingested files
+      <store>/<file_header>/<dbid>/time     int64 epoch seconds (sorted, unique)
+      <store>/<file_header>/<dbid>/mean     float64
+      <store>/<file_header>/<dbid>/min      float64
+      <store>/<file_header>/<dbid>/max      float64
+      <store>/<file_header>/<dbid>/stddev   float64
+
+    Column files are raw native endian arrays (numpy.fromfile friendly).
+    A file is skipped when the manifest has the same name, size and mtime
+    (or the same sha1 with --hash, for copies that lost their mtime).
+    Rows with the same timestamp are replaced by the newest ingested one.
+"""
+import sys
+import os
+import re
+import json
+import time
+import array
+import hashlib
+import logging
+import argparse
+import calendar
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# <file_header>_YYYY-MM-DD-HH.dat
+CED_FILE = re.compile(r'^(?P<header>.+)_(?P<date>\d{4}-\d{2}-\d{2}-\d{2})\.dat$')
+
+COLUMNS = ('mean', 'min', 'max', 'stddev')
+
+def _epoch(text):
+    """ 'YYYY-MM-DD HH:MM:SS' to epoch seconds, same as functions.unix_time """
+    return calendar.timegm((int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                            int(text[11:13]), int(text[14:16]), int(text[17:19])))
+
+def _sha1(path):
+    """ File sha1 """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def discover(sources):
+    """ Find ced files recursively, yield (path, name, header) """
+    for source in sources:
+        for root, _, files in os.walk(source):
+            for name in files:
+                match = CED_FILE.match(name)
+                # <file_header>_pulses_YYYY-MM-DD-HH.dat are digital counters, not ced rows
+                if match and not match.group('header').endswith('_pulses'):
+                    yield os.path.join(root, name), name, match.group('header')
+
+def parse_ced_file(job):
+    """ Parse a ced file (worker process)
+
+        Return (name, header, {dbid: (times, means, mins, maxs, stddevs)}, bad_rows)
+    """
+    path, name, header = job
+    rows = defaultdict(lambda: ([], [], [], [], []))
+    bad = 0
+    with open(path, 'r') as file:
+        for line in file:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) != 6:
+                if line.strip():
+                    bad += 1
+                continue
+            try:
+                stamp = _epoch(fields[0])
+                values = [float(value) for value in fields[2:]]
+            except ValueError:
+                bad += 1
+                continue
+            cols = rows[fields[1]]
+            cols[0].append(stamp)
+            for idx, value in enumerate(values):
+                cols[idx + 1].append(value)
+    return name, header, dict(rows), bad
+
+def _read_column(path, typecode):
+    """ Read a raw column file """
+    col = array.array(typecode)
+    if os.path.exists(path):
+        with open(path, 'rb') as file:
+            col.frombytes(file.read())
+    return col
+
+def _write_column(path, col):
+    """ Write a raw column file atomically """
+    with open(path + '.tmp', 'wb') as file:
+        col.tofile(file)
+    os.replace(path + '.tmp', path)
+
+def merge_series(job):
+    """ Merge new rows into one (header, dbid) series (worker process)
+
+        Return (header, dbid, total rows)
+    """
+    store, header, dbid, chunks = job
+    folder = os.path.join(store, header, dbid)
+    os.makedirs(folder, exist_ok=True)
+
+    # existing rows first, new rows override on same timestamp
+    merged = {}
+    times = _read_column(os.path.join(folder, 'time'), 'q')
+    old = [_read_column(os.path.join(folder, col), 'd') for col in COLUMNS]
+    for idx, stamp in enumerate(times):
+        merged[stamp] = tuple(col[idx] for col in old)
+    for chunk in chunks:
+        for idx, stamp in enumerate(chunk[0]):
+            merged[stamp] = tuple(col[idx] for col in chunk[1:])
+
+    # sorted columns
+    stamps = sorted(merged)
+    _write_column(os.path.join(folder, 'time'), array.array('q', stamps))
+    for pos, col in enumerate(COLUMNS):
+        _write_column(os.path.join(folder, col), array.array('d', (merged[stamp][pos] for stamp in stamps)))
+    return header, dbid, len(stamps)
+
+def load_series(store, header, dbid):
+    """ Load a series from the store as a dict of arrays """
+    folder = os.path.join(store, header, str(dbid))
+    series = {'time': _read_column(os.path.join(folder, 'time'), 'q')}
+    for col in COLUMNS:
+        series[col] = _read_column(os.path.join(folder, col), 'd')
+    return series
+
+def load_manifest(store):
+    """ Load the manifest {name: [size, mtime_ns, sha1]} """
+    path = os.path.join(store, 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def save_manifest(store, manifest):
+    """ Save the manifest atomically """
+    path = os.path.join(store, 'manifest.json')
+    with open(path + '.tmp', 'w') as file:
+        json.dump(manifest, file)
+    os.replace(path + '.tmp', path)
+
+def select_new(files, manifest, use_hash):
+    """ Keep files not in the manifest, return [(job, manifest entry)] """
+    selected = []
+    seen = set()
+    for path, name, header in files:
+        if name in seen:
+            continue
+        stat = os.stat(path)
+        known = manifest.get(name)
+        if known and known[0] == stat.st_size:
+            if known[1] == stat.st_mtime_ns:
+                continue
+            if use_hash and known[2] is not None and known[2] == _sha1(path):
+                continue
+        seen.add(name)
+        entry = [stat.st_size, stat.st_mtime_ns, _sha1(path) if use_hash else None]
+        selected.append(((path, name, header), entry))
+    return selected
+
+def ingest(sources, store, workers=None, use_hash=False):
+    """ Ingest new ced files into the store, return (files, rows, bad rows) """
+    os.makedirs(store, exist_ok=True)
+    manifest = load_manifest(store)
+
+    start = time.perf_counter()
+    selected = select_new(discover(sources), manifest, use_hash)
+    logging.info("%s new files to ingest (%.1fs)", len(selected), time.perf_counter() - start)
+    if not selected:
+        return 0, 0, 0
+
+    workers = workers or os.cpu_count()
+    jobs = [job for job, _ in selected]
+    entries = {job[1]: entry for job, entry in selected}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # parse
+        series = defaultdict(list)
+        rows = bad = 0
+        chunksize = max(1, len(jobs) // (workers * 4))
+        for _, header, result, bad_rows in pool.map(parse_ced_file, jobs, chunksize=chunksize):
+            bad += bad_rows
+            for dbid, cols in result.items():
+                rows += len(cols[0])
+                series[(header, dbid)].append(cols)
+        logging.info("Parsed %s rows (%s bad) in %.1fs", rows, bad, time.perf_counter() - start)
+
+        # merge, one series per task
+        merge_jobs = [(store, header, dbid, chunks) for (header, dbid), chunks in series.items()]
+        for header, dbid, total in pool.map(merge_series, merge_jobs):
+            logging.debug("Series %s/%s: %s rows", header, dbid, total)
+        logging.info("Merged %s series in %.1fs", len(merge_jobs), time.perf_counter() - start)
+
+    # only now the files are done
+    manifest.update(entries)
+    save_manifest(store, manifest)
+    return len(jobs), rows, bad
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description='Ingest pydas hourly ced files')
+    parser.add_argument('sources', nargs='+', help='folders to scan recursively')
+    parser.add_argument('--store', required=True, help='columnar store folder')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--hash', action='store_true', help='also match files by sha1 in the manifest')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s-%(levelname)s: %(message)s')
+    files, rows, bad = ingest(args.sources, args.store, args.workers, args.hash)
+    logging.info("Done: %s files, %s rows, %s bad rows", files, rows, bad)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,14 +18,26 @@
 import sys
 import os
 import glob
+import time
 import logging
-import logging.config
-import spidev
-import RPi.GPIO as GPIO
+import threading
+from calibration import AdcTable
+from w1health import SensorHealth
 
 if __name__ == '__main__':
     sys.exit(1)
 
+# RPi.GPIO and spidev are imported on demand (faster startup)
+GPIO = None
+
+def _import_gpio():
+    """ Import RPi.GPIO on first use """
+    global GPIO # pylint: disable=global-statement
+    if GPIO is None:
+        import RPi.GPIO # pylint: disable=import-outside-toplevel
+        GPIO = RPi.GPIO
+    return GPIO
+
 class Iono:
     """ Iono main class """
 
@@ -56,18 +68,20 @@ class Iono:
         {'ch': L1, 'id': 1, 'name': 'LED 1', 'status': 0},
     ]
 
-    digital_inputs = [ # Generic digital input
-        {'gpio': DI1, 'id': 1, 'dbid': None, 'name': 'DI 1', 'reverse' : 0, 'status': 0, 'status_ev': 0},
-        {'gpio': DI2, 'id': 2, 'dbid': None, 'name': 'DI 2', 'reverse' : 0, 'status': 0, 'status_ev': 0},
-        {'gpio': DI3, 'id': 3, 'dbid': None, 'name': 'DI 3', 'reverse' : 0, 'status': 0, 'status_ev': 0},
-        {'gpio': DI4, 'id': 4, 'dbid': None, 'name': 'DI 4', 'reverse' : 0, 'status': 0, 'status_ev': 0},
-        {'gpio': DI5, 'id': 5, 'dbid': None, 'name': 'DI 5', 'reverse' : 0, 'status': 0, 'status_ev': 0},
-        {'gpio': DI6, 'id': 6, 'dbid': None, 'name': 'DI 6', 'reverse' : 0, 'status': 0, 'status_ev': 0},
+    digital_inputs = [ # Generic digital input - hold: software debounce (seconds)
+        {'gpio': DI1, 'id': 1, 'dbid': None, 'name': 'DI 1', 'reverse' : 0, 'status': 0, 'status_ev': 0, 'hold': 0.5, 'last_edge': 0.0},
+        {'gpio': DI2, 'id': 2, 'dbid': None, 'name': 'DI 2', 'reverse' : 0, 'status': 0, 'status_ev': 0, 'hold': 0.5, 'last_edge': 0.0},
+        {'gpio': DI3, 'id': 3, 'dbid': None, 'name': 'DI 3', 'reverse' : 0, 'status': 0, 'status_ev': 0, 'hold': 0.5, 'last_edge': 0.0},
+        {'gpio': DI4, 'id': 4, 'dbid': None, 'name': 'DI 4', 'reverse' : 0, 'status': 0, 'status_ev': 0, 'hold': 0.5, 'last_edge': 0.0},
+        {'gpio': DI5, 'id': 5, 'dbid': None, 'name': 'DI 5', 'reverse' : 0, 'status': 0, 'status_ev': 0, 'hold': 0.5, 'last_edge': 0.0},
+        {'gpio': DI6, 'id': 6, 'dbid': None, 'name': 'DI 6', 'reverse' : 0, 'status': 0, 'status_ev': 0, 'hold': 0.5, 'last_edge': 0.0},
     ]
 
-    analog_inputs = [ # Analog input (on terminal block) to A/D
-        {'ch': AI1, 'id': 1, 'dbid': None, 'name': 'AI 1', 'value': None},
-        {'ch': AI2, 'id': 2, 'dbid': None, 'name': 'AI 2', 'value': None},
+    analog_inputs = [ # Analog input to A/D - mux: MCP3204 channel, range: default calibration range
+        {'ch': AI1, 'id': 1, 'dbid': None, 'name': 'AI 1', 'value': None, 'mux': 1, 'range': '30v', 'calibration': None},
+        {'ch': AI2, 'id': 2, 'dbid': None, 'name': 'AI 2', 'value': None, 'mux': 0, 'range': '30v', 'calibration': None},
+        {'ch': AI3, 'id': 3, 'dbid': None, 'name': 'AI 3', 'value': None, 'mux': 2, 'range': '3v', 'calibration': None},
+        {'ch': AI4, 'id': 4, 'dbid': None, 'name': 'AI 4', 'value': None, 'mux': 3, 'range': '3v', 'calibration': None},
     ]
 
     relay_outputs = [ # Power relay
@@ -85,6 +99,8 @@ class Iono:
 
     one_wire_base_dir = '/sys/bus/w1/devices/' # 1-Wire base path
 
+    gpiochip_ioctl = None # fcntl.ioctl replacement for the gpiochip backend (tests, benchmarks)
+
     one_wire_inputs = [ # 1-Wire, Wiegand or generic TTL I/O GPIO4
         {'gpio': TTL1, 'id': 1, 'dbid': None, 'code': None, 'name': 'WI 1', 'value': None},
     ]
@@ -94,16 +110,55 @@ class Iono:
         logging.getLogger('')
         logging.debug("Function __init__")
 
-        # Set channel mode
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)
-
         # set properties
         self.conf = conf
 
+        # Analog inputs acquired (ai_channels), 'calibration' -> adc_tables
+        self.analog_inputs = self.acquired_analog_inputs(conf)
+        self.adc_tables = {}
+
+        # Set channel mode - RPi.GPIO not needed with gpiochip inputs and no outputs
+        if (self.conf['di_backend'] == 'rpigpio' or self.conf['use_ro']
+                or self.conf['use_oc'] or self.conf['use_ld']):
+            _import_gpio()
+            GPIO.setmode(GPIO.BCM)
+            GPIO.setwarnings(False)
+
+        # Digital inputs by gpio, for the event callbacks
+        self.din_by_gpio = {din['gpio']: din for din in self.digital_inputs}
+        # edges and level re-reads, one at a time
+        self.edge_lock = threading.RLock()
+        # inputs with bounces skipped, id -> [timer re-reading the pin at hold end, time of the last bounce]
+        self.settling = {}
+
+        # Outputs by kind and id, for the setters
+        self.outputs = {
+            'relay': {rel['id']: rel for rel in self.relay_outputs},
+            'oc': {opc['id']: opc for opc in self.open_collector_outputs},
+        }
+
+        # time.monotonic() of the last get_digital_input
+        self.di_polled_at = 0.0
+
+        # Digital inputs through /dev/gpiochipN (di_backend gpiochip)
+        self.di_chip = None
+
+        # Edge thread hooks - setup run once by the thread on its first edge,
+        # latency JitterStats fed with the kernel timestamps (gpiochip)
+        self.edge_thread_setup = None
+        self.edge_latency = None
+
         # Main spi object
         self.spi = None
 
+        # Background 1-Wire bus probe
+        self.probe_thread = None
+
+        # 1-Wire sensors health by input id, background bus rescan
+        self.one_wire_health = {owi['id']: SensorHealth(owi['name']) for owi in self.one_wire_inputs}
+        self.w1_stop = threading.Event()
+        self.rescan_thread = None
+
         # Set analog input
         if self.conf['use_ai']:
             self._set_analog_inputs()
@@ -116,9 +171,14 @@ class Iono:
             self._set_digital_io_events()
 
         # One wire path and auto detection (first one)
+        # done in background, the first polling must not wait for the bus
         if self.conf['use_1w']:
             if self.one_wire_inputs[0]['code'] is None:
-                self._find_1wire_ds18b20()
+                self.probe_thread = threading.Thread(target=self._find_1wire_ds18b20, daemon=True)
+                self.probe_thread.start()
+            # reconnected or replaced sensors
+            self.rescan_thread = threading.Thread(target=self._rescan_1wire, daemon=True)
+            self.rescan_thread.start()
 
         # Set relay outputs
         if self.conf['use_ro']:
@@ -132,12 +192,25 @@ class Iono:
         if self.conf['use_ld']:
             self._set_onboard_led()
 
+    @classmethod
+    def acquired_analog_inputs(cls, conf):
+        """ Analog inputs of ai_channels, in channel order """
+        return [ain for ain in cls.analog_inputs if ain['id'] in conf['ai_channels']]
+
     def cleanup(self):
         """  Cleanup  """
         logging.debug("Function _cleanup")
 
         try:
-            GPIO.cleanup()
+            self.w1_stop.set()
+            with self.edge_lock:
+                for timer, _ in self.settling.values():
+                    timer.cancel()
+                self.settling = {}
+            if self.di_chip:
+                self.di_chip.close()
+            if GPIO:
+                GPIO.cleanup()
             if self.spi:
                 self.spi.close()
         except Exception:
@@ -149,17 +222,46 @@ class Iono:
 
         try:
             # Initialize spi
+            import spidev # pylint: disable=import-outside-toplevel
             self.spi = spidev.SpiDev()
             self.spi.open(0, 0)
             self.spi.max_speed_hz = 50000
             self.spi.mode = 0b01
 
+            # code to engineering units
+            self._set_analog_tables()
+
         except Exception as ex:
             logging.critical("An exception was encountered in _set_analog_inputs: %s", str(ex))
 
+    def _set_analog_tables(self):
+        """ Build the conversion table of every analog input (startup, calibration change) """
+        logging.debug("Function _set_analog_tables")
+        # swap at once, the polling may be converting
+        self.adc_tables = {ain['id']: AdcTable(ain['range'], ain['calibration']) for ain in self.analog_inputs}
+
+    def _set_digital_io_chip(self):
+        """ Request all digital inputs from the gpio character device """
+        logging.debug("Function _set_digital_io_chip")
+
+        try:
+            from gpiocdev import GpioChipInputs # pylint: disable=import-outside-toplevel
+            kwargs = {'ioctl': self.gpiochip_ioctl} if self.gpiochip_ioctl else {}
+            self.di_chip = GpioChipInputs(self.conf['gpiochip_path'],
+                                          [din['gpio'] for din in self.digital_inputs],
+                                          edges=self.conf['use_ev'], **kwargs)
+
+        except Exception as ex:
+            logging.critical("An exception was encountered in _set_digital_io_chip: %s", str(ex))
+
     def _set_digital_io(self):
         """ Setup digital input/output """
         logging.debug("Function _set_digital_io")
+
+        if self.conf['di_backend'] == 'gpiochip':
+            self._set_digital_io_chip()
+            return
+
         # https://sourceforge.net/p/raspberry-channel-python/wiki/Inputs/
         try:
             logging.debug("Setting GPIO mode PUD_DOWN")
@@ -181,13 +283,22 @@ class Iono:
 
         try:
 
-            # GPIO.FALLING | GPIO.RISING | GPIO.BOTH
-            GPIO.add_event_detect(self.DI1, GPIO.RISING, callback=self._io_callback, bouncetime=500)
-            GPIO.add_event_detect(self.DI2, GPIO.RISING, callback=self._io_callback, bouncetime=500)
-            GPIO.add_event_detect(self.DI3, GPIO.RISING, callback=self._io_callback, bouncetime=500)
-            GPIO.add_event_detect(self.DI4, GPIO.RISING, callback=self._io_callback, bouncetime=500)
-            GPIO.add_event_detect(self.DI5, GPIO.RISING, callback=self._io_callback, bouncetime=500)
-            GPIO.add_event_detect(self.DI6, GPIO.RISING, callback=self._io_callback, bouncetime=500)
+            if self.conf['di_backend'] == 'gpiochip':
+                if self.di_chip is None:
+                    self._set_digital_io_chip()
+                # start from the current level, then one reader thread for all the lines
+                for din in self.digital_inputs:
+                    din['status_ev'] = self.get_digital_level(din)
+                self.di_chip.start(self._io_chip_callback)
+                return
+
+            for din in self.digital_inputs:
+                # start from the current level
+                din['status_ev'] = self.get_digital_level(din)
+
+                # GPIO.FALLING | GPIO.RISING | GPIO.BOTH
+                # both edges, debounced in software with a per channel hold time
+                GPIO.add_event_detect(din['gpio'], GPIO.BOTH, callback=self._io_callback)
 
         except Exception as ex:
             logging.critical("An exception was encountered in _set_digital_io_events: %s", str(ex))
@@ -215,8 +326,8 @@ class Iono:
         try:
             logging.debug("Setting GPIO mode OUT")
             GPIO.setup(self.OC1, GPIO.OUT)
-            GPIO.setup(self.OC1, GPIO.OUT)
-            GPIO.setup(self.OC1, GPIO.OUT)
+            GPIO.setup(self.OC2, GPIO.OUT)
+            GPIO.setup(self.OC3, GPIO.OUT)
 
         except Exception as ex:
             logging.critical("An exception was encountered in _set_collectors_outputs: %s", str(ex))
@@ -234,16 +345,64 @@ class Iono:
         except Exception as ex:
             logging.critical("An exception was encountered in _set_onboard_led: %s", str(ex))
 
+    def _get_digital_raw(self, din):
+        """ Pin level of a digital input, before reverse """
+        if self.di_chip:
+            return self.di_chip.get_values()[din['gpio']]
+        return GPIO.input(din['gpio'])
+
+    def get_digital_level(self, din):
+        """ Pin level of a digital input, after reverse """
+        status = self._get_digital_raw(din)
+        return int(not status) if din['reverse'] else status
+
     def _io_callback(self, channel):
-        """ Callback event """
+        """ Callback event (RPi.GPIO thread) """
+        now = time.monotonic()
         logging.debug("Function _io_callback - GPIO %s", channel)
 
-        # Find digital input by gpio channel
-        din = next((item for item in self.digital_inputs if item["gpio"] == channel), None)
+        if self.edge_thread_setup is not None:
+            self._edge_thread_setup()
 
         # Get status (on/off)
         status = GPIO.input(channel)
         logging.debug("Status %s", status)
+
+        self._io_event(self.din_by_gpio[channel], status, now)
+
+    def _io_chip_callback(self, channel, status, now):
+        """ Callback event (gpiochip reader thread, kernel timestamp) """
+        logging.debug("Function _io_chip_callback - GPIO %s status %s", channel, status)
+
+        if self.edge_latency is not None:
+            self.edge_latency.add(time.monotonic() - now)
+        if self.edge_thread_setup is not None:
+            self._edge_thread_setup()
+
+        self._io_event(self.din_by_gpio[channel], status, now)
+
+    def _edge_thread_setup(self):
+        """ First edge, run the setup hook in the edge thread """
+        setup, self.edge_thread_setup = self.edge_thread_setup, None
+        try:
+            setup()
+        except Exception as ex:
+            logging.error("An exception was encountered in _edge_thread_setup: %s", str(ex))
+
+    def _io_event(self, din, status, now):
+        """ Digital input edge, now is time.monotonic() based """
+        with self.edge_lock:
+
+            # Software debounce, edges within hold time from the last one are bounces
+            if now - din['last_edge'] < din['hold']:
+                logging.debug("Bounce skipped")
+                self._settle_later(din, now)
+                return
+
+            self._io_change(din, status, now)
+
+    def _io_change(self, din, status, now):
+        """ Debounced level, edge lock held """
         if din['reverse']:
             status = int(not status)
             logging.debug("Reversed status %s", status)
@@ -254,22 +413,52 @@ class Iono:
 
         # Set new status
         din['status_ev'] = status
+        din['last_edge'] = now
 
         # custom function for subclass to override
         self.parse_event(din)
 
-    def _get_analog_value(self, channel):
+    def _settle_later(self, din, now):
+        """ Bounce skipped, read the pin again when the hold time is over """
+        pending = self.settling.get(din['id'])
+        if pending is not None:
+            pending[1] = now
+            return
+        timer = threading.Timer(din['last_edge'] + din['hold'] - now, self._io_settle, args=[din])
+        timer.daemon = True
+        self.settling[din['id']] = [timer, now]
+        timer.start()
+
+    def _io_settle(self, din):
+        """ Hold time over (timer thread), a level missed as bounce is an edge """
+        logging.debug("Function _io_settle - %s", din['name'])
+        try:
+            with self.edge_lock:
+                pending = self.settling.pop(din['id'], None)
+                if pending is None:
+                    # cleanup
+                    return
+                # the pin settled at the last bounce at most
+                self._io_change(din, self._get_digital_raw(din), max(pending[1], din['last_edge']))
+
+        except Exception as ex:
+            logging.error("An exception was encountered in _io_settle: %s", str(ex))
+
+    def _get_analog_code(self, ain):
+        """ Read the 12 bit code of AIx """
+        # single ended, MCP3204 channel in the top bits of the second byte
+        adc = self.spi.xfer2([6, ain['mux']<<6, 0])
+        return ((adc[1] & 15) << 8) + adc[2]
+
+    def _get_analog_value(self, ain):
         """ Read analog value from AIx """
-        logging.debug("Function _get_analog_value - Channel %s", channel)
+        logging.debug("Function _get_analog_value - Channel %s", ain['id'])
 
         # The Iono Pi library uses a 0.007319 conversion factor
         # for the AI1 and AI2 inputs with a
         # 0÷30V range, and 0.000725 for AI3 and AI4 inputs with a 0÷3V range
-        adc = self.spi.xfer2([6, channel<<6, 0])
-        data = ((adc[1] & 15) << 8) + adc[2]
-
-        factor = 0.007319
-        value = data * factor
+        # (calibration.py, precomputed with the channel calibration)
+        value = self.adc_tables[ain['id']](self._get_analog_code(ain))
         logging.debug("Value: %s", value)
         return value
 
@@ -294,52 +483,106 @@ class Iono:
         except Exception as ex:
             logging.error("An exception was encountered in _find_1wire_ds18b20() : %s", str(ex))
 
+    def _rescan_1wire(self):
+        """ Rescan the 1-Wire bus every w1_rescan seconds (background) """
+        logging.debug("Function _rescan_1wire")
+
+        while not self.w1_stop.wait(self.conf['w1_rescan']):
+            try:
+                codes = [os.path.basename(folder) for folder in glob.glob(self.one_wire_base_dir + '28*')]
+                used = {owi['code'] for owi in self.one_wire_inputs}
+                for owi in self.one_wire_inputs:
+                    health = self.one_wire_health[owi['id']]
+                    if owi['code'] in codes:
+                        # reconnected
+                        if health.last_error == 'device missing':
+                            health.retry_now()
+                    elif owi['code'] is None or health.state == 'skipped':
+                        # replaced, or found after startup
+                        spare = next((code for code in codes if code not in used), None)
+                        if spare is not None:
+                            logging.warning("1-Wire %s: sensor %s found, was %s", owi['name'], spare, owi['code'])
+                            owi['code'] = spare
+                            used.add(spare)
+                            self.one_wire_health[owi['id']] = SensorHealth(owi['name'])
+
+            except Exception as ex:
+                logging.error("An exception was encountered in _rescan_1wire: %s", str(ex))
+
     def _get_1wire_raw_data(self, sens_id):
-        """ Read the temperature message from the device file """
+        """ Read the temperature message from the device file, raise OSError """
         logging.debug("Function _get_1wire_raw_data")
 
-        try:
-            # Build device filename
-            device_file = self.one_wire_base_dir + '/' + sens_id + '/w1_slave'
-            if not os.path.exists(device_file):
-                logging.error("Sensor directory does not exists: %s", device_file)
-                return None
-
-            file = open(device_file, 'r')
-            lines = file.readlines()
-            file.close()
-            return lines
+        # Build device filename, no exists check (one open less per read)
+        device_file = self.one_wire_base_dir + '/' + sens_id + '/w1_slave'
+        with open(device_file, 'r') as file:
+            return file.readlines()
 
-        except Exception as ex:
-            logging.error("An exception was encountered in _get_1wire_raw_data() : %s", str(ex))
-            return None
-
-    def _read_temp(self, sens_id):
-        """ Split the actual temperature out of the message """
-        logging.debug("Function _read_temp() - Id %s", sens_id)
+    def _read_temp_status(self, sens_id):
+        """ Temperature and error text, None when read """
+        logging.debug("Function _read_temp_status() - Id %s", sens_id)
 
         try:
 
             # If no sensor return
             if sens_id is None:
-                return float('nan')
+                return float('nan'), 'no sensor'
 
             # Get file content
             lines = self._get_1wire_raw_data(sens_id)
-            if lines is None:
-                return float('nan')
 
             if lines[0].strip()[-3:] != 'YES':
-                return float('nan')
+                return float('nan'), 'crc error'
 
             equals_pos = lines[1].find('t=')
             if equals_pos != -1:
                 temp_string = lines[1][equals_pos+2:]
                 temp_c = float(temp_string) / 1000.0
-                return temp_c
+                return temp_c, None
+
+            return float('nan'), 'no temperature'
 
+        except FileNotFoundError:
+            return float('nan'), 'device missing'
+        except Exception as ex:
+            return float('nan'), 'read error: %s' % str(ex)
+
+    def _read_one_wire(self, owi):
+        """ Read a 1-Wire input through its breaker """
+        health = self.one_wire_health[owi['id']]
+        now = time.monotonic()
+        if not health.allow(now):
             return float('nan')
 
+        value, error = self._read_temp_status(owi['code'])
+        if error is None:
+            health.success(now)
+        else:
+            health.failure(now, error, self.conf)
+        return value
+
+    def one_wire_report(self):
+        """ Health of the 1-Wire sensors, by input id """
+        now = time.monotonic()
+        return {owi['id']: dict(self.one_wire_health[owi['id']].report(now), code=owi['code'])
+                for owi in self.one_wire_inputs}
+
+    def log_one_wire_health(self):
+        """ Log the 1-Wire sensors not ok """
+        for idx, health in self.one_wire_report().items():
+            if health['state'] != 'ok':
+                logging.warning("1-Wire %s %s: %s", idx, health['state'], health)
+
+    def _read_temp(self, sens_id):
+        """ Split the actual temperature out of the message """
+        logging.debug("Function _read_temp() - Id %s", sens_id)
+
+        try:
+            value, error = self._read_temp_status(sens_id)
+            if error is not None:
+                logging.debug("1-Wire %s: %s", sens_id, error)
+            return value
+
         except Exception as ex:
             logging.error("An exception was encountered in _read_temp() : %s", str(ex))
             return float('nan')
@@ -352,21 +595,14 @@ class Iono:
 
         try:
             # Get output
-            rel = next((item for item in self.relay_outputs if item["id"] == channel), None)
+            rel = self.outputs['relay'][channel]
             # Set status
             rel['status'] = status
             logging.debug("GPIO %s, id %s, status %s",
                           rel['name'], rel['id'], rel['status'])
 
             # Set port/pin value to 1/GPIO.HIGH/True
-            if channel == 1:
-                GPIO.output(self.OR1, status)
-            elif channel == 2:
-                GPIO.output(self.OR2, status)
-            elif channel == 3:
-                GPIO.output(self.OR3, status)
-            elif channel == 4:
-                GPIO.output(self.OR4, status)
+            GPIO.output(rel['gpio'], status)
 
         except Exception as ex:
             logging.critical("An exception was encountered in set_relay_status: %s", str(ex))
@@ -377,7 +613,7 @@ class Iono:
 
         try:
             # Get output
-            opc = next((item for item in self.open_collector_outputs if item["id"] == channel), None)
+            opc = self.outputs['oc'][channel]
 
             # Set status
             opc['status'] = status
@@ -385,16 +621,19 @@ class Iono:
                           opc['name'], opc['id'], opc['status'])
 
             # Set port/pin value to 1/GPIO.HIGH/True
-            if channel == 1:
-                GPIO.output(self.OC1, status)
-            elif channel == 2:
-                GPIO.output(self.OC2, status)
-            elif channel == 3:
-                GPIO.output(self.OC3, status)
+            GPIO.output(opc['gpio'], status)
 
         except Exception as ex:
             logging.critical("An exception was encountered in set_open_collector_status: %s", str(ex))
 
+    def set_outputs(self, changes):
+        """ Set several outputs in one pass, changes [(output, status)] with outputs from self.outputs """
+        logging.debug("Function set_outputs")
+
+        for out, status in changes:
+            out['status'] = status
+            GPIO.output(out['gpio'], status)
+
     def set_led_status(self, status):
         """ Set on board led status on/off """
         logging.debug("Function set_led_status")
@@ -432,11 +671,17 @@ class Iono:
             # Loop through digital_inputs
             logging.debug("Looping through digital inputs")
 
+            # edges after this are newer than the polled status
+            self.di_polled_at = time.monotonic()
+
+            # All levels in one ioctl with the gpiochip backend
+            levels = self.di_chip.get_values() if self.di_chip else None
+
             # Loop
             for din in self.digital_inputs:
 
                 # Get status (on/off)
-                status = GPIO.input(din['gpio'])
+                status = levels[din['gpio']] if levels else GPIO.input(din['gpio'])
                 logging.debug("Status %s", status)
                 if din['reverse']:
                     status = int(not status)
@@ -449,30 +694,52 @@ class Iono:
         except Exception as ex:
             logging.critical("An exception was encountered in get_digital_input: %s", str(ex))
 
-    def get_analog_input(self):
-        """ Show all analog inputs """
+    def get_analog_input(self, channels=None):
+        """ Show all analog inputs, or the channels ids only """
         logging.debug("Function get_analog_input")
 
         try:
             # Loop through items
             logging.debug("Looping through analog inputs")
             for ain in self.analog_inputs:
-                ain['value'] = self._get_analog_value(ain['id'])
+                if channels is not None and ain['id'] not in channels:
+                    continue
+                ain['value'] = self._get_analog_value(ain)
                 logging.debug("Measure %s, id %s, value %s",
                               ain['name'], ain['id'], ain['value'])
 
         except Exception as ex:
             logging.critical("An exception was encountered in get_analog_input: %s", str(ex))
 
-    def get_one_wire_input(self):
-        """ Get ambience temperature """
+    def get_analog_burst(self, channel, count):
+        """ count readings of AIx, numpy array in engineering units """
+        logging.debug("Function get_analog_burst")
+
+        try:
+            ain = next(item for item in self.analog_inputs if item['id'] == channel)
+            codes = [self._get_analog_code(ain) for _ in range(count)]
+            return self.adc_tables[channel].convert(codes)
+
+        except Exception as ex:
+            logging.critical("An exception was encountered in get_analog_burst: %s", str(ex))
+            return None
+
+    def get_one_wire_input(self, channels=None):
+        """ Get ambience temperature, all inputs or the channels ids only """
         logging.debug("Function get_one_wire_input")
 
         try:
+            # Wait for the background bus probe if still running
+            if self.probe_thread is not None:
+                self.probe_thread.join()
+                self.probe_thread = None
+
             # Loop through 1 wire input
             logging.debug("Looping through 1 wire input")
             for owi in self.one_wire_inputs:
-                owi['value'] = self._read_temp(owi['code'])
+                if channels is not None and owi['id'] not in channels:
+                    continue
+                owi['value'] = self._read_one_wire(owi)
                 logging.debug("Measure %s, code %s, value %s",
                               owi['name'], owi['code'], owi['value'])
 
@@ -18,89 +18,331 @@
 """
 import sys
 import os
+import json
+import time
 import logging
-import logging.config
 from datetime import datetime, timedelta
 import threading
-from math import sqrt
-import requests
+from collections import namedtuple
 from iono import Iono
+from functions import unix_time, mean, stddev, window_weights, ced_value
+from settings import Settings
+from pulse import PulseCounter
+from serializers import TsvSerializer, get_serializer
+from delta import DeltaFilter
+from burst import EdgeBurst, RECORD, STARTED
+from acquisition import AcquisitionPlan
+from adaptive import AdaptivePolling
 
 if __name__ == '__main__':
     sys.exit(1)
 
+# immutable snapshot of the module state, values in channel list order
+#   seq                    bumped at every publication (acquisition, edge, alarm, output)
+#   date_time              of the last acquisition
+#   monotonic              time.monotonic() of the last digital inputs polling
+#   acquired               time.monotonic() of the last acquisition, the pipeline latency start
+#   analog, one_wire       values
+#   digital                (status, status_ev)
+#   counters               PulseCounter reports (use_pc) or None
+#   relay, open_collector  status
+#   alarm                  alarm_cur
+#   read                   (section, id) acquired for this sample (acquisition.py), None all
+#   period                 polling interval in effect (adaptive.py), None fixed polling_time
+Sample = namedtuple('Sample', 'seq date_time monotonic acquired store analog digital counters one_wire relay open_collector alarm read period')
+SAMPLE_FIELDS = {name: index for index, name in enumerate(Sample._fields)}
+
 class IonoW1(Iono):
     """ Arpa iono main class """
+
+    # IO 1 -> AL_Door      -> alarm_cur Or 1
+    # IO 2 -> AL_Power     -> alarm_cur Or 256
+    # IO 3 -> AL_Temp      -> alarm_cur Or 16
+    # IO 4 -> AL_Door2     -> alarm_cur Or 2
+    # IO 5 -> AL_ProbeFlux -> alarm_cur Or 8
+    # IO 6 -> AL_ProbeTemp -> alarm_cur Or 4
+    #
+    # If AL_PowerSupply > 0 Then alarm_cur = alarm_cur Or 128 -> FREE
+    alarm_bits = {1: 1, 2: 256, 3: 16, 4: 2, 5: 8, 6: 4}
+
     def __init__(self, conf):
-        super().__init__(conf)
+        # validated configuration (a plain dict is compiled here)
+        settings = conf if isinstance(conf, Settings) else Settings(conf)
+
+        # pulse counters, ready before events are enabled
+        self.pulse_counters = {din['id']: PulseCounter() for din in self.digital_inputs}
+        self.din_index = {din['id']: index for index, din in enumerate(self.digital_inputs)}
+        self.bursts = {} # chattering inputs detectors, by id (burst.py)
+
+        super().__init__(settings.main)
 
         # set properties
-        self.conf = conf
+        self.conf = settings.main
+        self.settings = settings
 
         # temperature stuff
         self.decimals = 2
         self.data_temperature1 = []
         self.data_analogic1 = []
+        # acquisition times of the values (epoch seconds), time weighted aggregates
+        self.time_temperature1 = []
+        self.time_analogic1 = []
+        self.period_written = None # (data file, adaptive interval) of the last polling line
+        self.adaptive = None
 
         # alarm and messages flag
         self.alarm_cur = 0 # current alarm
         self.alarm_old = 0
-        self.alarm_counter = 0
+        self.alarm_counter = 0 # seconds since the alarm was sent (state file)
         self.alarm_sent = False
         self.alarm_door_sent = False
-        self.alarm_send_reset_delay = conf['reset_alarm_msg_dealy']
+        self.alarm_send_reset_delay = self.conf['reset_alarm_msg_dealy']
+        self.alarm_threads = [] # alarms being delivered
+        self.alarm_thread_setup = None # run first by the alarm threads (started by tuned threads)
+
+        # alarm state machine, fed by edges and reconciled by polling
+        self.alarm_lock = threading.RLock()
+        self.alarm_levels = {din['id']: None for din in self.digital_inputs} # None until the first polling
+        self.alarm_sent_at = None # time.monotonic() of the first alarm sent
+        self.alarm_reset_at = None # reset message deadline, checked by polling
+
+        # last published snapshot, readers take it without locking
+        # (one reference swap), writers - polling, GPIO and alarm - serialize
+        self.snapshot_lock = threading.Lock()
+        self.snapshot = None
+
+        # live data listeners - on_poll(module), on_edge(din, now), on_alarm(cur, old)
+        self.listeners = []
 
         # default configuration override
+        self.channel_defaults = {
+            'digital': {din['id']: {'name': din['name'], 'reverse': din['reverse'], 'hold': din['hold']} for din in self.digital_inputs},
+            'analog': {ain['id']: {'name': ain['name'], 'calibration': ain['calibration']} for ain in self.analog_inputs},
+            'one wire': {owi['id']: {'name': owi['name']} for owi in self.one_wire_inputs},
+        }
+        self.apply_settings(settings)
+        self.snapshot = self._build_sample(0, datetime.now(), False, None, None)
+
+        # count from the current level
         for din in self.digital_inputs:
-            # reverse
-            if self.conf['dr'+str(din['id'])] is not None:
-                logging.info("Override digital reverse %s:%s", din['id'], self.conf['dr'+str(din['id'])])
-                din['reverse'] = self.conf['dr'+str(din['id'])]
-            # name
-            if self.conf['dn'+str(din['id'])] is not None:
-                logging.info("Override digital name %s:%s", din['id'], self.conf['dn'+str(din['id'])])
-                din['name'] = self.conf['dn'+str(din['id'])]
-
-        # analog override
-        for din in self.analog_inputs:
-            # name
-            if self.conf['an'+str(din['id'])] is not None:
-                logging.info("Override analog name %s:%s", din['id'], self.conf['an'+str(din['id'])])
-                din['name'] = self.conf['an'+str(din['id'])]
-
-        # one wire override
-        for din in self.one_wire_inputs:
-            # name
-            if self.conf['1wn'+str(din['id'])] is not None:
-                logging.info("Override analog name %s:%s", din['id'], self.conf['1wn'+str(din['id'])])
-                din['name'] = self.conf['1wn'+str(din['id'])]
+            self.pulse_counters[din['id']].start(din['status_ev'])
+
+    def apply_settings(self, settings):
+        """ Apply a validated configuration, also while running """
+        logging.debug("Function apply_settings")
+
+        # channels, precompiled overrides (a removed override restores the default)
+        calibrated = False
+        reversed_dins = []
+        for label, channels, overrides in (('digital', self.digital_inputs, settings.digital_inputs),
+                                           ('analog', self.analog_inputs, settings.analog_inputs),
+                                           ('one wire', self.one_wire_inputs, settings.one_wire_inputs)):
+            for chn in channels:
+                override = overrides.get(chn['id'], {})
+                for field, default in self.channel_defaults[label][chn['id']].items():
+                    value = override.get(field, default)
+                    if chn[field] != value:
+                        logging.info("Override %s %s %s:%s", label, field, chn['id'], value)
+                        chn[field] = value
+                        calibrated = calibrated or field == 'calibration'
+                        if field == 'reverse':
+                            reversed_dins.append(chn)
+
+        # analog conversion tables
+        if calibrated and self.conf['use_ai']:
+            self._set_analog_tables()
+
+        # alarm sender
+        self.alarm_send_reset_delay = settings.main['reset_alarm_msg_dealy']
+
+        # row templates with the current channel names (ftp files stay tsv)
+        self.serializer = get_serializer(settings.main['data_format'], self)
+        self.ftp_serializer = TsvSerializer().compile(self)
+
+        # change only data files, a new filter starts with a keyframe
+        delta = None
+        if settings.main['data_delta']:
+            delta = DeltaFilter(settings.main['delta_keyframe'],
+                                {'analog': settings.main['delta_deadband_ai'], '1wire': settings.main['delta_deadband_1w']})
+        self.delta = delta
+
+        # edge burst detectors, kept (pending summaries) while their settings do not change
+        main = settings.main
+        if main['burst_edges'] is None:
+            self.bursts = {}
+        elif not self.bursts or (main['burst_edges'], main['burst_interval']) != (self.conf['burst_edges'], self.conf['burst_interval']):
+            self.bursts = {din['id']: EdgeBurst(main['burst_edges'], main['burst_interval'])
+                           for din in self.digital_inputs}
+
+        # per source acquisition periods, None all at polling_time
+        self.plan = AcquisitionPlan(settings.main, self) if settings.main['acquisition_plan'] else None
+
+        # adaptive polling interval, kept (current interval) while its settings do not change
+        keys = ('adaptive_fast', 'adaptive_slow', 'adaptive_rate_ai', 'adaptive_rate_1w', 'store_time')
+        if not main['adaptive_polling']:
+            self.adaptive = None
+        elif self.adaptive is None or any(main[key] != self.conf[key] for key in keys):
+            self.adaptive = AdaptivePolling(main)
+
+        # swap the whole configuration at once (scheduler and alarm sender read it)
+        self.settings = settings
+        self.conf = settings.main
+
+        # event status and pulse counters follow the new reverse (startup overrides too)
+        if reversed_dins and main['use_io'] and main['use_ev']:
+            self._reseed_digital_inputs(reversed_dins)
+
+    def _reseed_digital_inputs(self, dins):
+        """ Read the inputs again after a reverse change, not an edge """
+        logging.debug("Function _reseed_digital_inputs")
+        try:
+            with self.edge_lock:
+                for din in dins:
+                    level = self.get_digital_level(din)
+                    din['status_ev'] = level
+                    self.pulse_counters[din['id']].start(level)
+                    if self.snapshot is None:
+                        # startup, the first polling reads status
+                        continue
+                    din['status'] = level
+                    self._publish('digital', (level, level), self.din_index[din['id']])
+                    # alarm levels are polled levels, reversed as well
+                    with self.alarm_lock:
+                        if self.alarm_levels[din['id']] is not None:
+                            self.alarm_input(din['id'], level)
+
+        except Exception as ex:
+            logging.error("An exception was encountered in _reseed_digital_inputs: %s", str(ex))
+
+    def grid_time(self):
+        """ Seconds between polling ticks """
+        if self.plan is not None:
+            return self.plan.tick
+        if self.adaptive is not None:
+            return self.adaptive.fast
+        return self.conf['polling_time']
 
     def _mean(self, lst):
         """ Calculate mean """
         logging.debug("Calculating mean")
-        if not lst:
-            return float(None)
-
-        return float(sum(lst)) / len(lst)
+        return mean(lst)
 
     def _stddev(self, lst):
         """ Calculate standard deviation """
         logging.debug("Calculating standard deviation")
-        data_mean = self._mean(lst)
-        data_sum = 0
+        return stddev(lst)
+
+    def notify_listeners(self, event, *args):
+        """ Forward an event to live data listeners """
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception as ex:
+                logging.error("An exception was encountered in notify_listeners %s: %s", event, str(ex))
+
+    def _start_alarm(self, code):
+        """ Send alarm on its own thread """
+        # forget the delivered ones
+        self.alarm_threads = [thread for thread in self.alarm_threads if thread.is_alive()]
+        thread = threading.Thread(target=self._send_alarm, daemon=True, args=[code])
+        thread.start()
+        self.alarm_threads.append(thread)
+
+    def drain_alarms(self, timeout):
+        """ Wait for alarms being delivered, at most timeout seconds """
+        logging.debug("Function drain_alarms")
+        deadline = time.monotonic() + timeout
+        for thread in self.alarm_threads:
+            thread.join(max(0, deadline - time.monotonic()))
+            if thread.is_alive():
+                logging.warning("Alarm delivery still running at shutdown deadline")
+
+    def _state_file(self):
+        """ In memory state file name """
+        return os.path.join(self.conf['data_path'], self.conf['file_header']+".state")
+
+    def save_state(self):
+        """ Save in memory aggregates and alarm flags (shutdown) """
+        logging.debug("Function save_state")
+        try:
+            state = {
+                # store_time window the aggregates belong to
+                'window': int(unix_time(datetime.now()) / self.conf['store_time']),
+                'data_temperature1': self.data_temperature1,
+                'data_analogic1': self.data_analogic1,
+                'time_temperature1': self.time_temperature1,
+                'time_analogic1': self.time_analogic1,
+                'alarm_old': self.alarm_old,
+                'alarm_counter': self._alarm_elapsed(),
+                'alarm_sent': self.alarm_sent,
+            }
+            # write and rename, never leave a truncated file
+            file_name = self._state_file()
+            with open(file_name + ".tmp", "w") as file:
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(file_name + ".tmp", file_name)
+            logging.info("State saved to file %s", file_name)
+
+        except Exception as ex:
+            logging.error("An exception was encountered in save_state: %s", str(ex))
 
-        for item in lst:
-            data_sum += pow(item - data_mean, 2)
+    def load_state(self):
+        """ Reload in memory aggregates and alarm flags (startup) """
+        logging.debug("Function load_state")
+        try:
+            file_name = self._state_file()
+            if not os.path.exists(file_name):
+                return
+
+            with open(file_name, "r") as file:
+                state = json.load(file)
+            os.remove(file_name)
+
+            # alarm flags, no duplicated alarm message after a restart
+            self.alarm_old = state['alarm_old']
+            self.alarm_counter = state['alarm_counter']
+            self.alarm_sent = state['alarm_sent']
+            if self.alarm_sent:
+                # the reset message delay goes on from where it was
+                self.alarm_sent_at = time.monotonic() - self.alarm_counter
+
+            # aggregates, times missing in old state files
+            window = int(unix_time(datetime.now()) / self.conf['store_time'])
+            for name in ('temperature1', 'analogic1'):
+                state.setdefault('time_' + name, [None] * len(state['data_' + name]))
+            if state['window'] == window:
+                # same store_time window, go on collecting
+                logging.info("Reloading %s temperature and %s analogic values",
+                             len(state['data_temperature1']), len(state['data_analogic1']))
+                self.data_temperature1 = state['data_temperature1'] + self.data_temperature1
+                self.data_analogic1 = state['data_analogic1'] + self.data_analogic1
+                self.time_temperature1 = state['time_temperature1'] + self.time_temperature1
+                self.time_analogic1 = state['time_analogic1'] + self.time_analogic1
+            elif state['window'] == window - 1:
+                # we missed the store at the boundary, store now what we had
+                logging.info("Storing aggregates of the previous store window")
+                self.data_temperature1 = state['data_temperature1']
+                self.data_analogic1 = state['data_analogic1']
+                self.time_temperature1 = state['time_temperature1']
+                self.time_analogic1 = state['time_analogic1']
+                self.store_ced_data_csv()
+            else:
+                logging.info("Saved state belongs to an old store window, aggregates discarded")
 
-        return sqrt(float(data_sum) / (len(lst) - 1))
+        except Exception as ex:
+            logging.error("An exception was encountered in load_state: %s", str(ex))
 
-    def _send_alarm(self):
+    def _send_alarm(self, code):
         """ Send alarm to web server """
         logging.info("Function _send_alarm")
         try:
+            if self.alarm_thread_setup is not None:
+                self.alarm_thread_setup()
 
             # dump data to file
-            logging.info("Sending alarm to web server [%s]", str(self.alarm_cur))
+            logging.info("Sending alarm to web server [%s]", str(code))
 
             # build file_name
             logging.debug("Store alarm")
@@ -112,14 +354,15 @@ class IonoW1(Iono):
             # header
             row = now.strftime('%Y-%m-%d %H:%M:%S.%f') # datetime
             row += "\t"
-            row += str(self.alarm_cur) # self.alarm_cur
+            row += str(code) # alarm_cur when sent
             row += "\n"
             # dump data to file
             with open(file_name, "a") as file:
                 file.write(row)
 
-            # make HTTP request
-            url = self.conf['ws_url'] + str(self.alarm_cur)
+            # make HTTP request - requests is slow to import, load it on first alarm
+            import requests # pylint: disable=import-outside-toplevel
+            url = self.conf['ws_url'] + str(code)
             logging.debug("Url: %s ", url)
             req = requests.get(url)
             logging.debug("Result: %s ", req.status_code)
@@ -132,34 +375,106 @@ class IonoW1(Iono):
         except Exception as ex:
             logging.error("An exception was encountered in _send_alarm: %s", str(ex))
 
-    def append_ced_data_arrays(self):
+    def _build_sample(self, seq, date_time, store, read, period):
+        """ Snapshot of the channels """
+        use_pc = self.conf['use_pc']
+        return Sample(
+            seq,
+            date_time,
+            self.di_polled_at,
+            time.monotonic(),
+            store,
+            tuple(ain['value'] for ain in self.analog_inputs),
+            tuple((din['status'], din['status_ev']) for din in self.digital_inputs),
+            tuple(self.pulse_counters[din['id']].report() for din in self.digital_inputs) if use_pc else None,
+            tuple(owi['value'] for owi in self.one_wire_inputs),
+            tuple(rel['status'] for rel in self.relay_outputs),
+            tuple(opc['status'] for opc in self.open_collector_outputs),
+            self.alarm_cur,
+            read,
+            period,
+        )
+
+    def take_sample(self, date_time=None, store=False, read=None, period=None):
+        """ Acquisition done, publish and return its snapshot (polling and 1-Wire threads) """
+        with self.snapshot_lock:
+            sample = self._build_sample(self.snapshot.seq + 1, date_time or datetime.now(), store, read, period)
+            self.snapshot = sample
+        return sample
+
+    def _publish(self, field, value, index=None):
+        """ Publish the last snapshot with one field (or one item of it) changed - edges, alarm, outputs """
+        with self.snapshot_lock:
+            snapshot = self.snapshot
+            if snapshot is None:
+                # edge while still in the constructor, the first one is on its way
+                return
+            values = list(snapshot)
+            values[0] += 1
+            values[SAMPLE_FIELDS['store']] = False
+            position = SAMPLE_FIELDS[field]
+            if index is not None:
+                items = list(values[position])
+                items[index] = value
+                value = tuple(items)
+            values[position] = value
+            self.snapshot = Sample._make(values)
+
+    def set_relay_status(self, channel, status):
+        """ Set relay status, published """
+        super().set_relay_status(channel, status)
+        self._publish('relay', tuple(rel['status'] for rel in self.relay_outputs))
+
+    def set_open_collector_status(self, channel, status):
+        """ Set open collector status, published """
+        super().set_open_collector_status(channel, status)
+        self._publish('open_collector', tuple(opc['status'] for opc in self.open_collector_outputs))
+
+    def set_outputs(self, changes):
+        """ Set several outputs in one pass, published """
+        super().set_outputs(changes)
+        self._publish('relay', tuple(rel['status'] for rel in self.relay_outputs))
+        self._publish('open_collector', tuple(opc['status'] for opc in self.open_collector_outputs))
+
+    def append_ced_data_arrays(self, sample=None):
         """ Store new data into array """
         logging.debug("Function append_ced_data_arrays")
+        sample = sample or self.take_sample()
 
-        if self.conf['use_1w']:
+        # channels acquired with this sample only
+        read = sample.read
+        acquired_at = unix_time(sample.date_time) + sample.date_time.microsecond / 1000000.0
+
+        if self.conf['use_1w'] and (read is None or ('1wire', self.one_wire_inputs[0]['id']) in read):
             # get first
-            owi = self.one_wire_inputs[0]
-            if owi and owi['value']:
+            value = ced_value(sample.one_wire[0])
+            if value is not None:
                 # append data
-                logging.debug("Appending %s to temperature list", owi['value'])
-                self.data_temperature1.append(float(owi['value']))
+                logging.debug("Appending %s to temperature list", value)
+                self.data_temperature1.append(value)
+                self.time_temperature1.append(acquired_at)
 
-        if self.conf['use_ai']:
+        if self.conf['use_ai'] and (read is None or ('analog', self.analog_inputs[0]['id']) in read):
             # get first
-            ain = self.analog_inputs[0]
-            if ain and ain['value']:
+            value = ced_value(sample.analog[0])
+            if value is not None:
                 # append data
-                logging.debug("Appending %s to analogic list", ain['value'])
-                self.data_analogic1.append(float(ain['value']))
+                logging.debug("Appending %s to analogic list", value)
+                self.data_analogic1.append(value)
+                self.time_analogic1.append(acquired_at)
+
+    def _weights(self, times, now):
+        """ Seconds every value of the window stands for, None (plain figures) without times """
+        return window_weights(times, unix_time(now) + now.microsecond / 1000000.0, self.conf['store_time'])
 
-    def store_ced_data_csv(self):
+    def store_ced_data_csv(self, date_time=None):
         """ Store 1 wire collected data to csv file for ced """
         logging.debug("Function store_ced_data_csv")
 
         try:
 
-            # date time
-            now = datetime.now()
+            # date time, the store deadline when called by the pipeline
+            now = date_time or datetime.now()
 
             # build daily file_name
             file_name = os.path.join(
@@ -168,61 +483,36 @@ class IonoW1(Iono):
             ) # -%H%M
             logging.info("Saving data to file %s...", file_name)
 
-            if self.conf['use_1w']:
-                # get first
-                owi = self.one_wire_inputs[0]
-
-                # build row
-                logging.debug("Build record")
-                # date time
-                now = datetime.now()
-                # one hour back for timestamp
-                now = now - timedelta(hours=1)
-                # row
-                row = now.strftime('%Y-%m-%d %H:%M:00') + "\t"
-                # measure id for database
-                row += str(owi['dbid']) + "\t"
-                # average
-                row += str(round(float(self._mean(self.data_temperature1)), self.decimals)) + "\t"
-                # min
-                row += str(round(float(min(self.data_temperature1)), self.decimals)) + "\t"
-                # max
-                row += str(round(float(max(self.data_temperature1)), self.decimals)) + "\t"
-                # stddev
-                row += str(round(float(self._stddev(self.data_temperature1)), self.decimals)) + "\n"
-
-                # dump data to file
-                logging.debug("File row\n%s", row)
-                with open(file_name, "a") as file:
-                    file.write(row)
-
-            if self.conf['use_ai']:
-                # get first
-                ain = self.analog_inputs[0]
-
-                # build row
-                logging.debug("Build record")
-                # date time
-                now = datetime.now()
-                # one hour back for timestamp
-                now = now - timedelta(hours=1)
-                # row
-                row = now.strftime('%Y-%m-%d %H:%M:00') + "\t"
-                # measure id for database
-                row += str(ain['dbid']) + "\t"
-                # average
-                row += str(round(float(self._mean(self.data_analogic1)), self.decimals)) + "\t"
-                # min
-                row += str(round(float(min(self.data_analogic1)), self.decimals)) + "\t"
-                # max
-                row += str(round(float(max(self.data_analogic1)), self.decimals)) + "\t"
-                # stddev
-                row += str(round(float(self._stddev(self.data_analogic1)), self.decimals)) + "\n"
-
-                # dump data to file
-                logging.debug("File row\n%s", row)
-                with open(file_name, "a") as file:
-                    file.write(row)
+            # digital counters first, they do not depend on 1-Wire/analog data
+            if self.conf['use_pc']:
+                self.store_pulse_data_csv(now)
+
+            # one hour back for timestamp
+            date_time = (now - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:00')
+
+            rows = []
+            try:
+                if self.conf['use_1w']:
+                    # get first
+                    owi = self.one_wire_inputs[0]
+                    logging.debug("Build record")
+                    rows.append(self.ftp_serializer.ced_row(date_time, owi['dbid'], self.data_temperature1, self.decimals,
+                                                            self._weights(self.time_temperature1, now)))
+
+                if self.conf['use_ai']:
+                    # get first
+                    ain = self.analog_inputs[0]
+                    logging.debug("Build record")
+                    rows.append(self.ftp_serializer.ced_row(date_time, ain['dbid'], self.data_analogic1, self.decimals,
+                                                            self._weights(self.time_analogic1, now)))
+
+            finally:
+                # dump data to file, rows built before a failing one too
+                if rows:
+                    row = ''.join(rows)
+                    logging.debug("File row\n%s", row)
+                    with open(file_name, "a") as file:
+                        file.write(row)
 
             return True
 
@@ -235,100 +525,89 @@ class IonoW1(Iono):
             logging.info("Reset data array")
             self.data_temperature1 = []
             self.data_analogic1 = []
+            self.time_temperature1 = []
+            self.time_analogic1 = []
 
-    def store_data_csv(self):
-        """ Store all collected data to csv file """
-        logging.debug("Function store_data_csv")
+    def store_pulse_data_csv(self, date_time=None):
+        """ Store digital counters of the store window for ced, start a new window """
+        logging.debug("Function store_pulse_data_csv")
 
         try:
-
             # date time
-            now = datetime.now()
-
-            # empty row
-            row = ''
-            date_time = now.strftime('%Y-%m-%d %H:%M:%S') # datetime
-
-            if self.conf['use_ai']:
-                logging.debug("Looping through analog inputs")
-                row += "# analog inputs\n"
-                for ain in self.analog_inputs:
-                    logging.debug("Measure %s, id %s", ain['name'], ain['id'])
-
-                    # build row
-                    row += date_time + "\t"
-                    row += str(ain['id']) + "\t" # id
-                    if ain['value']:
-                        row += str(round(ain['value'], 2)) + "\t" # channel values in volts
-                    else:
-                        row += str(None) + "\t"
-                    row += str(ain['name']) + "\n" # channel name
-
-            if self.conf['use_io']:
-                logging.debug("Looping through digital inputs")
-                row += "# digital inputs\n"
-                row += "date\t\t\tid\tst\tst_ev\tname\n"
-                for din in self.digital_inputs:
-                    logging.debug("Measure %s, id %s", din['name'], din['id'])
-
-                    # build row
-                    row += date_time + "\t"
-                    row += str(din['id']) + "\t" # id for database
-                    row += str(din['status']) + "\t" # channel status 1|0
-                    row += str(din['status_ev']) + "\t" # event status 1|0
-                    row += str(din['name']) + "\n" # channel name
-
-            if self.conf['use_1w']:
-                logging.debug("Looping through 1wire inputs")
-                row += "# 1wire inputs\n"
-                for owi in self.one_wire_inputs:
-                    logging.debug("Measure %s, id %s", owi['name'], owi['id'])
-
-                    # build row
-                    row += date_time + "\t"
-                    row += str(owi['id']) + "\t" # measure id for database
-                    if owi['value']:
-                        row += str(round(owi['value'], 2)) + "\t" # channel value
-                    else:
-                        row += str(None) + "\t"
-                    row += str(owi['name']) + "\n" # channel name
-
-            if self.conf['use_ro']:
-                logging.debug("Looping through relay outputs")
-                row += "# relay outputs\n"
-                for rel in self.relay_outputs:
-                    logging.debug("Measure %s, id %s", rel['name'], rel['id'])
-
-                    # build row
-                    row += date_time + "\t"
-                    row += str(rel['id']) + "\t" # measure id for database
-                    row += str(rel['status']) + "\t" # channel status 1|0
-                    row += str(rel['name']) + "\n" # channel name
-
-            if self.conf['use_oc']:
-                logging.debug("Looping through open collector outputs")
-                row += "# open collector outputs\n"
-                for opc in self.open_collector_outputs:
-                    logging.debug("Measure %s, id %s", opc['name'], opc['id'])
-
-                    # build row
-                    row += date_time + "\t"
-                    row += str(opc['id']) + "\t" # measure id for database
-                    row += str(opc['status']) + "\t" # channel status 1|0
-                    row += str(opc['name']) + "\n" # channel name
+            now = date_time or datetime.now()
 
-            # build daily file_name
+            # build hourly file_name
             file_name = os.path.join(
-                self.conf['data_path'],
-                self.conf['file_header']+"_"+now.strftime('%Y-%m-%d')+".dat"
-            ) # .%H%M
+                self.conf['ftp_path'],
+                self.conf['file_header']+"_pulses_"+now.strftime('%Y-%m-%d-%H')+".dat"
+            )
+            logging.info("Saving pulses to file %s...", file_name)
+
+            # one hour back for timestamp
+            date_time = (now - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:00')
+
+            # dbid, id, rise, fall, on_s, duty, max_on_s, freq_hz
+            reports = [(din, self.pulse_counters[din['id']].report(reset=True)) for din in self.digital_inputs]
+            row = self.ftp_serializer.pulse_rows(date_time, reports)
 
             # dump data to file
-            logging.info("Saving data to file %s...", file_name)
             logging.debug("File row\n%s", row)
             with open(file_name, "a") as file:
                 file.write(row)
 
+        except Exception as ex:
+            logging.error("An exception was encountered in store_pulse_data_csv: %s", str(ex))
+
+    def store_data_csv(self, samples=None):
+        """ Store all collected data to csv file, samples waiting are written at once """
+        logging.debug("Function store_data_csv")
+
+        try:
+
+            # daily files, one write each
+            serializer = self.serializer
+            files = {}
+            delta = self.delta
+            for sample in samples or [self.take_sample()]:
+                now = sample.date_time
+
+                # build daily file_name
+                file_name = os.path.join(
+                    self.conf['data_path'],
+                    self.conf['file_header']+"_"+now.strftime('%Y-%m-%d')+serializer.extension
+                ) # .%H%M
+
+                # all enabled sections, timestamp of the acquisition formatted once
+                date_time = now.strftime('%Y-%m-%d %H:%M:%S')
+
+                # adaptive polling, interval when it changes (and in every new file)
+                row = ''
+                if sample.period is not None and (file_name, sample.period) != self.period_written:
+                    self.period_written = (file_name, sample.period)
+                    row = serializer.polling_row(date_time, sample.period)
+
+                if delta is None:
+                    # channels acquired with this sample (acquisition_plan)
+                    row += serializer.data_rows(self, date_time, sample, sample.read)
+                else:
+                    # changed channels only, all of them on keyframes
+                    only = delta.select(self, sample, unix_time(now), file_name)
+                    if only is None:
+                        row += serializer.keyframe_row(date_time, self.grid_time(), delta.keyframe_time)
+                        row += serializer.data_rows(self, date_time, sample)
+                    elif only:
+                        row += serializer.data_rows(self, date_time, sample, only)
+                if row:
+                    files.setdefault(file_name, []).append(row)
+
+            for file_name, rows in files.items():
+                # dump data to file
+                logging.info("Saving data to file %s...", file_name)
+                row = ''.join(rows)
+                logging.debug("File row\n%s", row)
+                with open(file_name, "a") as file:
+                    file.write(row)
+
             return True
 
         except Exception as ex:
@@ -338,7 +617,7 @@ class IonoW1(Iono):
     def parse_event(self, din):
         """ Parse event """
         # custom function for subclass to override on (_io_callback) event
-        logging.info("Function parse_event")
+        logging.debug("Function parse_event")
 
         try:
 
@@ -346,67 +625,54 @@ class IonoW1(Iono):
             logging.debug("GPIO %s, id %s, status %s",
                           din['name'], din['id'], din['status_ev'])
 
-            # IO 1 -> AL_Door      -> alarm_cur Or 1
-            # IO 2 -> AL_Power     -> alarm_cur Or 256
-            # IO 3 -> AL_Temp      -> alarm_cur Or 16
-            # IO 4 -> AL_Door2     -> alarm_cur Or 2
-            # IO 5 -> AL_ProbeFlux -> alarm_cur Or 8
-            # IO 6 -> AL_ProbeTemp -> alarm_cur Or 4
-            #
-            # If AL_PowerSupply > 0 Then alarm_cur = alarm_cur Or 128 -> FREE
-
-            if din['id'] == 1 and din['status_ev']: # Porta Aperta
-                self.alarm_cur = self.alarm_cur | 1
+            # pulse counters and duty cycle
+            self.pulse_counters[din['id']].edge(din['status_ev'], din['last_edge'])
 
-            elif din['id'] == 2 and din['status_ev']: # Mancanza alimentazione
-                self.alarm_cur = self.alarm_cur | 256
+            # readers see the edge
+            self._publish('digital', (din['status'], din['status_ev']), self.din_index[din['id']])
 
-            elif din['id'] == 3 and din['status_ev']: # Temperatura elevata
-                self.alarm_cur = self.alarm_cur | 16
-
-            elif din['id'] == 4 and din['status_ev']: # Porta 2 Aperta
-                self.alarm_cur = self.alarm_cur | 2
-
-            elif din['id'] == 5 and din['status_ev']: # Allarme flusso sonda
-                self.alarm_cur = self.alarm_cur | 8
+            # chattering inputs write one summary per interval (store_bursts)
+            now = datetime.now()
+            burst = self.bursts.get(din['id'])
+            result = RECORD if burst is None else burst.edge(din['status_ev'], din['last_edge'], now)
+            if result == RECORD:
+                # store event
+                self.store_event(din, now)
 
-            elif din['id'] == 6 and din['status_ev']: # Temperatura Testa
-                self.alarm_cur = self.alarm_cur | 4
+                # live data
+                self.notify_listeners('on_edge', din, now)
 
-            logging.debug("Current alarm: %s", self.alarm_cur)
+            elif result == STARTED:
+                logging.warning("Digital input %s chattering (more than %s edges in %s s), edges summarized",
+                                din['name'], burst.max_edges, burst.interval)
 
-            # store event
-            self.store_event(din)
+            # alarm straight away, not at the next polling
+            self.alarm_input(din['id'], din['status_ev'])
 
         except Exception as ex:
             logging.error("An exception was encountered in parse_event: %s", str(ex))
 
-    def store_event(self, din):
+    def store_event(self, din, now=None):
         """ Store digital input event to file """
-        logging.info("Function store_event")
+        logging.debug("Function store_event")
         try:
             logging.debug("Digital input %s", din)
 
             if not din is None:
 
-                now = datetime.now()
+                now = datetime.now() if now is None else now
                 # one hour back for timestamp
                 #now = now - timedelta(hours=1)
 
-                # empty row
-                row = ''
-
-                # build row
-                row += now.strftime('%Y-%m-%d %H:%M:%S.%f') + "\t"
-                row += str(din['id']) + "\t" # measure id for database
-                row += str(din['status_ev']) + "\t" # channel status 1|0
-                row += str(din['name']) + "\n" # channel name
+                # build row - id, status 1|0, name
+                serializer = self.serializer
+                row = serializer.event_row(din, now.strftime('%Y-%m-%d %H:%M:%S.%f'))
 
                 # build file_name
                 logging.debug("Build file name")
                 file_name = os.path.join(
                     self.conf['data_path'],
-                    self.conf['file_header']+"_events_"+now.strftime('%Y-%m-%d')+".dat"
+                    self.conf['file_header']+"_events_"+now.strftime('%Y-%m-%d')+serializer.extension
                 )
 
                 # dump data to file
@@ -418,95 +684,143 @@ class IonoW1(Iono):
         except Exception as ex:
             logging.error("An exception was encountered in store_event: %s", str(ex))
 
-    def analyze_alarm(self):
-        """ Analyse alarm and send it if needed """
-        logging.info("Function analyze_alarm")
+    def store_bursts(self, force=False):
+        """ Store the summaries of the chattering inputs, force writes the pending ones """
+        logging.debug("Function store_bursts")
         try:
+            now = time.monotonic()
+            rows = []
+            for din in self.digital_inputs:
+                burst = self.bursts.get(din['id'])
+                if burst is None or not burst.active:
+                    continue
+                summary = burst.flush(now, force)
+                if summary is None:
+                    continue
+                if summary.edges:
+                    rows.append(self.serializer.burst_row(din, summary, '%Y-%m-%d %H:%M:%S.%f'))
+                    logging.info("Digital input %s %s edges summarized, status %s", din['name'], summary.edges, summary.status)
+                if not burst.active and not force:
+                    logging.warning("Digital input %s calm again, edges stored", din['name'])
+
+            if rows:
+                file_name = os.path.join(
+                    self.conf['data_path'],
+                    self.conf['file_header']+"_events_"+datetime.now().strftime('%Y-%m-%d')+self.serializer.extension
+                )
+                with open(file_name, "a") as file:
+                    file.write(''.join(rows))
 
-            # self.alarm_cur = 0 # current alarm
-            # self.alarm_old = 0
-            # self.alarm_counter = 0
-            # self.alarm_sent = False
-            # self.alarm_door_sent = False
-
-            self.alarm_cur = 0
-
-            # IO 1 -> AL_Door      -> alarm_cur Or 1
-            # IO 2 -> AL_Power     -> alarm_cur Or 256
-            # IO 3 -> AL_Temp      -> alarm_cur Or 16
-            # IO 4 -> AL_Door2     -> alarm_cur Or 2
-            # IO 5 -> AL_ProbeFlux -> alarm_cur Or 8
-            # IO 6 -> AL_ProbeTemp -> alarm_cur Or 4
-
-            # to reverse set digital_inputs = [ 'reverse' : 0 ]
-            # in file iono.py lines 60-65
-
-            if self.digital_inputs[0]['status']: # AL_Door
-                self.alarm_cur = self.alarm_cur | 1
-
-            if self.digital_inputs[1]['status']: # AL_Power
-                self.alarm_cur = self.alarm_cur | 256
-
-            if self.digital_inputs[2]['status']: # AL_Temp
-                self.alarm_cur = self.alarm_cur | 16
-
-            if self.digital_inputs[3]['status']: # AL_Door2
-                self.alarm_cur = self.alarm_cur | 2
-
-            if self.digital_inputs[4]['status']: # AL_ProbeFlux
-                self.alarm_cur = self.alarm_cur | 8
-
-            if self.digital_inputs[5]['status']: # AL_ProbeTemp
-                self.alarm_cur = self.alarm_cur | 4
-
-            logging.debug("Current alarm: %s", self.alarm_cur)
-
-            # if we sent an alarm and now is ok and counter > 1 hour we send
-            # a reset message
-            if self.alarm_sent and self.alarm_cur == 0 and self.alarm_counter >= self.alarm_send_reset_delay:
-
-                # send http reset message as error = 0
-                logging.debug("******************** RESET ALARM **********************")
-                # send alarm
-                thread = threading.Thread(target=self._send_alarm, daemon=True)
-                thread.start()
-
-                # reset flags
-                self.alarm_sent = False
-                self.alarm_counter = 0
-                self.alarm_sent = False
+        except Exception as ex:
+            logging.error("An exception was encountered in store_bursts: %s", str(ex))
+
+    def _alarm_elapsed(self):
+        """ Seconds since the alarm was sent """
+        if self.alarm_sent_at is None:
+            return 0
+        return int(time.monotonic() - self.alarm_sent_at)
+
+    def alarm_input(self, din_id, level):
+        """ Digital input changed (edge), evaluate the alarm if it matters """
+        with self.alarm_lock:
+            if self.alarm_levels[din_id] == level:
+                return
+            self.alarm_levels[din_id] = level
+            self.evaluate_alarm()
+
+    def evaluate_alarm(self):
+        """ Alarm state machine, run on input changes and at the reset message deadline """
+        logging.info("Function evaluate_alarm")
+        try:
+            with self.alarm_lock:
+                # inputs not known before the first polling
+                if None in self.alarm_levels.values():
+                    return
+
+                # to reverse set digital_inputs = [ 'reverse' : 0 ]
+                # in file iono.py lines 60-65
+                self.alarm_cur = 0
+                for din_id, level in self.alarm_levels.items():
+                    if level:
+                        self.alarm_cur = self.alarm_cur | self.alarm_bits[din_id]
+
+                logging.debug("Current alarm: %s", self.alarm_cur)
+                sent = False
+
+                # if we sent an alarm and now is ok and reset_alarm_msg_dealy is over
+                # we send a reset message, otherwise the polling does it when over
+                self.alarm_reset_at = None
+                if self.alarm_sent and self.alarm_cur == 0:
+                    reset_at = self.alarm_sent_at + self.alarm_send_reset_delay
+                    if time.monotonic() >= reset_at:
+                        # send http reset message as error = 0
+                        logging.debug("******************** RESET ALARM **********************")
+                        self._start_alarm(self.alarm_cur)
+                        sent = True
+
+                        # reset flags
+                        self.alarm_sent = False
+                        self.alarm_sent_at = None
+                    else:
+                        self.alarm_reset_at = reset_at
 
-            # send open door alarm if any and still not sent
-            if (self.alarm_cur & 1) and not self.alarm_sent:
+                # send open door alarm if any and still not sent
+                if (self.alarm_cur & 1) and not self.alarm_sent:
+                    # send http stuff
+                    logging.debug("+++++++++++++++++++++ DOOR ALARM +++++++++++++++++++++")
+                    self._start_alarm(self.alarm_cur)
+                    sent = True
 
-                # set flag
-                self.alarm_sent = True
+                    # set flag message sent
+                    self.alarm_sent = True
 
-                # send http stuff
-                logging.debug("+++++++++++++++++++++ DOOR ALARM +++++++++++++++++++++")
-                thread = threading.Thread(target=self._send_alarm, daemon=True)
-                thread.start()
+                # send alarm if any new - not door alarm (once, door alarm included)
+                if self.alarm_cur > 1 and (self.alarm_cur != self.alarm_old) and not sent:
+                    # send http stuff
+                    logging.debug(">>>>>>>>>>>>>>>>>>>>>> NEW ALARM >>>>>>>>>>>>>>>>>>>>")
+                    self._start_alarm(self.alarm_cur)
 
-                # set flag message sent
-                self.alarm_sent = True
+                    # set flag
+                    self.alarm_sent = True
 
-            # send alarm if any new - not door alarm
-            if self.alarm_cur > 1 and (self.alarm_cur != self.alarm_old):
+                # reset message delay from the first alarm sent
+                if self.alarm_sent and self.alarm_sent_at is None:
+                    self.alarm_sent_at = time.monotonic()
+                self.alarm_counter = self._alarm_elapsed()
 
-                # send http stuff
-                logging.debug(">>>>>>>>>>>>>>>>>>>>>> NEW ALARM >>>>>>>>>>>>>>>>>>>>")
-                thread = threading.Thread(target=self._send_alarm, daemon=True)
-                thread.start()
+                # live data
+                if self.alarm_cur != self.alarm_old:
+                    self._publish('alarm', self.alarm_cur)
+                    self.notify_listeners('on_alarm', self.alarm_cur, self.alarm_old)
 
-                # set flag
-                self.alarm_sent = True
+                # swap values new/old
+                self.alarm_old = self.alarm_cur
 
-            # increment the counter if an alarm has been sent
-            if self.alarm_sent:
-                self.alarm_counter = self.alarm_counter + self.conf['polling_time'] # scan time
+        except Exception as ex:
+            logging.error("An exception was encountered in evaluate_alarm: %s", str(ex))
 
-            # swap values new/old
-            self.alarm_old = self.alarm_cur
+    def analyze_alarm(self, sample=None):
+        """ Reconcile the alarm inputs with the polled status (polling) """
+        logging.info("Function analyze_alarm")
+        try:
+            sample = sample or self.take_sample()
+            with self.alarm_lock:
+                changed = False
+                for din, (status, _) in zip(self.digital_inputs, sample.digital):
+                    # an edge newer than the polling is more recent than status
+                    if din['last_edge'] >= sample.monotonic:
+                        continue
+                    if self.alarm_levels[din['id']] != status:
+                        if self.alarm_levels[din['id']] is not None and self.conf['use_ev']:
+                            logging.warning("Missed edge on %s, status %s", din['name'], status)
+                            din['status_ev'] = status
+                            self._publish('digital', (status, status), self.din_index[din['id']])
+                        self.alarm_levels[din['id']] = status
+                        changed = True
+
+                # nothing changed, nothing to evaluate (but a reset message due)
+                if changed or (self.alarm_reset_at is not None and time.monotonic() >= self.alarm_reset_at):
+                    self.evaluate_alarm()
 
         except Exception as ex:
             logging.error("An exception was encountered in analyze_alarm: %s", str(ex))
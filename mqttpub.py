@@ -0,0 +1,389 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Mqtt publishing with store and forward
+#  File : mqttpub.py
+# ----------------------------------------------------------------------
+""" Mqtt publisher
+
+    Registered as an IonoW1 listener, publishes with qos 1 on
+
+      <mqtt_topic>/<file_header>/analog/<id>     {"time", "value", "name"}   every polling
+      <mqtt_topic>/<file_header>/digital/<id>    {"time", "status", "status_ev", "name"}
+      <mqtt_topic>/<file_header>/1wire/<id>      {"time", "value", "name"}
+      <mqtt_topic>/<file_header>/relay/<id>      {"time", "status", "name"}
+      <mqtt_topic>/<file_header>/oc/<id>         {"time", "status", "name"}
+      <mqtt_topic>/<file_header>/edge/<id>       {"time", "status_ev", "name"}  every edge
+      <mqtt_topic>/<file_header>/alarm           {"time", "alarm", "alarm_old", "codes"} retained
+      <mqtt_topic>/<file_header>/status          online | offline (will) retained
+      <mqtt_topic>/<file_header>/batch           [{"topic", "payload"}, ...]
+
+    Messages are sent by one thread. When more than 'mqtt_batch' are
+    waiting (slow link) they are packed into batch messages. While the
+    broker is unreachable they go to a bounded on disk spool (oldest
+    segments dropped past 'mqtt_spool_size' kB), replayed in order when
+    the link is back. Delivery is at least once, a message may arrive twice.
+
+    paho-mqtt is imported only when 'use_mqtt' is on. The link can be
+    replaced (see bench_stubs.FakeMqttLink) to test without a broker.
+"""
+import sys
+import os
+import json
+import math
+import time
+import queue
+import logging
+import threading
+from datetime import datetime
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# spool segment size (bytes)
+SEGMENT_SIZE = 64 * 1024
+
+def _clean(value):
+    """ Json does not know about nan """
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+class PahoLink:
+    """ Broker connection through paho-mqtt """
+
+    def __init__(self, host, port, user=None, password=None, client_id=None, will=None, timeout=5):
+        """ Constructor """
+        import paho.mqtt.client as mqtt # pylint: disable=import-outside-toplevel
+        self.mqtt = mqtt
+        self.timeout = timeout
+        try:
+            # paho-mqtt 2.x
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id or '', clean_session=False)
+        except AttributeError:
+            self.client = mqtt.Client(client_id=client_id or '', clean_session=False)
+        if user:
+            self.client.username_pw_set(user, password)
+        if will:
+            self.client.will_set(will[0], will[1], qos=1, retain=True)
+        self.client.reconnect_delay_set(1, 60)
+        # paho keeps reconnecting on its own network thread
+        self.client.connect_async(host, port, keepalive=60)
+        self.client.loop_start()
+
+    def is_connected(self):
+        """ Broker reachable """
+        return self.client.is_connected()
+
+    def publish(self, topic, payload, retain=False):
+        """ Publish with qos 1, return True when acknowledged """
+        if not self.client.is_connected():
+            return False
+        try:
+            info = self.client.publish(topic, payload, qos=1, retain=retain)
+            if info.rc != self.mqtt.MQTT_ERR_SUCCESS:
+                return False
+            info.wait_for_publish(self.timeout)
+            return info.is_published()
+        except (RuntimeError, ValueError) as ex:
+            logging.debug("Mqtt publish failed: %s", str(ex))
+            return False
+
+    def close(self):
+        """ Disconnect """
+        self.client.disconnect()
+        self.client.loop_stop()
+
+class Spool:
+    """ Bounded on disk message queue, json lines segments """
+
+    def __init__(self, path, max_bytes):
+        """ Constructor """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.current = None
+
+    def _segments(self):
+        """ Segment files, oldest first """
+        return sorted(name for name in os.listdir(self.path) if name.endswith('.jsonl'))
+
+    def append(self, messages):
+        """ Append [(topic, payload, retain)] """
+        with self.lock:
+            if self.current is None or os.path.getsize(os.path.join(self.path, self.current)) > SEGMENT_SIZE:
+                self.current = '%020d.jsonl' % time.time_ns()
+            with open(os.path.join(self.path, self.current), 'a') as file:
+                file.write(''.join(json.dumps(message) + '\n' for message in messages))
+            self._trim()
+
+    def prepend(self, messages):
+        """ Insert [(topic, payload, retain)] older than the spooled ones, in a segment of their own """
+        with self.lock:
+            segments = self._segments()
+            stamp = int(segments[0][:20]) - 1 if segments else time.time_ns()
+            with open(os.path.join(self.path, '%020d.jsonl' % stamp), 'w') as file:
+                file.write(''.join(json.dumps(message) + '\n' for message in messages))
+            self._trim()
+
+    def _trim(self):
+        """ Bounded, oldest first out """
+        segments = self._segments()
+        sizes = {name: os.path.getsize(os.path.join(self.path, name)) for name in segments}
+        total = sum(sizes.values())
+        while total > self.max_bytes and len(segments) > 1:
+            name = segments.pop(0)
+            total -= sizes[name]
+            os.remove(os.path.join(self.path, name))
+            logging.warning("Mqtt spool full, dropped segment %s", name)
+
+    def pending(self):
+        """ Messages waiting, a segment being replayed included """
+        with self.lock:
+            return bool(self._segments())
+
+    def oldest(self):
+        """ Oldest segment (name, [(topic, payload, retain)]) or None """
+        with self.lock:
+            segments = self._segments()
+            if not segments:
+                return None
+            name = segments[0]
+            if name == self.current:
+                # no more writes to a segment being replayed
+                self.current = None
+            messages = []
+            with open(os.path.join(self.path, name), 'r') as file:
+                for line in file:
+                    try:
+                        messages.append(tuple(json.loads(line)))
+                    except ValueError:
+                        # torn line of a power cut
+                        pass
+            return name, messages
+
+    def done(self, name, remaining=None):
+        """ Segment replayed, remaining messages kept for the next try """
+        with self.lock:
+            path = os.path.join(self.path, name)
+            if remaining:
+                with open(path + '.tmp', 'w') as file:
+                    file.write(''.join(json.dumps(message) + '\n' for message in remaining))
+                os.replace(path + '.tmp', path)
+            else:
+                os.remove(path)
+
+class MqttPublisher:
+    """ Mqtt listener with store and forward """
+
+    def __init__(self, conf, link=None, queue_size=1000):
+        """ Constructor """
+        logging.debug("Function MqttPublisher __init__")
+
+        self.base = conf['mqtt_topic'] + '/' + conf['file_header']
+        self.batch = conf['mqtt_batch']
+        self.spool = Spool(os.path.join(conf['data_path'], 'mqtt_spool'), conf['mqtt_spool_size'] * 1024)
+        self.queue = queue.Queue(maxsize=queue_size)
+        # queue and spool order: queued messages are newer than the spooled ones
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.topics = {} # (kind, id) -> topic
+        self.link = link or PahoLink(conf['mqtt_host'], conf['mqtt_port'], conf['mqtt_user'], conf['mqtt_password'],
+                                     client_id='pydas-' + conf['file_header'], will=(self.base + '/status', 'offline'))
+
+    def _topic(self, kind, ident=None):
+        """ Topic, built once """
+        key = (kind, ident)
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = self.base + '/' + kind + ('' if ident is None else '/' + str(ident))
+            self.topics[key] = topic
+        return topic
+
+    def _put(self, messages):
+        """ Queue messages for the sender, spool them when it lags behind """
+        with self.lock:
+            for idx, message in enumerate(messages):
+                try:
+                    self.queue.put_nowait(message)
+                except queue.Full:
+                    logging.warning("Mqtt queue full, spooling")
+                    # the queued ones are older, spooled first
+                    self.spool.append(self._drain() + messages[idx:])
+                    break
+        self.wake.set()
+
+    # listener interface
+
+    def on_poll(self, module):
+        """ New polling available """
+        logging.debug("Function MqttPublisher on_poll")
+        try:
+            conf = module.conf
+            # one consistent view of the published state
+            sample = module.snapshot
+            now = sample.date_time.strftime('%Y-%m-%d %H:%M:%S')
+            messages = []
+            if conf['use_ai']:
+                for ain, value in zip(module.analog_inputs, sample.analog):
+                    messages.append((self._topic('analog', ain['id']), json.dumps({'time': now, 'value': _clean(value), 'name': ain['name']}), False))
+            if conf['use_io']:
+                for din, (status, status_ev) in zip(module.digital_inputs, sample.digital):
+                    messages.append((self._topic('digital', din['id']), json.dumps({'time': now, 'status': status, 'status_ev': status_ev, 'name': din['name']}), False))
+            if conf['use_1w']:
+                for owi, value in zip(module.one_wire_inputs, sample.one_wire):
+                    messages.append((self._topic('1wire', owi['id']), json.dumps({'time': now, 'value': _clean(value), 'name': owi['name']}), False))
+            if conf['use_ro']:
+                for rel, status in zip(module.relay_outputs, sample.relay):
+                    messages.append((self._topic('relay', rel['id']), json.dumps({'time': now, 'status': status, 'name': rel['name']}), False))
+            if conf['use_oc']:
+                for opc, status in zip(module.open_collector_outputs, sample.open_collector):
+                    messages.append((self._topic('oc', opc['id']), json.dumps({'time': now, 'status': status, 'name': opc['name']}), False))
+            self._put(messages)
+
+        except Exception as ex:
+            logging.error("An exception was encountered in MqttPublisher on_poll: %s", str(ex))
+
+    def on_edge(self, din, now):
+        """ New digital input edge """
+        self._put([(self._topic('edge', din['id']),
+                    json.dumps({'time': now.strftime('%Y-%m-%d %H:%M:%S.%f'), 'status_ev': din['status_ev'], 'name': din['name']}), False)])
+
+    def on_alarm(self, alarm_cur, alarm_old):
+        """ Alarm changed """
+        codes = [1 << bit for bit in range(alarm_cur.bit_length()) if alarm_cur & (1 << bit)]
+        self._put([(self._topic('alarm'),
+                    json.dumps({'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'), 'alarm': alarm_cur, 'alarm_old': alarm_old, 'codes': codes}), True)])
+
+    # sender
+
+    def _pack(self, messages):
+        """ Pack messages into batch messages of self.batch each """
+        if len(messages) <= self.batch:
+            return messages
+        packed = []
+        for pos in range(0, len(messages), self.batch):
+            chunk = messages[pos:pos + self.batch]
+            payload = json.dumps([{'topic': topic, 'payload': json.loads(payload)} for topic, payload, _ in chunk])
+            # retained ones (alarm) also on their own topic, the last state matters
+            packed.append((self._topic('batch'), payload, False))
+            packed.extend(message for message in chunk if message[2])
+        return packed
+
+    def _send(self, messages):
+        """ Publish messages, return the ones not acknowledged """
+        for idx, (topic, payload, retain) in enumerate(messages):
+            if not self.link.publish(topic, payload, retain):
+                return messages[idx:]
+        return []
+
+    def _replay(self):
+        """ Replay the spool, return True when empty """
+        while True:
+            segment = self.spool.oldest()
+            if segment is None:
+                return True
+            name, messages = segment
+            logging.info("Mqtt replaying %s spooled messages", len(messages))
+            # spooled means the link was slow or down, send them packed
+            left = self._send(self._pack(messages))
+            if left:
+                # unpacked back, nothing lost on a partial batch
+                self.spool.done(name, self._unpack(left))
+                return False
+            self.spool.done(name)
+
+    def _unpack(self, messages):
+        """ Batch messages back to single messages """
+        single = []
+        batch_topic = self._topic('batch')
+        for topic, payload, retain in messages:
+            if topic == batch_topic:
+                single.extend((item['topic'], json.dumps(item['payload']), False) for item in json.loads(payload))
+            else:
+                single.append((topic, payload, retain))
+        return single
+
+    def _drain(self):
+        """ Get waiting messages """
+        messages = []
+        try:
+            while True:
+                messages.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
+
+    def _take(self, timeout):
+        """ Wait for messages, spool them behind the spooled ones if any
+
+            return the ones to send, older than whatever gets spooled later
+        """
+        self.wake.wait(timeout)
+        self.wake.clear()
+        with self.lock:
+            messages = self._drain()
+            if messages and self.spool.pending():
+                self.spool.append(messages)
+                return []
+        return messages
+
+    def _run(self):
+        """ Sender loop """
+        logging.debug("Function MqttPublisher _run")
+        online = False
+        while not self.stop_event.is_set():
+            try:
+                messages = self._take(1)
+
+                if self.link.is_connected() != online:
+                    online = not online
+                    logging.info("Mqtt broker %s", 'connected' if online else 'unreachable')
+                    if online:
+                        self.link.publish(self._topic('status'), 'online', True)
+
+                # keep the order, taken with an empty spool they are older than what got spooled since
+                if not online:
+                    if messages:
+                        self.spool.prepend(messages)
+                    continue
+
+                if messages:
+                    left = self._send(self._pack(messages))
+                    if left:
+                        self.spool.prepend(self._unpack(left))
+                        continue
+
+                self._replay()
+
+            except Exception as ex:
+                logging.error("An exception was encountered in MqttPublisher _run: %s", str(ex))
+
+    def start(self):
+        """ Start the sender thread """
+        logging.info("Starting mqtt publisher on %s", self.base)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5):
+        """ Stop the sender, what is left goes to the spool """
+        logging.debug("Function MqttPublisher stop")
+        try:
+            self.stop_event.set()
+            if self.thread:
+                self.thread.join(timeout)
+            with self.lock:
+                messages = self._drain()
+                if messages:
+                    self.spool.append(messages)
+            self.link.publish(self._topic('status'), 'offline', True)
+            self.link.close()
+
+        except Exception as ex:
+            logging.error("An exception was encountered in MqttPublisher stop: %s", str(ex))
@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Polling pipeline stages
+#  File : pipeline.py
+# ----------------------------------------------------------------------
+""" Polling pipeline
+
+    The polling thread only acquires: at every deadline it reads the
+    inputs and puts an immutable sample (iono_w1.Sample) in the stages
+
+      store      data file rows (store_data_csv), samples waiting are written at once
+      aggregate  ced arrays and hourly ced files (append_ced_data_arrays, store_ced_data_csv)
+      alarm      alarm reconciliation and live data listeners (analyze_alarm, on_poll)
+
+    Each stage has its own thread and a bounded queue. The polling thread
+    never waits for a stage: when a queue is full the oldest sample is
+    dropped and counted, so a slow sd card or web server never moves the
+    next deadline. Samples of a store boundary (Sample.store, they close
+    the hourly ced files) are never the ones dropped; with only those
+    waiting the polling thread waits for the stage, BOUNDARY_WAIT seconds
+    at most.
+"""
+import sys
+import time
+import queue
+import logging
+import threading
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+_STOP = object()
+
+# seconds a store boundary sample waits for room in a stage full of them
+BOUNDARY_WAIT = 5
+
+class Stage:
+    """ One consumer thread with a bounded queue """
+
+    def __init__(self, name, func, maxsize=16, batch=False):
+        """ Constructor - func(sample) or func([samples]) with batch """
+        self.name = name
+        self.func = func
+        self.batch = batch
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.thread = None
+        # accounting
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_backlog = 0
+        self.max_latency = 0.0 # seconds from acquisition to done
+
+    def _drop_oldest(self):
+        """ Drop the oldest sample not on a store boundary, False if none """
+        with self.queue.mutex:
+            waiting = self.queue.queue
+            for idx, item in enumerate(waiting):
+                if item is not _STOP and not item.store:
+                    del waiting[idx]
+                    self.queue.not_full.notify()
+                    return True
+        return False
+
+    def put(self, sample):
+        """ Queue a sample - the oldest one not on a store boundary is dropped when full """
+        while True:
+            try:
+                self.queue.put_nowait(sample)
+                break
+            except queue.Full:
+                if self._drop_oldest():
+                    self.dropped += 1
+                    logging.warning("Pipeline stage %s full, oldest sample dropped (%s dropped so far)", self.name, self.dropped)
+                    continue
+                if not sample.store:
+                    # store boundaries only waiting, they go first
+                    self.dropped += 1
+                    logging.warning("Pipeline stage %s full of store boundaries, sample dropped (%s dropped so far)", self.name, self.dropped)
+                    return
+                try:
+                    self.queue.put(sample, timeout=BOUNDARY_WAIT)
+                    break
+                except queue.Full:
+                    self.dropped += 1
+                    logging.error("Pipeline stage %s stuck, store boundary sample %s dropped", self.name, sample.date_time)
+                    return
+        self.max_backlog = max(self.max_backlog, self.queue.qsize())
+
+    def _take(self):
+        """ Next samples to process, None to stop """
+        item = self.queue.get()
+        if item is _STOP:
+            return None
+        items = [item]
+        if self.batch:
+            # back pressure, everything waiting goes out at once
+            try:
+                while True:
+                    item = self.queue.get_nowait()
+                    if item is _STOP:
+                        # put back, processed after this batch
+                        self.queue.put(_STOP)
+                        break
+                    items.append(item)
+            except queue.Empty:
+                pass
+        return items
+
+    def _run(self):
+        """ Consumer loop """
+        logging.debug("Function Stage _run - %s", self.name)
+        while True:
+            items = self._take()
+            if items is None:
+                return
+            try:
+                if self.batch:
+                    self.func(items)
+                else:
+                    for item in items:
+                        self.func(item)
+            except Exception as ex:
+                self.errors += 1
+                logging.error("An exception was encountered in pipeline stage %s: %s", self.name, str(ex))
+            self.processed += len(items)
+            self.max_latency = max(self.max_latency, time.monotonic() - items[0].acquired)
+
+    def start(self):
+        """ Start the consumer thread """
+        self.thread = threading.Thread(target=self._run, daemon=True, name='stage-' + self.name)
+        self.thread.start()
+
+    def stop(self, timeout):
+        """ Process what is queued and stop, at most timeout seconds """
+        deadline = time.monotonic() + timeout
+        try:
+            self.queue.put(_STOP, timeout=max(0.01, timeout))
+        except queue.Full:
+            logging.warning("Pipeline stage %s still full at shutdown", self.name)
+            return
+        if self.thread:
+            self.thread.join(max(0, deadline - time.monotonic()))
+            if self.thread.is_alive():
+                logging.warning("Pipeline stage %s still running at shutdown deadline", self.name)
+
+    def stats(self):
+        """ Accounting figures """
+        return {'queued': self.queue.qsize(), 'processed': self.processed, 'dropped': self.dropped,
+                'errors': self.errors, 'max_backlog': self.max_backlog, 'max_latency': round(self.max_latency, 3)}
+
+class Pipeline:
+    """ Fan out of samples to the stages """
+
+    def __init__(self, stages):
+        """ Constructor """
+        self.stages = stages
+
+    def put(self, sample):
+        """ New sample for every stage """
+        for stage in self.stages:
+            stage.put(sample)
+
+    def start(self):
+        """ Start the stages """
+        logging.info("Starting pipeline stages %s", ', '.join(stage.name for stage in self.stages))
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self, timeout):
+        """ Drain and stop the stages within timeout seconds """
+        logging.debug("Function Pipeline stop")
+        deadline = time.monotonic() + timeout
+        for stage in self.stages:
+            stage.stop(max(0, deadline - time.monotonic()))
+        self.log_stats()
+
+    def stats(self):
+        """ Accounting figures per stage """
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def log_stats(self):
+        """ Log the accounting figures """
+        for name, stats in self.stats().items():
+            logging.info("Pipeline stage %s: %s", name, ', '.join('%s %s' % item for item in stats.items()))
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Aggregate pydas --profile files
+#  File : profile_report.py
+# ----------------------------------------------------------------------
+""" Profile report
+
+    python3 profile_report.py [log] [--phase store] [--top 20] [--sort cumulative]
+
+    Aggregates every profile_*.prof and memory_*.json written by
+    pydas.py --profile in the folder, across restarts:
+
+      phases   sampled cycles and mean seconds per phase
+      cpu      pstats of all the windows, per phase
+      memory   traced memory over time and the allocation sites that kept growing
+"""
+import sys
+import os
+import re
+import glob
+import json
+import pstats
+import argparse
+from collections import defaultdict
+
+# profile_<YYYYmmdd-HHMMSS>_<phase>.prof
+PROFILE_FILE = re.compile(r'^profile_(?P<stamp>\d{8}-\d{6})_(?P<phase>.+)\.prof$')
+
+def load_memory(log_path):
+    """ Memory reports, oldest first """
+    reports = []
+    for path in sorted(glob.glob(os.path.join(log_path, 'memory_*.json'))):
+        try:
+            with open(path, 'r') as file:
+                reports.append(json.load(file))
+        except ValueError:
+            print("skipping truncated %s" % path)
+    return reports
+
+def phase_table(reports):
+    """ Sampled cycles and mean time per phase """
+    totals = defaultdict(lambda: [0, 0.0])
+    for report in reports:
+        for name, item in report.get('phases', {}).items():
+            totals[name][0] += item['cycles']
+            totals[name][1] += item['seconds']
+    print("%-10s %8s %12s" % ('phase', 'cycles', 'mean[ms]'))
+    for name, (cycles, seconds) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        print("%-10s %8s %12.3f" % (name, cycles, seconds / cycles * 1000 if cycles else 0))
+
+def cpu_report(log_path, only_phase, sort, top):
+    """ Aggregated pstats per phase """
+    files = defaultdict(list)
+    for path in sorted(glob.glob(os.path.join(log_path, 'profile_*.prof'))):
+        match = PROFILE_FILE.match(os.path.basename(path))
+        if match and (only_phase is None or match.group('phase') == only_phase):
+            files[match.group('phase')].append(path)
+    for name, paths in sorted(files.items()):
+        print("\n=== cpu %s (%s windows) ===" % (name, len(paths)))
+        stats = pstats.Stats(paths[0], stream=sys.stdout)
+        for path in paths[1:]:
+            stats.add(path)
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+
+def memory_report(reports, top):
+    """ Traced memory over time, steadily growing allocation sites """
+    print("\n=== memory ===")
+    print("%-20s %8s %12s %12s" % ('time', 'pid', 'current[kB]', 'peak[kB]'))
+    for report in reports:
+        print("%-20s %8s %12.1f %12.1f" % (report['time'], report['pid'], report['current'] / 1024, report['peak'] / 1024))
+
+    # growth summed over the windows, a leak grows in most of them
+    growth = defaultdict(lambda: [0, 0, 0, 0])
+    for report in reports:
+        for item in report['top']:
+            site = growth[item['where']]
+            site[0] += item['size_diff']
+            site[1] += item['count_diff']
+            site[2] += 1 if item['size_diff'] > 0 else 0
+            site[3] = item['size']
+    print("\n%12s %10s %8s %12s  where" % ('growth[kB]', 'count', 'windows', 'size[kB]'))
+    for where, (size_diff, count_diff, windows, size) in sorted(growth.items(), key=lambda item: -item[1][0])[:top]:
+        print("%12.1f %10s %8s %12.1f  %s" % (size_diff / 1024, count_diff, windows, size / 1024, where))
+
+def main():
+    """ Main function """
+    parser = argparse.ArgumentParser(description='Aggregate pydas --profile files')
+    parser.add_argument('log', nargs='?', default=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'log'), help='folder with the profile files')
+    parser.add_argument('--phase', default=None, help='cpu report of this phase only')
+    parser.add_argument('--sort', default='cumulative', help='pstats sort key')
+    parser.add_argument('--top', type=int, default=20, help='rows per table')
+    parser.add_argument('--no-cpu', action='store_true', help='skip the pstats tables')
+    args = parser.parse_args()
+
+    reports = load_memory(args.log)
+    if not reports:
+        print("No profile files in %s (run pydas.py --profile)" % args.log)
+        return 1
+
+    phase_table(reports)
+    if not args.no_cpu:
+        cpu_report(args.log, args.phase, args.sort, args.top)
+    memory_report(reports, args.top)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
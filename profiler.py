@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Poll cycle profiling for long running stations
+#  File : profiler.py
+# ----------------------------------------------------------------------
+""" Poll cycle profiling (pydas.py --profile)
+
+    One run out of 'every' of each phase (read, store, alarm, notify, ced)
+    is profiled with cProfile, one profile per phase - phases run on the
+    polling thread and on the pipeline stage threads. tracemalloc keeps
+    one frame per allocation. Every 'dump' cycles the log folder gets
+
+      profile_<YYYYmmdd-HHMMSS>_<phase>.prof   pstats of the window (pstats.Stats friendly)
+      memory_<YYYYmmdd-HHMMSS>.json            traced memory and top allocation diffs
+
+    and only the last 'keep' dumps are kept. profile_report.py aggregates them.
+
+    phase(name) and begin_cycle()/end_cycle() do nothing when profiling is off.
+"""
+import sys
+import os
+import glob
+import json
+import time
+import cProfile
+import logging
+import threading
+import contextlib
+import tracemalloc
+from datetime import datetime
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# set by pydas.py --profile
+PROFILER = None
+
+_NOTHING = contextlib.nullcontext()
+
+# allocations of the profiling machinery itself
+_IGNORE = (tracemalloc.Filter(False, tracemalloc.__file__),
+           tracemalloc.Filter(False, cProfile.__file__),
+           tracemalloc.Filter(False, __file__),
+           tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+           tracemalloc.Filter(False, '<unknown>'))
+
+class CycleProfiler:
+    """ Sampled per phase cProfile and tracemalloc diffs """
+
+    def __init__(self, log_path, every=10, dump=120, keep=48, top=25, frames=1):
+        """ Constructor """
+        logging.debug("Function CycleProfiler __init__")
+
+        self.log_path = log_path
+        self.every = every
+        self.dump_cycles = dump
+        self.keep = keep
+        self.top = top
+        self.cycle = 0
+        self.lock = threading.Lock()
+        self.calls = {}         # phase -> runs so far
+        self.profiles = {}      # phase -> cProfile.Profile of the window
+        self.times = {}         # phase -> [sampled cycles, seconds]
+        self.snapshot = None    # previous tracemalloc snapshot
+        os.makedirs(log_path, exist_ok=True)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+
+    def begin_cycle(self):
+        """ New polling cycle """
+        self.cycle += 1
+
+    def end_cycle(self):
+        """ Polling cycle done, dump every dump_cycles """
+        if self.cycle % self.dump_cycles == 0:
+            self.dump()
+
+    @contextlib.contextmanager
+    def _profile(self, name):
+        """ Profile a phase """
+        with self.lock:
+            profile = self.profiles.get(name)
+            if profile is None:
+                profile = self.profiles[name] = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+        except ValueError:
+            # another phase is being profiled on another thread (single profiler pythons)
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self.lock:
+                stats = self.times.setdefault(name, [0, 0.0])
+                stats[0] += 1
+                stats[1] += time.perf_counter() - start
+
+    def phase(self, name):
+        """ Context manager, profiles one run out of every of the phase """
+        with self.lock:
+            calls = self.calls[name] = self.calls.get(name, 0) + 1
+        return self._profile(name) if calls % self.every == 0 else _NOTHING
+
+    def _rotate(self):
+        """ Keep the last keep dumps """
+        stamps = sorted({os.path.basename(path)[len('memory_'):-len('.json')]
+                         for path in glob.glob(os.path.join(self.log_path, 'memory_*.json'))})
+        for stamp in stamps[:-self.keep]:
+            for path in glob.glob(os.path.join(self.log_path, '*_' + stamp + '*')):
+                os.remove(path)
+
+    def dump(self):
+        """ Write the window profiles and the memory diff """
+        logging.debug("Function CycleProfiler dump")
+        try:
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+
+            # cpu, one pstats file per phase
+            with self.lock:
+                profiles, times = self.profiles, self.times
+                self.profiles = {}
+                self.times = {}
+            for name, profile in profiles.items():
+                profile.dump_stats(os.path.join(self.log_path, 'profile_' + stamp + '_' + name + '.prof'))
+            phases = {name: {'cycles': count, 'seconds': round(seconds, 6)} for name, (count, seconds) in times.items()}
+
+            # memory, growth since the previous dump
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+            current, peak = tracemalloc.get_traced_memory()
+            top = []
+            for stat in snapshot.compare_to(self.snapshot, 'lineno')[:self.top]:
+                frame = stat.traceback[0]
+                top.append({'where': '%s:%s' % (frame.filename, frame.lineno),
+                            'size': stat.size, 'size_diff': stat.size_diff,
+                            'count': stat.count, 'count_diff': stat.count_diff})
+            self.snapshot = snapshot
+
+            report = {'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'pid': os.getpid(),
+                      'cycle': self.cycle, 'every': self.every, 'current': current, 'peak': peak,
+                      'phases': phases, 'top': top}
+            with open(os.path.join(self.log_path, 'memory_' + stamp + '.json'), 'w') as file:
+                json.dump(report, file, indent=1)
+
+            self._rotate()
+            logging.info("Profile dumped, traced memory %.1f kB (peak %.1f kB)", current / 1024, peak / 1024)
+
+        except Exception as ex:
+            logging.error("An exception was encountered in CycleProfiler dump: %s", str(ex))
+
+def phase(name):
+    """ Profile a polling phase when --profile is on """
+    if PROFILER is None:
+        return _NOTHING
+    return PROFILER.phase(name)
+
+def begin_cycle():
+    """ New polling cycle """
+    if PROFILER is not None:
+        PROFILER.begin_cycle()
+
+def end_cycle():
+    """ Polling cycle done """
+    if PROFILER is not None:
+        PROFILER.end_cycle()
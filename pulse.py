@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+# pylint: disable=line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Pulse counting and duty cycle for digital inputs
+#  File : pulse.py
+# ----------------------------------------------------------------------
+""" Pulse counter
+
+    One PulseCounter per digital input, fed with debounced edges
+    (level 1 = on/open, after reverse). Every edge is O(1), nothing is
+    stored per edge. report() gives the store window figures:
+
+      rise, fall   edges counted
+      on_time      seconds spent on (open) in the window
+      duty         on_time / window length
+      longest_on   longest on (open) interval seen, still open ones included
+      frequency    rising edges per second
+"""
+import sys
+import time
+import threading
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+class PulseCounter:
+    """ Edge counter for one digital input """
+
+    def __init__(self, level=0, now=None):
+        """ Constructor """
+        self.lock = threading.Lock()
+        self.start(level, now)
+
+    def start(self, level, now=None):
+        """ Start counting from level """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.level = level
+            self.since = now          # last level change
+            self.window_start = now
+            self.rise = 0
+            self.fall = 0
+            self.on_time = 0.0        # closed on intervals in the window
+            self.longest_on = 0.0
+
+    def edge(self, level, now):
+        """ Debounced edge, level after the edge """
+        with self.lock:
+            if level == self.level:
+                return
+            if self.level:
+                # on interval closed
+                self.on_time += now - max(self.since, self.window_start)
+                self.longest_on = max(self.longest_on, now - self.since)
+                self.fall += 1
+            else:
+                self.rise += 1
+            self.level = level
+            self.since = now
+
+    def report(self, now=None, reset=False):
+        """ Window figures, reset starts a new window """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            on_time = self.on_time
+            longest_on = self.longest_on
+            if self.level:
+                # interval still open
+                on_time += now - max(self.since, self.window_start)
+                longest_on = max(longest_on, now - self.since)
+            window = now - self.window_start
+            result = {
+                'rise': self.rise,
+                'fall': self.fall,
+                'on_time': on_time,
+                'duty': on_time / window if window > 0 else float(self.level),
+                'longest_on': longest_on,
+                'frequency': self.rise / window if window > 0 else 0.0,
+            }
+            if reset:
+                self.window_start = now
+                self.rise = 0
+                self.fall = 0
+                self.on_time = 0.0
+                self.longest_on = 0.0
+            return result
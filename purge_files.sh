@@ -3,6 +3,11 @@
 # Description : purge old files
 # Version 1
 
+# lowest cpu and disk priority, the acquisition goes first (children inherit it)
+renice -n 19 -p $$ > /dev/null
+ionice -c 3 -p $$ > /dev/null 2>&1
+chrt --idle -p 0 $$ > /dev/null 2>&1
+
 echo "analizzo $HOME/bin/pydas/log/*.log"
 find $HOME/bin/pydas/log/ -name '*.log' -mtime +120 -type f -exec rm -vr {} \;
 find $HOME/bin/pydas/log/ -name '*log*' -mtime +120 -type f -exec rm -vr {} \;
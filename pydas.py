@@ -18,21 +18,165 @@
     python3 ~./bin/pydas/pydas.py
 """
 import os
+import argparse
 import logging
 import logging.handlers
 import platform
 import time
+import signal
 from datetime import datetime
 import threading
 # custom
 from functions import create_log, clear_screen, unix_time
 from iono_w1 import IonoW1
-import config
+from pipeline import Pipeline, Stage
+from acquisition import OneWireReader, read_set
+from settings import ConfigError, ConfigManager, load_settings
+import profiler
+import rtsched
+from profiler import phase
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'config.py')
+SIGNALS = {signal.SIGTERM, signal.SIGINT, signal.SIGHUP}
+
+def store_stage(module, samples):
+    """ Pipeline stage, data file rows of the samples waiting """
+    with phase('store'):
+        # store values to csv file
+        module.store_data_csv(samples)
+
+        # chattering inputs summaries
+        module.store_bursts()
+
+def aggregate_stage(module, sample):
+    """ Pipeline stage, ced aggregates """
+    if sample.store:
+        # new mean, before the sample of the boundary is appended
+        with phase('ced'):
+            module.store_ced_data_csv(sample.date_time)
+
+    # append new data to make later mean on store_time
+    # needed by store_ced_data_csv() function
+    module.append_ced_data_arrays(sample)
+
+def alarm_stage(module, sample):
+    """ Pipeline stage, alarm and live data """
+    # analyse current alarm
+    with phase('alarm'):
+        module.analyze_alarm(sample)
+
+    # live data
+    with phase('notify'):
+        module.notify_listeners('on_poll', module)
+
+def create_pipeline(module, conf):
+    """ Stages fed by the polling thread """
+    size = conf['pipeline_queue']
+    return Pipeline([
+        Stage('store', lambda samples: store_stage(module, samples), size, batch=True),
+        Stage('aggregate', lambda sample: aggregate_stage(module, sample), size),
+        Stage('alarm', lambda sample: alarm_stage(module, sample), size),
+    ])
+
+def poll(module, conf, pipeline=None, store=False, due=None, one_wire=None):
+    """ Single polling, store also closes the ced aggregates
+
+        due (acquisition.Due) reads the sources of a tick only, 1-Wire by one_wire (OneWireReader)
+    """
+    if due is None:
+        # new polling
+        logging.info("--- New polling ---")
+
+        #
+        # arpa stations
+        #
+        with phase('read'):
+            if conf['use_ai']:
+                module.get_analog_input()
+
+            if conf['use_io']:
+                module.get_digital_input()
+
+            if conf['use_1w']:
+                module.get_one_wire_input()
+
+            # adaptive polling, interval from the values just read
+            period = module.adaptive.update(module, time.monotonic()) if module.adaptive else None
+
+            sample = module.take_sample(store=store, period=period)
+
+    else:
+        # acquisition_plan, sources due at this tick
+        if due.base:
+            logging.info("--- New polling ---")
+
+        with phase('read'):
+            if conf['use_1w'] and due.one_wire:
+                # conversions on their own thread, sample of its own
+                one_wire.request(due.one_wire, datetime.now())
+
+            if conf['use_ai'] and due.analog:
+                module.get_analog_input(due.analog)
 
-def polling(module, conf):
+            if conf['use_io'] and (due.digital or due.base):
+                module.get_digital_input()
+
+            read = read_set(module, due)
+            if not read and not store:
+                return
+            sample = module.take_sample(store=store, read=read)
+
+    process(module, sample, pipeline)
+
+def process(module, sample, pipeline=None):
+    """ Store, aggregate and alarm stages of a sample """
+    if pipeline is None:
+        # no stage threads, one stage after the other
+        store_stage(module, [sample])
+        aggregate_stage(module, sample)
+        alarm_stage(module, sample)
+    else:
+        # hand over, never waits for the stages
+        pipeline.put(sample)
+
+def seconds_to_next(conf, tick=None):
+    """ Seconds to the next polling (tick) or store boundary """
+    tick = tick or conf['polling_time']
+    now = datetime.now()
+    ptime = unix_time(now) + now.microsecond / 1000000.0
+    to_poll = tick - ptime % tick
+    to_store = conf['store_time'] - ptime % conf['store_time']
+    # wake up just after the boundary
+    return min(to_poll, to_store) + 0.01
+
+def polling(module, stop, pipeline=None, jitter=None):
     """ polling """
     logging.debug("Function polling")
-    while True:
+
+    # configuration is read from the module at every cycle (hot reload)
+    conf = module.conf
+
+    # real time priority, nice level, cpu affinity
+    rtsched.tune_thread(conf, 'polling')
+
+    # 1-Wire conversions of the acquisition plan
+    one_wire = OneWireReader(module, lambda sample: process(module, sample, pipeline))
+
+    # first polling straight away, do not wait for the next polling_time
+    # boundary - a restart must leave the smallest possible gap
+    last_poll = None
+    last_store = None
+    if conf['first_poll_now']:
+        last_poll = unix_time(datetime.now())
+        poll(module, conf, pipeline)
+
+    # stop is checked between cycles only, a cycle is never cut in half
+    while not stop.is_set():
+        conf = module.conf
+        # per source periods, ticks at their common divisor - adaptive polling at the fast interval
+        plan = module.plan
+        adaptive = module.adaptive
+        tick = module.grid_time()
 
         # check for mean
         now = datetime.now()
@@ -40,19 +184,26 @@ def polling(module, conf):
         # get the total seconds
         ptime = unix_time(now)
 
+        # --profile, one cycle per boundary
+        profiler.begin_cycle()
+
         # check for new mean
-        if int(ptime / conf['store_time']) == (ptime / conf['store_time']):
-            # new mean
+        store = False
+        if int(ptime / conf['store_time']) == (ptime / conf['store_time']) and ptime != last_store:
+            # new mean, closed by the aggregate stage with the sample of this boundary
             logging.info("*** New mean ***")
+            last_store = ptime
+            store = True
+            if pipeline:
+                pipeline.log_stats()
+            for stats in (jitter, module.edge_latency):
+                if stats:
+                    stats.log_report()
+            if conf['use_1w']:
+                module.log_one_wire_health()
 
-            # store values to csv file
-            module.store_ced_data_csv()
-
-        # check for new polling
-        if int(ptime / conf['polling_time']) == (ptime / conf['polling_time']):
-
-            # new polling
-            logging.info("--- New polling ---")
+        # check for new polling, a new mean always comes with a sample
+        if (store or int(ptime / tick) == (ptime / tick)) and ptime != last_poll:
 
             # # switch led on
             # #module.set_led_status(True)
@@ -84,39 +235,95 @@ def polling(module, conf):
             # #module.set_relay_status(1, False)
             # #module.set_open_collector_status(1, False)
 
-            #
-            # arpa stations
-            #
-            if conf['use_ai']:
-                module.get_analog_input()
-
-            if conf['use_io']:
-                module.get_digital_input()
-
-            if conf['use_1w']:
-                module.get_one_wire_input()
-
-            # append new data to make later mean on store_time
-            # needed by store_ced_data_csv() function
-            module.append_ced_data_arrays()
-
-            # store values to csv file
-            module.store_data_csv()
-
-            # analyse current alarm
-            module.analyze_alarm()
-
-            # wait to avoid further calls in the same second
-            time.sleep(1.5)
-
-        # sleep
-        time.sleep(0.1)
+            if adaptive is None or store or adaptive.due(ptime, module.alarm_cur):
+                last_poll = ptime
+                poll(module, conf, pipeline, store, plan.due(ptime) if plan else None, one_wire)
+
+        profiler.end_cycle()
+
+        # sleep until the next boundary or until asked to stop
+        wait = seconds_to_next(conf, tick)
+        wake_at = time.monotonic() + wait
+        stop.wait(wait)
+        if jitter and not stop.is_set():
+            jitter.add(time.monotonic() - wake_at)
+
+    # last 1-Wire sample in the stages
+    one_wire.join(conf['shutdown_timeout'])
+    logging.info("Polling stopped")
+
+def wait_for_signal(stop):
+    """ Block the main thread until SIGTERM, SIGINT or SIGHUP, return it """
+    if hasattr(signal, 'pthread_sigmask'):
+        # signals are blocked before any thread is started (threads inherit
+        # the mask) and collected here, no handler runs in the middle of a write
+        signum = signal.sigwait(SIGNALS)
+    else:
+        # fallback, handlers just record the signal
+        received = []
+        def handler(signum, frame): # pylint: disable=unused-argument
+            received.append(signum)
+            stop.set()
+        for sig in SIGNALS:
+            signal.signal(sig, handler)
+        while not stop.wait(1):
+            pass
+        signum = received[0] if received else signal.SIGTERM
+
+    logging.info("Signal %s received", signal.Signals(signum).name)
+    return signum
+
+def shutdown(module, main_thread, conf, pipeline=None):
+    """ Graceful shutdown within conf['shutdown_timeout'] seconds """
+    logging.info("Shutting down...")
+    deadline = time.monotonic() + conf['shutdown_timeout']
+
+    # the polling thread finishes its current cycle (pending writes)
+    if main_thread:
+        main_thread.join(max(0, deadline - time.monotonic()))
+        if main_thread.is_alive():
+            logging.warning("Polling thread still running at shutdown deadline")
+
+    # samples already acquired are written
+    if pipeline:
+        pipeline.stop(max(0, deadline - time.monotonic()))
+
+    if module:
+        # edges still being summarized
+        module.store_bursts(force=True)
+        # alarms being delivered
+        module.drain_alarms(max(0, deadline - time.monotonic()))
+        # in memory aggregates, reloaded at next start
+        module.save_state()
+
+def parse_args():
+    """ Command line """
+    parser = argparse.ArgumentParser(description='Iono Pi data acquisition')
+    parser.add_argument('--profile', action='store_true', help='profile polling cycles into log/ (see profile_report.py)')
+    parser.add_argument('--profile-every', type=int, default=10, help='profile one polling cycle out of N')
+    parser.add_argument('--profile-dump', type=int, default=120, help='write profile and memory files every N cycles')
+    parser.add_argument('--profile-keep', type=int, default=48, help='profile dumps kept in log/')
+    args = parser.parse_args()
+    if min(args.profile_every, args.profile_dump, args.profile_keep) < 1:
+        parser.error("--profile-every, --profile-dump and --profile-keep must be positive")
+    return args
 
 def main():
     """ Main function """
+    args = parse_args()
     module = None
+    server = None
+    commands = None
+    publisher = None
+    pipeline = None
+    main_thread = None
+    stop = threading.Event()
     try:
 
+        # block signals before starting any thread, the main thread collects them
+        if hasattr(signal, 'pthread_sigmask'):
+            signal.pthread_sigmask(signal.SIG_BLOCK, SIGNALS)
+
         # Clear
         clear_screen()
 
@@ -127,37 +334,109 @@ def main():
         now = datetime.now()
         logging.info("Program start @ %s on %s", now.strftime("%Y-%m-%d %H:%M:%S"), platform.system())
 
+        # periodic cProfile and tracemalloc snapshots
+        if args.profile:
+            log_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'log')
+            profiler.PROFILER = profiler.CycleProfiler(log_path, args.profile_every, args.profile_dump, args.profile_keep)
+            logging.info("Profiling one cycle out of %s, dump every %s cycles", args.profile_every, args.profile_dump)
+
+        # validated configuration
+        settings = load_settings(CONFIG_FILE)
+        conf = settings.main
+
+        # in ram before any thread is started
+        if conf['rt_mlock']:
+            rtsched.lock_memory()
+
         # path
         data_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data')
         if not os.path.exists(data_path):
             os.mkdir(data_path)
-        config.main['data_path'] = data_path
+        conf['data_path'] = data_path
 
         ftp_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'ftp')
         if not os.path.exists(ftp_path):
             os.mkdir(ftp_path)
-        config.main['ftp_path'] = ftp_path
+        conf['ftp_path'] = ftp_path
 
         # create main module object
         logging.info("Creating main iono object...")
-        module = IonoW1(config.main)
+        module = IonoW1(settings)
+
+        # reload in memory aggregates saved at last shutdown
+        module.load_state()
+
+        # edge thread tuned like the polling one, alarm senders back to default
+        if conf['rt_policy'] or conf['rt_nice'] is not None or conf['rt_cpus']:
+            module.edge_thread_setup = lambda: rtsched.tune_thread(module.conf, 'edges')
+            module.alarm_thread_setup = rtsched.reset_thread
+        if conf['di_backend'] == 'gpiochip':
+            module.edge_latency = rtsched.JitterStats('edge latency')
+        jitter = rtsched.JitterStats('polling wake up')
+
+        # live data http api
+        if conf['use_api']:
+            from webapi import LiveData, LiveDataServer # pylint: disable=import-outside-toplevel
+            live = LiveData(conf['api_history'])
+            module.listeners.append(live)
+            server = LiveDataServer(live, conf['api_host'], conf['api_port'])
+            server.start()
+
+        # relay and open collector commands
+        if conf['use_cmd']:
+            from cmdserver import CommandServer # pylint: disable=import-outside-toplevel
+            commands = CommandServer(module, conf['cmd_socket'])
+            commands.start()
+
+        # mqtt publishing with store and forward
+        if conf['use_mqtt']:
+            from mqttpub import MqttPublisher # pylint: disable=import-outside-toplevel
+            publisher = MqttPublisher(conf)
+            module.listeners.append(publisher)
+            publisher.start()
+
+        # hot reload, SIGHUP or config.py changed
+        manager = ConfigManager(CONFIG_FILE, module, settings)
+        if conf['config_watch']:
+            threading.Thread(target=manager.watch, daemon=True, args=[stop, conf['config_watch']]).start()
+
+        # writers, aggregates and alarms off the polling thread
+        pipeline = create_pipeline(module, conf)
+        pipeline.start()
 
         # start main loop
         logging.info("Starting main thread")
-        main_thread = threading.Thread(target=polling, daemon=True, args=[module, config.main])
+        main_thread = threading.Thread(target=polling, daemon=True, args=[module, stop, pipeline, jitter])
         main_thread.start()
 
-        # loop forever waiting for user ctrl+c to exit
-        while True:
-            time.sleep(0.1)
+        # wait for stop_pydas.sh (SIGTERM) or ctrl+c (SIGINT), SIGHUP reloads config.py
+        while wait_for_signal(stop) == signal.SIGHUP:
+            manager.reload('SIGHUP')
 
+    except ConfigError as ex:
+        logging.critical("Invalid configuration: %s", str(ex))
     except KeyboardInterrupt:
         pass
     except Exception as ex:
         logging.critical("An exception was encountered in main(): %s", str(ex))
     finally:
+        stop.set()
+        if server:
+            server.stop()
+        if commands:
+            commands.stop()
+        try:
+            shutdown(module, main_thread, module.conf if module else {'shutdown_timeout': 0}, pipeline)
+        except Exception as ex:
+            logging.critical("An exception was encountered in shutdown(): %s", str(ex))
+        if publisher:
+            # after the last polling, undelivered messages are spooled
+            publisher.stop()
         if module:
             module.cleanup()
+        if profiler.PROFILER:
+            # last window
+            profiler.PROFILER.dump()
         logging.info("End")
 
 if __name__ == '__main__':
@@ -0,0 +1,409 @@
+#!/usr/bin/python3
+# pylint: disable=line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Read back pydas data files
+#  File : reader.py
+# ----------------------------------------------------------------------
+""" Read back the files written by pydas as numpy arrays
+
+    <file_header>_YYYY-MM-DD.dat          store_data_csv (sections, .csv/.jsonl too)
+    <file_header>_events_YYYY-MM-DD.dat   store_event (.csv/.jsonl too)
+    <file_header>_YYYY-MM-DD.alarm        _send_alarm
+
+    iter_* functions are generators, they read chunk_rows lines at a time
+    and yield one batch per chunk, memory does not depend on file size.
+    read_* functions concatenate the batches of many files.
+
+    Data batch   {(section, id): {'time': int64, 'value': float64}}        analog, 1wire
+                 {(section, id): {'time': int64, 'status': int8,
+                                  'status_ev': int8}}                      digital
+                 {(section, id): {'time': int64, 'status': int8}}         relay, open_collector
+                 {(section, id): {'time': int64, 'rise': int32, 'fall': int32,
+                                  'on_time', 'duty', 'longest_on',
+                                  'frequency': float64}}                  counters
+    Events batch {id: {'time': float64, 'status': int8}}
+    Alarm batch  {'time': float64, 'alarm': int32}
+
+    The format ('data_format', serializers.py) follows the file extension,
+    .dat tsv, .csv csv and .jsonl jsonl, any other raises ValueError.
+    csv/jsonl events files list burst rows (burst.py) as events with their
+    final status, as tsv.
+
+    Times are epoch seconds computed like functions.unix_time (local time
+    taken as utc), without datetime.strptime.
+
+    Change only files ('data_delta', delta.py) have rows for the channels
+    that changed only, read_data(dense=True) expands them back to one row
+    per polling (last value held) inside every keyframe window, the last
+    window up to the last row.
+
+    Adaptive polling ('adaptive_polling', adaptive.py) rows come at a
+    varying interval, read_data(pollings=[]) lists its changes.
+"""
+import sys
+import csv
+import json
+import calendar
+from collections import defaultdict
+import numpy as np
+# custom
+from serializers import DATA_SECTIONS, FORMATS
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+CHUNK_ROWS = 65536
+
+# section comment -> section name
+SECTIONS = {
+    '# analog inputs': 'analog',
+    '# digital inputs': 'digital',
+    '# digital counters': 'counters',
+    '# 1wire inputs': '1wire',
+    '# relay outputs': 'relay',
+    '# open collector outputs': 'open_collector',
+}
+
+# section name -> value columns (after date and id)
+SECTION_COLUMNS = {
+    'analog': ('value',),
+    'digital': ('status', 'status_ev'),
+    'counters': ('rise', 'fall', 'on_time', 'duty', 'longest_on', 'frequency'),
+    '1wire': ('value',),
+    'relay': ('status',),
+    'open_collector': ('status',),
+}
+
+# csv/jsonl section column -> section name, jsonl value keys in SECTION_COLUMNS order
+ROW_SECTIONS = {row_section: row_section.replace(' ', '_') for row_section, _, _, _, _, _, _ in DATA_SECTIONS}
+ROW_COLUMNS = {ROW_SECTIONS[row_section]: columns for row_section, _, _, _, _, _, columns in DATA_SECTIONS}
+
+class _Clock:
+    """ Fast 'YYYY-MM-DD HH:MM:SS[.ffffff]' to epoch seconds """
+
+    def __init__(self):
+        """ Constructor """
+        self.days = {} # 'YYYY-MM-DD' -> epoch of midnight
+        self.last_text = None # every channel of a polling has the same time
+        self.last = None
+
+    def seconds(self, text):
+        """ Whole seconds """
+        if text == self.last_text:
+            return self.last
+        day = self.days.get(text[:10])
+        if day is None:
+            day = calendar.timegm((int(text[0:4]), int(text[5:7]), int(text[8:10]), 0, 0, 0))
+            self.days[text[:10]] = day
+        self.last_text = text
+        self.last = day + int(text[11:13]) * 3600 + int(text[14:16]) * 60 + int(text[17:19])
+        return self.last
+
+    def fraction(self, text):
+        """ Seconds with microseconds """
+        if len(text) > 20:
+            return self.seconds(text) + float(text[19:])
+        return float(self.seconds(text))
+
+def _value(text):
+    """ Channel value, missing ('None' tsv, empty csv, null jsonl) is nan """
+    if text in ('None', '', None):
+        return np.nan
+    return float(text)
+
+def _status(text):
+    """ Digital or output status, 0/1 or a bool written as True/False (json true/false) """
+    if text == 'True':
+        return 1
+    if text == 'False':
+        return 0
+    return int(text)
+
+def _json_row(line):
+    """ jsonl row, None for a blank or torn (power cut) line """
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+# column -> (parser, numpy type)
+COLUMN_TYPES = {
+    'value': (_value, np.float64),
+    'status': (_status, np.int8),
+    'status_ev': (_status, np.int8),
+    'rise': (int, np.int32),
+    'fall': (int, np.int32),
+    'on_time': (float, np.float64),
+    'duty': (float, np.float64),
+    'longest_on': (float, np.float64),
+    'frequency': (float, np.float64),
+}
+
+# section name -> column parsers
+SECTION_PARSERS = {section: [COLUMN_TYPES[name][0] for name in columns]
+                   for section, columns in SECTION_COLUMNS.items()}
+
+def _data_batch(rows):
+    """ Rows {(section, id): [time list, column lists...]} to arrays """
+    batch = {}
+    for key, cols in rows.items():
+        arrays = {'time': np.array(cols[0], dtype=np.int64)}
+        for name, col in zip(SECTION_COLUMNS[key[0]], cols[1:]):
+            arrays[name] = np.array(col, dtype=COLUMN_TYPES[name][1])
+        batch[key] = arrays
+    return batch
+
+def _tsv_data(path, clock, keyframes, pollings):
+    """ tsv data rows as (section, id, date, value fields, name) """
+    section = None
+    width = 0
+    with open(path, 'r') as file:
+        for line in file:
+            if line[0] == '#':
+                fields = line.rstrip('\n').split('\t')
+                if fields[0] == '# keyframe' and keyframes is not None and len(fields) >= 4:
+                    keyframes.append((clock.seconds(fields[1]), int(fields[2]), int(fields[3])))
+                elif fields[0] == '# polling' and pollings is not None and len(fields) >= 3:
+                    pollings.append((clock.seconds(fields[1]), int(fields[2])))
+                section = SECTIONS.get(line.rstrip('\n'))
+                if section is not None:
+                    width = len(SECTION_COLUMNS[section])
+                continue
+            if section is None or line.startswith('date') or line == '\n':
+                continue
+
+            fields = line.rstrip('\n').split('\t')
+            # date, id, values and name, a torn last line is skipped
+            if len(fields) < width + 3:
+                continue
+            yield section, int(fields[1]), fields[0], fields[2:2 + width], fields[-1]
+
+def _csv_data(path, clock, keyframes, pollings):
+    """ csv data rows as (section, id, date, value fields, name) """
+    with open(path, 'r', newline='') as file:
+        for fields in csv.reader(file):
+            if len(fields) < 3:
+                continue
+            if fields[1] == 'keyframe':
+                if keyframes is not None and len(fields) >= 4:
+                    keyframes.append((clock.seconds(fields[0]), int(fields[2]), int(fields[3])))
+                continue
+            if fields[1] == 'polling':
+                if pollings is not None:
+                    pollings.append((clock.seconds(fields[0]), int(fields[2])))
+                continue
+            section = ROW_SECTIONS.get(fields[1])
+            # date, section, id, values and name, a torn last line is skipped
+            if section is None or len(fields) < len(SECTION_COLUMNS[section]) + 4:
+                continue
+            yield section, int(fields[2]), fields[0], fields[3:3 + len(SECTION_COLUMNS[section])], fields[-1]
+
+def _jsonl_data(path, clock, keyframes, pollings):
+    """ jsonl data rows as (section, id, date, values, name) """
+    with open(path, 'r') as file:
+        for line in file:
+            row = _json_row(line)
+            if row is None:
+                continue
+            if row['section'] == 'keyframe':
+                if keyframes is not None:
+                    keyframes.append((clock.seconds(row['date']), row['polling_time'], row['keyframe_time']))
+                continue
+            if row['section'] == 'polling':
+                if pollings is not None:
+                    pollings.append((clock.seconds(row['date']), row['polling_time']))
+                continue
+            section = ROW_SECTIONS.get(row['section'])
+            if section is None:
+                continue
+            yield section, row['id'], row['date'], [row[column] for column in ROW_COLUMNS[section]], row['name']
+
+def _tsv_events(path):
+    """ tsv events rows as (id, date, status, name) """
+    with open(path, 'r') as file:
+        for line in file:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 4:
+                continue
+            yield int(fields[1]), fields[0], fields[2], fields[3]
+
+def _csv_events(path):
+    """ csv events rows as (id, date, status, name), burst rows with their final status """
+    with open(path, 'r', newline='') as file:
+        for fields in csv.reader(file):
+            if len(fields) < 4 or fields[1] not in ('event', 'burst'):
+                continue
+            yield int(fields[2]), fields[0], fields[3], fields[-1]
+
+def _jsonl_events(path):
+    """ jsonl events rows as (id, date, status, name), burst rows with their final status """
+    with open(path, 'r') as file:
+        for line in file:
+            row = _json_row(line)
+            if row is None or row['section'] not in ('event', 'burst'):
+                continue
+            yield row['id'], row['date'], row['st_ev'], row['name']
+
+# serializer name -> (data rows, events rows)
+FORMAT_ROWS = {
+    'tsv': (_tsv_data, _tsv_events),
+    'csv': (_csv_data, _csv_events),
+    'jsonl': (_jsonl_data, _jsonl_events),
+}
+
+def file_format(path):
+    """ Serializer name ('data_format') of a data or events file, from its extension """
+    for name, serializer in FORMATS.items():
+        if path.endswith(serializer.extension) and name in FORMAT_ROWS:
+            return name
+    raise ValueError("%s: unsupported data file, expected %s" % (
+        path, ', '.join(FORMATS[name].extension for name in FORMAT_ROWS)))
+
+def iter_data(path, chunk_rows=CHUNK_ROWS, names=None, keyframes=None, pollings=None):
+    """ Parse a store_data_csv file (any 'data_format'), yield a batch every chunk_rows rows
+
+        names, if a dict, is filled with {(section, id): channel name}
+        keyframes, if a list, gets (time, polling_time, keyframe_time) of the delta keyframes
+        pollings, if a list, gets (time, seconds) of the adaptive polling intervals
+    """
+    data_rows = FORMAT_ROWS[file_format(path)][0]
+    clock = _Clock()
+    rows = {}
+    count = 0
+    for section, chn_id, date, fields, name in data_rows(path, clock, keyframes, pollings):
+        key = (section, chn_id)
+        cols = rows.get(key)
+        if cols is None:
+            cols = rows[key] = [[] for _ in range(len(SECTION_COLUMNS[section]) + 1)]
+            if names is not None:
+                names[key] = name
+        cols[0].append(clock.seconds(date))
+        for idx, parser in enumerate(SECTION_PARSERS[section]):
+            cols[idx + 1].append(parser(fields[idx]))
+
+        count += 1
+        if count >= chunk_rows:
+            yield _data_batch(rows)
+            rows = {}
+            count = 0
+
+    if rows:
+        yield _data_batch(rows)
+
+def iter_events(path, chunk_rows=CHUNK_ROWS, names=None):
+    """ Parse a store_event file (any 'data_format'), yield a batch every chunk_rows rows """
+    event_rows = FORMAT_ROWS[file_format(path)][1]
+    clock = _Clock()
+    rows = defaultdict(lambda: ([], []))
+    count = 0
+    for din, date, status, name in event_rows(path):
+        cols = rows[din]
+        cols[0].append(clock.fraction(date))
+        cols[1].append(_status(status))
+        if names is not None:
+            names[din] = name
+
+        count += 1
+        if count >= chunk_rows:
+            yield {din: {'time': np.array(cols[0], dtype=np.float64), 'status': np.array(cols[1], dtype=np.int8)}
+                   for din, cols in rows.items()}
+            rows.clear()
+            count = 0
+
+    if rows:
+        yield {din: {'time': np.array(cols[0], dtype=np.float64), 'status': np.array(cols[1], dtype=np.int8)}
+               for din, cols in rows.items()}
+
+def iter_alarms(path, chunk_rows=CHUNK_ROWS):
+    """ Parse an .alarm file, yield a batch every chunk_rows rows """
+    clock = _Clock()
+    times = []
+    alarms = []
+    with open(path, 'r') as file:
+        for line in file:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 2:
+                continue
+            times.append(clock.fraction(fields[0]))
+            alarms.append(int(fields[1]))
+
+            if len(times) >= chunk_rows:
+                yield {'time': np.array(times, dtype=np.float64), 'alarm': np.array(alarms, dtype=np.int32)}
+                times = []
+                alarms = []
+
+    if times:
+        yield {'time': np.array(times, dtype=np.float64), 'alarm': np.array(alarms, dtype=np.int32)}
+
+def _concat(batches):
+    """ Concatenate {key: {column: array}} batches """
+    parts = defaultdict(lambda: defaultdict(list))
+    for batch in batches:
+        for key, cols in batch.items():
+            for name, col in cols.items():
+                parts[key][name].append(col)
+    return {key: {name: np.concatenate(col) for name, col in cols.items()}
+            for key, cols in parts.items()}
+
+def polling_times(keyframes, last):
+    """ Polling times of the keyframe windows, up to the next keyframe or keyframe_time
+
+        the last window ends at the last row (time last), pollings are never made up
+    """
+    parts = []
+    for idx, (start, polling_time, keyframe_time) in enumerate(keyframes):
+        end = start + keyframe_time
+        if idx + 1 < len(keyframes):
+            end = min(end, keyframes[idx + 1][0])
+        else:
+            end = min(end, last + 1)
+        # a keyframe at startup may be off the polling boundaries
+        parts.append(np.array([start], dtype=np.int64))
+        parts.append(np.arange((start // polling_time + 1) * polling_time, end, polling_time, dtype=np.int64))
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(parts))
+
+def expand(data, keyframes):
+    """ Change only rows to one row per polling, the last value held """
+    if not keyframes or not data:
+        return data
+    grid = polling_times(sorted(keyframes), max(int(cols['time'][-1]) for cols in data.values()))
+    dense = {}
+    for key, cols in data.items():
+        # last row at or before every polling
+        idx = np.searchsorted(cols['time'], grid, side='right') - 1
+        idx = idx[idx >= 0]
+        times = grid[len(grid) - len(idx):]
+        dense[key] = {name: (times if name == 'time' else col[idx]) for name, col in cols.items()}
+    return dense
+
+def read_data(paths, names=None, dense=False, pollings=None):
+    """ Read store_data_csv files into {(section, id): {column: array}}
+
+        dense expands change only files to one row per polling
+        pollings, if a list, gets (time, seconds) of the adaptive polling intervals
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    keyframes = [] if dense else None
+    data = _concat(batch for path in paths for batch in iter_data(path, names=names, keyframes=keyframes, pollings=pollings))
+    return expand(data, keyframes) if dense else data
+
+def read_events(paths, names=None):
+    """ Read store_event files into {id: {'time', 'status'}} """
+    if isinstance(paths, str):
+        paths = [paths]
+    return _concat(batch for path in paths for batch in iter_events(path, names=names))
+
+def read_alarms(paths):
+    """ Read .alarm files into {'time', 'alarm'} """
+    if isinstance(paths, str):
+        paths = [paths]
+    batches = [batch for path in paths for batch in iter_alarms(path)]
+    if not batches:
+        return {'time': np.empty(0, dtype=np.float64), 'alarm': np.empty(0, dtype=np.int32)}
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in ('time', 'alarm')}
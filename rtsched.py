@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Scheduling of the acquisition threads
+#  File : rtsched.py
+# ----------------------------------------------------------------------
+""" Scheduling of the acquisition threads (Linux)
+
+    tune_thread(conf, name) applies to the calling thread
+
+      rt_policy    'fifo' or 'rr' with rt_priority (1..99), None keeps the default
+      rt_nice      nice level, None keeps the default
+      rt_cpus      cpus the thread may run on, e.g. [3], None all
+
+    pydas.py tunes the polling thread and the digital input edge thread.
+    Threads started by them inherit policy and affinity, the alarm senders
+    call reset_thread() to go back to the default scheduling.
+
+    lock_memory() keeps the process in ram (mlockall), idle_priority()
+    moves a batch process (backfill) to the idle class. Everything needs
+    privileges (CAP_SYS_NICE, CAP_IPC_LOCK or root): failures are logged
+    and the program goes on with the default scheduling.
+
+    JitterStats collects lateness figures (seconds), logged at every store_time.
+"""
+import sys
+import os
+import ctypes
+import ctypes.util
+import logging
+import threading
+from collections import deque
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+POLICIES = {
+    'fifo': getattr(os, 'SCHED_FIFO', None),
+    'rr': getattr(os, 'SCHED_RR', None),
+}
+
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+# thread stack with locked memory, every page of it stays resident
+LOCKED_STACK_SIZE = 1024 * 1024
+
+# cpus of the process before any tuning
+PROCESS_CPUS = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else None
+
+def tune_thread(conf, name):
+    """ Scheduling policy, nice level and cpu affinity of the calling thread """
+    logging.debug("Function tune_thread - %s", name)
+    tid = threading.get_native_id()
+
+    if conf['rt_policy'] is not None:
+        try:
+            os.sched_setscheduler(0, POLICIES[conf['rt_policy']], os.sched_param(conf['rt_priority']))
+            logging.info("Thread %s (%s) scheduled %s priority %s", name, tid, conf['rt_policy'], conf['rt_priority'])
+        except Exception as ex:
+            logging.warning("Thread %s: cannot set %s scheduling: %s", name, conf['rt_policy'], str(ex))
+
+    if conf['rt_nice'] is not None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, conf['rt_nice'])
+            logging.info("Thread %s (%s) nice %s", name, tid, conf['rt_nice'])
+        except Exception as ex:
+            logging.warning("Thread %s: cannot set nice %s: %s", name, conf['rt_nice'], str(ex))
+
+    if conf['rt_cpus'] is not None:
+        try:
+            os.sched_setaffinity(0, conf['rt_cpus'])
+            logging.info("Thread %s (%s) pinned to cpu %s", name, tid, ','.join(str(cpu) for cpu in conf['rt_cpus']))
+        except Exception as ex:
+            logging.warning("Thread %s: cannot pin to cpu %s: %s", name, conf['rt_cpus'], str(ex))
+
+def reset_thread():
+    """ Default scheduling for the calling thread, started by a tuned one """
+    try:
+        if os.sched_getscheduler(0) != os.SCHED_OTHER:
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        # nice level of the main thread
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), os.getpriority(os.PRIO_PROCESS, os.getpid()))
+        os.sched_setaffinity(0, PROCESS_CPUS)
+    except Exception as ex:
+        logging.debug("Cannot reset thread scheduling: %s", str(ex))
+
+def lock_memory():
+    """ Lock current and future pages in ram, return True if done """
+    logging.debug("Function lock_memory")
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # smaller thread stacks, they are locked too
+        threading.stack_size(LOCKED_STACK_SIZE)
+        if libc.mlockall(MCL_CURRENT | MCL_FUTURE) != 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        logging.info("Memory locked")
+        return True
+    except Exception as ex:
+        logging.warning("Cannot lock memory (ulimit -l, CAP_IPC_LOCK): %s", str(ex))
+        return False
+
+def idle_priority():
+    """ Batch work, the acquisition always comes first """
+    try:
+        os.nice(19 - os.nice(0))
+        os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+    except Exception as ex:
+        logging.debug("Cannot set idle priority: %s", str(ex))
+
+class JitterStats:
+    """ Lateness figures of the last window """
+
+    def __init__(self, name, size=4096):
+        """ Constructor """
+        self.name = name
+        self.values = deque(maxlen=size)
+
+    def add(self, value):
+        """ New lateness (seconds), thread safe (deque append) """
+        self.values.append(value)
+
+    def report(self):
+        """ Figures in ms of the window, a new window starts """
+        values = sorted(self.values)
+        self.values.clear()
+        if not values:
+            return None
+        return {'count': len(values),
+                'mean': round(sum(values) / len(values) * 1000, 3),
+                'p50': round(values[len(values) // 2] * 1000, 3),
+                'p99': round(values[min(len(values) - 1, int(len(values) * 0.99))] * 1000, 3),
+                'max': round(values[-1] * 1000, 3)}
+
+    def log_report(self):
+        """ Log the figures of the window """
+        report = self.report()
+        if report:
+            logging.info("Jitter %s [ms]: %s", self.name, ', '.join('%s %s' % item for item in report.items()))
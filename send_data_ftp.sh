@@ -5,6 +5,11 @@
 
 # sudo apt install ncftp
 
+# lowest cpu and disk priority, the acquisition goes first (children inherit it)
+renice -n 19 -p $$ > /dev/null
+ionice -c 3 -p $$ > /dev/null 2>&1
+chrt --idle -p 0 $$ > /dev/null 2>&1
+
 # lock dir/file
 BASEDIR=$(dirname $0)
 SCRIPTFILE=$(basename $0)
@@ -0,0 +1,290 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Row serializers for data, events and ced files
+#  File : serializers.py
+# ----------------------------------------------------------------------
+""" Row serializers
+
+    One serializer per output encoding, same interface:
+
+      tsv    .dat    the historic tab separated files, byte for byte
+      csv    .csv    date,section,id,<values>,name - no comment/header lines
+      jsonl  .jsonl  one json object per row, section and field names as keys
+
+    compile(module) builds a % template per channel (id and name are
+    encoded once, on startup and on configuration reload), the writers
+    format the timestamp once per tick and write the joined rows at once.
+
+    Data sections and their value columns:
+
+      analog          value
+      digital         st, st_ev
+      counters        rise, fall, on_s, duty, max_on_s, freq_hz
+      1wire           value
+      relay           st
+      open collector  st
+      event           st_ev
+
+    ced and pulses rows (ftp files) have dbid (and id) columns and no name.
+    Burst rows (burst.py) are event rows at the last edge of a summary,
+    followed by the edge count and the first edge time (tsv after the name,
+    event readers see the final status).
+    Delta data files (delta.py) have a keyframe row before every keyframe,
+    adaptive polling (adaptive.py) a polling row when the interval changes.
+"""
+import sys
+import json
+import math
+from functions import mean, stddev
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+# section, enabling key, channel list, sample field, tsv comment line, tsv column header line, value columns
+DATA_SECTIONS = (
+    ('analog', 'use_ai', 'analog_inputs', 'analog', "# analog inputs\n", "", ('value',)),
+    ('digital', 'use_io', 'digital_inputs', 'digital', "# digital inputs\n", "date\t\t\tid\tst\tst_ev\tname\n", ('st', 'st_ev')),
+    ('counters', 'use_pc', 'digital_inputs', 'counters', "# digital counters\n", "date\t\t\tid\trise\tfall\ton_s\tduty\tmax_on_s\tfreq_hz\tname\n",
+     ('rise', 'fall', 'on_s', 'duty', 'max_on_s', 'freq_hz')),
+    ('1wire', 'use_1w', 'one_wire_inputs', 'one_wire', "# 1wire inputs\n", "", ('value',)),
+    ('relay', 'use_ro', 'relay_outputs', 'relay', "# relay outputs\n", "", ('st',)),
+    ('open collector', 'use_oc', 'open_collector_outputs', 'open_collector', "# open collector outputs\n", "", ('st',)),
+)
+
+EVENT_COLUMNS = ('st_ev',)
+BURST_COLUMNS = ('st_ev', 'edges', 'first')
+CED_COLUMNS = ('mean', 'min', 'max', 'stddev')
+PULSE_COLUMNS = ('rise', 'fall', 'on_s', 'duty', 'max_on_s', 'freq_hz')
+
+class TsvSerializer:
+    """ Tab separated rows, the historic .dat layout """
+    name = 'tsv'
+    extension = '.dat'
+    with_headers = True
+
+    def __init__(self):
+        """ Constructor """
+        self.templates = {}
+
+    # encoding, overridden by the other formats
+
+    def _template(self, section, keys, columns, name):
+        """ Row template, %s for the date and every value column """
+        row = '%s'
+        for _, value in keys:
+            row += '\t' + str(value).replace('%', '%%')
+        row += '\t%s' * len(columns)
+        if name is not False:
+            row += '\t' + str(name).replace('%', '%%')
+        return row + '\n'
+
+    def _burst_template(self, din):
+        """ Burst row template, the event row plus edges and first """
+        return self._template('event', (('id', din['id']),), EVENT_COLUMNS, din['name'])[:-1] + '\t%s\t%s\n'
+
+    @staticmethod
+    def _measure(value, decimals):
+        """ Channel reading, None when missing """
+        return str(round(value, decimals)) if value else str(None)
+
+    @staticmethod
+    def _number(value, decimals=None):
+        """ Counter or aggregate """
+        return str(value) if decimals is None else str(round(float(value), decimals))
+
+    # compile
+
+    def compile(self, module):
+        """ Build the channel templates of module, return self """
+        templates = {}
+        for section, _, channels, _, _, _, columns in DATA_SECTIONS:
+            templates[section] = {chn['id']: self._template(section, (('id', chn['id']),), columns, chn['name'])
+                                  for chn in getattr(module, channels)}
+        templates['event'] = {din['id']: self._template('event', (('id', din['id']),), EVENT_COLUMNS, din['name'])
+                              for din in module.digital_inputs}
+        templates['burst'] = {din['id']: self._burst_template(din) for din in module.digital_inputs}
+        templates['pulses'] = {din['id']: self._template('pulses', (('dbid', din['dbid']), ('id', din['id'])), PULSE_COLUMNS, False)
+                               for din in module.digital_inputs}
+        templates['ced'] = {}
+        for chn in (module.one_wire_inputs[0], module.analog_inputs[0]):
+            templates['ced'][chn['dbid']] = self._template('ced', (('dbid', chn['dbid']),), CED_COLUMNS, False)
+        # swap at once, writers may run on other threads
+        self.templates = templates
+        return self
+
+    # rows
+
+    def _values(self, section, value):
+        """ Value columns of a data section, value from the sample """
+        if section in ('analog', '1wire'):
+            return (self._measure(value, 2),)
+        if section == 'digital':
+            return (self._number(value[0]), self._number(value[1]))
+        if section == 'counters':
+            return self._pulse_values(value)
+        return (self._number(value),)
+
+    def _pulse_values(self, pcr):
+        """ Counter columns of a PulseCounter report """
+        return (self._number(pcr['rise']), self._number(pcr['fall']),
+                self._number(pcr['on_time'], 1), self._number(pcr['duty'], 4),
+                self._number(pcr['longest_on'], 1), self._number(pcr['frequency'], 4))
+
+    def data_rows(self, module, date_time, sample, only=None):
+        """ Rows of the enabled data sections of a sample, date_time already formatted
+
+            only, a set of (section, id), writes those channels (and their section headers) only
+        """
+        templates = self.templates
+        rows = []
+        for section, key, channels, field, comment, header, _ in DATA_SECTIONS:
+            if not module.conf[key]:
+                continue
+            section_rows = []
+            section_templates = templates[section]
+            for chn, value in zip(getattr(module, channels), getattr(sample, field)):
+                if only is None or (section, chn['id']) in only:
+                    section_rows.append(section_templates[chn['id']] % ((date_time,) + self._values(section, value)))
+            if section_rows or only is None:
+                if self.with_headers:
+                    rows.append(comment + header)
+                rows.extend(section_rows)
+        return ''.join(rows)
+
+    def keyframe_row(self, date_time, polling_time, keyframe_time):
+        """ Delta files, a keyframe follows """
+        return '# keyframe\t%s\t%s\t%s\n' % (date_time, polling_time, keyframe_time)
+
+    def polling_row(self, date_time, period):
+        """ Adaptive polling, interval from here on """
+        return '# polling\t%s\t%s\n' % (date_time, period)
+
+    def event_row(self, din, date_time):
+        """ Digital input event row """
+        return self.templates['event'][din['id']] % (date_time, self._number(din['status_ev']))
+
+    def burst_row(self, din, summary, time_format):
+        """ Edge burst summary row, burst.Summary """
+        return self.templates['burst'][din['id']] % (summary.last.strftime(time_format), self._number(summary.status),
+                                                    self._number(summary.edges), summary.first.strftime(time_format))
+
+    def ced_row(self, date_time, dbid, lst, decimals, weights=None):
+        """ Aggregate row - mean, min, max, stddev (time weighted with weights) """
+        values = (date_time,
+                  self._number(mean(lst, weights), decimals), self._number(min(lst), decimals),
+                  self._number(max(lst), decimals), self._number(stddev(lst, weights), decimals))
+        return self.templates['ced'][dbid] % values
+
+    def pulse_rows(self, date_time, reports):
+        """ Counter rows, reports [(din, PulseCounter report)] """
+        templates = self.templates['pulses']
+        return ''.join(templates[din['id']] % ((date_time,) + self._pulse_values(pcr)) for din, pcr in reports)
+
+class CsvSerializer(TsvSerializer):
+    """ Comma separated rows, the section as second column """
+    name = 'csv'
+    extension = '.csv'
+    with_headers = False
+
+    @staticmethod
+    def _quote(text):
+        """ Csv field """
+        text = str(text)
+        if any(char in text for char in ',"\n\r'):
+            text = '"' + text.replace('"', '""') + '"'
+        return text
+
+    def _template(self, section, keys, columns, name):
+        """ Row template, %s for the date and every value column """
+        row = '%s,' + self._quote(section)
+        for _, value in keys:
+            row += ',' + self._quote(value).replace('%', '%%')
+        row += ',%s' * len(columns)
+        if name is not False:
+            row += ',' + self._quote(name).replace('%', '%%')
+        return row + '\n'
+
+    def _burst_template(self, din):
+        """ Burst row template """
+        return self._template('burst', (('id', din['id']),), BURST_COLUMNS, din['name'])
+
+    def keyframe_row(self, date_time, polling_time, keyframe_time):
+        """ Delta files, a keyframe follows """
+        return '%s,keyframe,%s,%s\n' % (date_time, polling_time, keyframe_time)
+
+    def polling_row(self, date_time, period):
+        """ Adaptive polling, interval from here on """
+        return '%s,polling,%s\n' % (date_time, period)
+
+    @staticmethod
+    def _measure(value, decimals):
+        """ Channel reading, empty when missing """
+        if value is None or math.isnan(value):
+            return ''
+        return str(round(value, decimals))
+
+    @staticmethod
+    def _number(value, decimals=None):
+        """ Counter or aggregate, empty when missing """
+        if value is None:
+            return ''
+        return str(value) if decimals is None else str(round(float(value), decimals))
+
+class JsonlSerializer(TsvSerializer):
+    """ One json object per row """
+    name = 'jsonl'
+    extension = '.jsonl'
+    with_headers = False
+
+    def _template(self, section, keys, columns, name):
+        """ Row template, %s for the date and every value column """
+        row = '{"date": "%s", "section": ' + json.dumps(section)
+        for key, value in keys:
+            row += ', "%s": %s' % (key, json.dumps(value).replace('%', '%%'))
+        for column in columns:
+            row += ', "%s": %%s' % column
+        if name is not False:
+            row += ', "name": ' + json.dumps(name).replace('%', '%%')
+        return row + '}\n'
+
+    def _burst_template(self, din):
+        """ Burst row template, first is a string """
+        return self._template('burst', (('id', din['id']),), BURST_COLUMNS, din['name']).replace('"first": %s', '"first": "%s"')
+
+    def keyframe_row(self, date_time, polling_time, keyframe_time):
+        """ Delta files, a keyframe follows """
+        return '{"date": "%s", "section": "keyframe", "polling_time": %s, "keyframe_time": %s}\n' % (date_time, polling_time, keyframe_time)
+
+    def polling_row(self, date_time, period):
+        """ Adaptive polling, interval from here on """
+        return '{"date": "%s", "section": "polling", "polling_time": %s}\n' % (date_time, period)
+
+    @staticmethod
+    def _measure(value, decimals):
+        """ Channel reading, null when missing """
+        if value is None or math.isnan(value):
+            return 'null'
+        return str(round(value, decimals))
+
+    @staticmethod
+    def _number(value, decimals=None):
+        """ Counter or aggregate, null when missing, json true/false for a bool status """
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return 'null'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value) if decimals is None else str(round(float(value), decimals))
+
+FORMATS = {
+    TsvSerializer.name: TsvSerializer,
+    CsvSerializer.name: CsvSerializer,
+    JsonlSerializer.name: JsonlSerializer,
+}
+
+def get_serializer(name, module):
+    """ Serializer for format name, compiled for module """
+    return FORMATS[name]().compile(module)
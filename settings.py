@@ -0,0 +1,275 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Validated configuration with hot reload
+#  File : settings.py
+# ----------------------------------------------------------------------
+""" Validated configuration
+
+    Settings(main) checks config.main and compiles the per channel
+    overrides (dr1.., dn1.., an1.., ac1.., 1wn1..) once.
+
+    ConfigManager reloads config.py on SIGHUP or when the file changes and
+    applies it to the running module. An invalid file is rejected and the
+    running configuration is kept.
+"""
+import sys
+import os
+import runpy
+import logging
+import threading
+from calibration import check_calibration
+from acquisition import check_plan
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+class ConfigError(Exception):
+    """ Invalid configuration """
+
+# SCHEMA default of the keys every config.py has
+REQUIRED = object()
+
+def _positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+def _bool(value):
+    return isinstance(value, bool)
+
+def _str(value):
+    return isinstance(value, str) and value != ''
+
+def _url(value):
+    return isinstance(value, str) and value.startswith(('http://', 'https://'))
+
+def _path(value):
+    return value is None or isinstance(value, str)
+
+def _port(value):
+    return _positive_int(value) and value < 65536
+
+def _not_negative_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def _hold(value):
+    return value is None or _not_negative_int(value)
+
+def _reverse(value):
+    return value is None or value in (0, 1)
+
+def _name(value):
+    return value is None or _str(value)
+
+def _not_negative_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+def _cpus(value):
+    return value is None or (isinstance(value, (list, tuple)) and len(value) > 0
+                             and all(_not_negative_int(cpu) for cpu in value))
+
+def _ai_channels(value):
+    return (isinstance(value, (list, tuple)) and len(value) > 0 and len(set(value)) == len(value)
+            and all(not isinstance(idx, bool) and idx in (1, 2, 3, 4) for idx in value))
+
+# key -> (check, description, default) - REQUIRED keys have no default (config.py of the first releases)
+SCHEMA = {
+    'polling_time': (_positive_int, 'a positive integer', REQUIRED),
+    'store_time': (_positive_int, 'a positive integer', REQUIRED),
+    'acquisition_plan': (check_plan, "None or periods (seconds) by 'di', 'ai', '1w', 'ai1'.. (see acquisition.py)", None),
+    'adaptive_polling': (_bool, 'True or False', False),
+    'adaptive_fast': (_positive_int, 'a positive integer (seconds)', 5),
+    'adaptive_slow': (_positive_int, 'a positive integer (seconds)', 120),
+    'adaptive_rate_ai': (_not_negative_number, 'a not negative number (units per minute)', 0.5),
+    'adaptive_rate_1w': (_not_negative_number, 'a not negative number (°C per minute)', 0.2),
+    'data_path': (_path, 'a path or None', REQUIRED),
+    'ftp_path': (_path, 'a path or None', REQUIRED),
+    'file_header': (_str, 'a non empty string', REQUIRED),
+    'ws_url': (_url, 'an http(s) url', REQUIRED),
+    'reset_alarm_msg_dealy': (_positive_int, 'a positive integer', REQUIRED),
+    'first_poll_now': (_bool, 'True or False', True),
+    'shutdown_timeout': (_positive_int, 'a positive integer', 10),
+    'data_format': (lambda value: value in ('tsv', 'csv', 'jsonl'), "'tsv', 'csv' or 'jsonl'", 'tsv'),
+    'pipeline_queue': (_positive_int, 'a positive integer', 16),
+    'data_delta': (_bool, 'True or False', False),
+    'delta_keyframe': (_positive_int, 'a positive integer (seconds)', 3600),
+    'delta_deadband_ai': (_not_negative_number, 'a not negative number', 0.05),
+    'delta_deadband_1w': (_not_negative_number, 'a not negative number', 0.1),
+    'burst_edges': (lambda value: value is None or _positive_int(value), 'None or a positive integer', 30),
+    'burst_interval': (_positive_int, 'a positive integer (seconds)', 60),
+    'use_ai': (_bool, 'True or False', REQUIRED),
+    'ai_channels': (_ai_channels, 'a list of analog input ids (1 to 4)', (1, 2)),
+    'use_io': (_bool, 'True or False', REQUIRED),
+    'use_ev': (_bool, 'True or False', REQUIRED),
+    'use_1w': (_bool, 'True or False', REQUIRED),
+    'w1_fail_threshold': (_positive_int, 'a positive integer', 3),
+    'w1_retry': (_positive_int, 'a positive integer (seconds)', 60),
+    'w1_retry_max': (_positive_int, 'a positive integer (seconds)', 3600),
+    'w1_rescan': (_positive_int, 'a positive integer (seconds)', 60),
+    'use_ro': (_bool, 'True or False', REQUIRED),
+    'use_oc': (_bool, 'True or False', REQUIRED),
+    'use_ld': (_bool, 'True or False', REQUIRED),
+    'use_pc': (_bool, 'True or False', False),
+    'debounce_time': (_not_negative_int, 'a not negative integer (ms)', 500),
+    'di_backend': (lambda value: value in ('rpigpio', 'gpiochip'), "'rpigpio' or 'gpiochip'", 'rpigpio'),
+    'gpiochip_path': (_str, 'a device path', '/dev/gpiochip0'),
+    'rt_policy': (lambda value: value in (None, 'fifo', 'rr'), "None, 'fifo' or 'rr'", None),
+    'rt_priority': (lambda value: _positive_int(value) and value < 100, 'an integer 1..99', 10),
+    'rt_nice': (lambda value: value is None or (isinstance(value, int) and not isinstance(value, bool) and -20 <= value <= 19), 'None or an integer -20..19', None),
+    'rt_cpus': (_cpus, 'None or a list of cpu numbers', None),
+    'rt_mlock': (_bool, 'True or False', False),
+    'use_api': (_bool, 'True or False', False),
+    'api_host': (_str, 'a non empty string', '127.0.0.1'),
+    'api_port': (_port, 'a tcp port', 8081),
+    'api_history': (_positive_int, 'a positive integer', 120),
+    'use_cmd': (_bool, 'True or False', False),
+    'cmd_socket': (_str, 'a non empty string', '/tmp/pydas.sock'),
+    'use_mqtt': (_bool, 'True or False', False),
+    'mqtt_host': (_str, 'a non empty string', '127.0.0.1'),
+    'mqtt_port': (_port, 'a tcp port', 1883),
+    'mqtt_user': (_name, 'None or a user name', None),
+    'mqtt_password': (lambda value: value is None or isinstance(value, str), 'None or a password', None),
+    'mqtt_topic': (lambda value: _str(value) and not any(char in value for char in '#+'), 'a topic without wildcards', 'pydas'),
+    'mqtt_batch': (_positive_int, 'a positive integer', 20),
+    'mqtt_spool_size': (_positive_int, 'a positive integer (kB)', 1024),
+    'config_watch': (lambda value: value == 0 or _positive_int(value), '0 or a positive integer', 5),
+}
+
+# per channel overrides, key prefix -> (check, description, channel ids) - None default
+CHANNEL_SCHEMA = {
+    'dr': (_reverse, 'None, 0 or 1', range(1, 7)),
+    'dn': (_name, 'None or a name', range(1, 7)),
+    'dh': (_hold, 'None or a not negative integer (ms)', range(1, 7)),
+    'an': (_name, 'None or a name', range(1, 5)),
+    'ac': (check_calibration, 'None or a calibration dictionary (see calibration.py)', range(1, 5)),
+    '1wn': (_name, 'None or a name', range(1, 2)),
+}
+
+# need a restart (hardware setup, sockets), kept as they are on reload
+RESTART_KEYS = ('use_ai', 'ai_channels', 'use_io', 'use_ev', 'use_1w', 'use_ro', 'use_oc', 'use_ld', 'use_pc',
+                'di_backend', 'gpiochip_path', 'data_format', 'pipeline_queue',
+                'rt_policy', 'rt_priority', 'rt_nice', 'rt_cpus', 'rt_mlock',
+                'use_api', 'api_host', 'api_port', 'api_history', 'use_cmd', 'cmd_socket',
+                'use_mqtt', 'mqtt_host', 'mqtt_port', 'mqtt_user', 'mqtt_password', 'mqtt_topic', 'mqtt_batch', 'mqtt_spool_size',
+                'data_path', 'ftp_path')
+
+class Settings:
+    """ Validated configuration, compiled once """
+
+    def __init__(self, main):
+        """ Constructor - raise ConfigError """
+        errors = []
+        # keys added after the first releases are optional, older config.py files still load
+        main = dict(main)
+        for key, (_, _, default) in SCHEMA.items():
+            if key not in main and default is not REQUIRED:
+                main[key] = default
+        for key, (check, description, _) in SCHEMA.items():
+            if key not in main:
+                errors.append("'%s' is missing" % key)
+            elif not check(main[key]):
+                errors.append("'%s' must be %s, found %r" % (key, description, main[key]))
+        for prefix, (check, description, ids) in CHANNEL_SCHEMA.items():
+            for idx in ids:
+                value = main.get(prefix + str(idx))
+                if not check(value):
+                    errors.append("'%s%s' must be %s, found %r" % (prefix, idx, description, value))
+        if not errors and main['store_time'] % main['polling_time']:
+            errors.append("'store_time' must be a multiple of 'polling_time'")
+        if not errors and main['acquisition_plan'] and any(main['store_time'] % period for period in main['acquisition_plan'].values()):
+            errors.append("'store_time' must be a multiple of the 'acquisition_plan' periods")
+        if not errors and main['adaptive_polling']:
+            if main['acquisition_plan']:
+                errors.append("'adaptive_polling' and 'acquisition_plan' cannot be used together")
+            elif main['adaptive_slow'] % main['adaptive_fast'] or main['store_time'] % main['adaptive_slow']:
+                errors.append("'adaptive_slow' must be a multiple of 'adaptive_fast' and divide 'store_time'")
+        if not errors and main['w1_retry_max'] < main['w1_retry']:
+            errors.append("'w1_retry_max' must not be less than 'w1_retry'")
+        if errors:
+            raise ConfigError('; '.join(errors))
+
+        # plain dict, what the modules read (defaults included)
+        self.main = main
+
+        # per channel overrides {id: {field: value}}, None values left out
+        # (hold always set, its default is 'debounce_time')
+        self.digital_inputs = {}
+        for idx in CHANNEL_SCHEMA['dr'][2]:
+            override = {}
+            if main.get('dr' + str(idx)) is not None:
+                override['reverse'] = int(main['dr' + str(idx)])
+            if main.get('dn' + str(idx)) is not None:
+                override['name'] = main['dn' + str(idx)]
+            # debounce hold time (seconds), channel or global
+            hold = main.get('dh' + str(idx))
+            override['hold'] = (main['debounce_time'] if hold is None else hold) / 1000.0
+            self.digital_inputs[idx] = override
+        self.analog_inputs = {}
+        for idx in CHANNEL_SCHEMA['an'][2]:
+            override = {}
+            if main.get('an' + str(idx)) is not None:
+                override['name'] = main['an' + str(idx)]
+            if main.get('ac' + str(idx)) is not None:
+                override['calibration'] = main['ac' + str(idx)]
+            self.analog_inputs[idx] = override
+        self.one_wire_inputs = {idx: {'name': main['1wn' + str(idx)]} if main.get('1wn' + str(idx)) is not None else {}
+                                for idx in CHANNEL_SCHEMA['1wn'][2]}
+
+def load_settings(path):
+    """ Read a config.py file, return Settings - raise ConfigError """
+    try:
+        namespace = runpy.run_path(path)
+    except Exception as ex:
+        raise ConfigError("cannot read %s: %s" % (path, str(ex)))
+    if not isinstance(namespace.get('main'), dict):
+        raise ConfigError("%s has no 'main' dictionary" % path)
+    return Settings(namespace['main'])
+
+class ConfigManager:
+    """ Reload config.py and apply it to the running module """
+
+    def __init__(self, path, module, settings):
+        """ Constructor """
+        self.path = path
+        self.module = module
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.mtime = self._mtime()
+
+    def _mtime(self):
+        """ Config file modification time """
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self, reason):
+        """ Reload the config file, return True if applied """
+        logging.info("Reloading configuration (%s)", reason)
+        with self.lock:
+            self.mtime = self._mtime()
+            try:
+                settings = load_settings(self.path)
+            except ConfigError as ex:
+                logging.error("Configuration rejected, keeping the running one: %s", str(ex))
+                return False
+
+            # keys needing a restart keep their running value
+            for key in RESTART_KEYS:
+                if settings.main[key] != self.settings.main[key]:
+                    if key not in ('data_path', 'ftp_path'):
+                        logging.warning("'%s' changed, it needs a restart", key)
+                    settings.main[key] = self.settings.main[key]
+
+            self.module.apply_settings(settings)
+            self.settings = settings
+            logging.info("Configuration applied")
+            return True
+
+    def watch(self, stop, interval):
+        """ Reload when the file changes (run on its own thread) """
+        while not stop.wait(interval):
+            if self._mtime() != self.mtime:
+                self.reload('file changed')
@@ -1,17 +1,31 @@
 #!/bin/bash
 # Author : Paolo Saudin
 # Description : stop python script
-# Version 1
+# Version 2
 
 # --------- Info ---------
 echo "stopping pydas script"
 
 # --------- User Settings ---------
 PROCESS2KILL="/home/pi/bin/pydas/pydas.py"
+# pydas drains writes and alarms within 'shutdown_timeout' (config.py)
+WAIT_SECONDS=15
 
 # --------- Run program ---------
 echo "killing process id [`pgrep -f $PROCESS2KILL`]"
-pkill -f "$PROCESS2KILL"
+pkill -TERM -f "$PROCESS2KILL"
+
+# --------- Wait for a clean exit ---------
+for i in $(seq 1 $WAIT_SECONDS); do
+    if ! pgrep -f "$PROCESS2KILL" > /dev/null; then
+        break
+    fi
+    sleep 1
+done
+if pgrep -f "$PROCESS2KILL" > /dev/null; then
+    echo "process still running after $WAIT_SECONDS seconds, killing it"
+    pkill -KILL -f "$PROCESS2KILL"
+fi
 
 # --------- End ---------
 echo "done"
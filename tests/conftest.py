@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+""" Shared fixtures, hardware replaced by bench_stubs """
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bench_stubs # pylint: disable=wrong-import-position
+
+bench_stubs.install()
+
+from iono import Iono # pylint: disable=wrong-import-position
+
+@pytest.fixture(autouse=True)
+def channels():
+    """ Channel dictionaries are class level, every test starts from the defaults """
+    saved = [dict(din) for din in Iono.digital_inputs]
+    yield
+    for din, default in zip(Iono.digital_inputs, saved):
+        din.clear()
+        din.update(default)
+
+@pytest.fixture
+def conf(tmp_path):
+    """ Configuration writing into tmp_path, digital inputs only """
+    return bench_stubs.bench_conf(use_ai=False, use_1w=False, base_dir=str(tmp_path))
+
+def wait_for(predicate, timeout=2.0):
+    """ Wait for a condition set by another thread """
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
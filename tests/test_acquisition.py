@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+""" Acquisition plan, sources due per tick and the 1-Wire reader thread """
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+from acquisition import AcquisitionPlan, OneWireReader, check_plan, read_set
+from iono import Iono
+
+def _module(**conf):
+    """ Channel lists and the settings the plan looks at """
+    settings = dict(polling_time=60, use_io=True, use_ai=True, use_1w=True, use_pc=True, use_ro=True, use_oc=False,
+                    acquisition_plan=None)
+    settings.update(conf)
+    return SimpleNamespace(conf=settings, analog_inputs=Iono.analog_inputs[:2], digital_inputs=Iono.digital_inputs,
+                           one_wire_inputs=Iono.one_wire_inputs, relay_outputs=Iono.relay_outputs,
+                           open_collector_outputs=Iono.open_collector_outputs)
+
+def test_check_plan():
+    """ Known keys and positive integer periods only """
+    assert check_plan(None)
+    assert check_plan({'di': 1, 'ai': 5, '1w': 60, 'ai2': 10})
+    assert not check_plan({'ai5': 5})
+    assert not check_plan({'do': 5})
+    assert not check_plan({'ai': 0})
+    assert not check_plan({'ai': 2.5})
+    assert not check_plan({'di': True})
+    assert not check_plan([('ai', 5)])
+
+def test_periods_and_tick():
+    """ Class periods, channel overrides, polling_time for the rest, tick at their gcd """
+    module = _module(acquisition_plan={'di': 2, 'ai': 10, 'ai2': 15})
+    plan = AcquisitionPlan(module.conf, module)
+    assert plan.digital == 2
+    assert plan.analog == {1: 10, 2: 15}
+    assert plan.one_wire == {1: 60}
+    assert plan.tick == 1
+
+    module = _module(acquisition_plan={'ai': 10, '1w': 30}, use_io=False)
+    assert AcquisitionPlan(module.conf, module).tick == 10
+
+def test_due_and_read_set():
+    """ Sources of a tick, counters and outputs at polling_time only """
+    module = _module(acquisition_plan={'di': 5, 'ai': 10, 'ai2': 20, '1w': 30})
+    plan = AcquisitionPlan(module.conf, module)
+
+    due = plan.due(10)
+    assert (due.analog, due.digital, due.one_wire, due.base) == ((1,), True, (), False)
+    read = read_set(module, due)
+    assert ('analog', 1) in read and ('analog', 2) not in read
+    assert ('digital', 1) in read
+    assert ('counters', 1) not in read and ('relay', 1) not in read
+
+    due = plan.due(60)
+    assert (due.analog, due.digital, due.one_wire, due.base) == ((1, 2), True, (1,), True)
+    read = read_set(module, due)
+    assert {('analog', 2), ('counters', 1), ('relay', 1)} <= read
+    # 1-Wire samples come from OneWireReader
+    assert ('1wire', 1) not in read
+
+def test_one_wire_reader_skips_while_busy():
+    """ A tick due while the previous conversion runs is skipped """
+    gate = threading.Event()
+    reads = []
+    samples = []
+
+    class Module: # pylint: disable=too-few-public-methods
+        """ Slow probes """
+        @staticmethod
+        def get_one_wire_input(ids):
+            """ Conversion held on gate """
+            reads.append(ids)
+            gate.wait(2)
+
+        @staticmethod
+        def take_sample(date_time, read):
+            """ Sample of the tick """
+            return (date_time, read)
+
+    reader = OneWireReader(Module, samples.append)
+    tick = datetime(2026, 10, 19, 10, 0, 0)
+    reader.request((1,), tick)
+    reader.request((1,), tick)
+    assert reader.skipped == 1
+    gate.set()
+    reader.join(2)
+
+    assert reads == [(1,)]
+    assert samples == [(tick, frozenset([('1wire', 1)]))]
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+""" Adaptive polling interval """
+from types import SimpleNamespace
+
+from adaptive import AdaptivePolling
+
+def _conf(**values):
+    """ Adaptive settings, 5 s to 120 s within a 1 hour store_time """
+    conf = dict(adaptive_fast=5, adaptive_slow=120, store_time=3600, adaptive_rate_ai=0.5, adaptive_rate_1w=0.2)
+    conf.update(values)
+    return conf
+
+def _module(value=10.0, alarm=0):
+    """ One analog input, 1-Wire off """
+    return SimpleNamespace(conf={'use_ai': True, 'use_1w': False}, alarm_cur=alarm,
+                           analog_inputs=[{'id': 1, 'value': value}], one_wire_inputs=[])
+
+def test_ladder_on_store_boundaries():
+    """ Multiples of adaptive_fast dividing store_time, starting slow """
+    adaptive = AdaptivePolling(_conf(adaptive_slow=60, store_time=600))
+    assert adaptive.ladder == [5, 10, 15, 20, 25, 30, 40, 50, 60]
+    assert adaptive.interval == 60
+
+def test_alarm_polls_fast():
+    """ An alarm polls at the next tick and keeps the fast interval """
+    adaptive = AdaptivePolling(_conf())
+    assert not adaptive.due(5, alarm=0)
+    assert adaptive.due(5, alarm=1)
+    assert adaptive.update(_module(alarm=1), 0.0) == 5
+    assert adaptive.due(10, alarm=0)
+
+def test_relaxes_when_stable():
+    """ Stable values double the interval up to adaptive_slow """
+    adaptive = AdaptivePolling(_conf())
+    adaptive.update(_module(alarm=1), 0.0)
+    intervals = [adaptive.update(_module(), float(now)) for now in range(5, 60, 5)]
+    assert intervals[:6] == [10, 20, 40, 80, 120, 120]
+
+def test_moving_value_polls_fast():
+    """ A value moving faster than its rate per minute brings back the fast interval """
+    adaptive = AdaptivePolling(_conf())
+    assert adaptive.update(_module(10.0), 0.0) == 120
+    # 0.4 units in 60 s, below 0.5 per minute
+    assert adaptive.update(_module(10.4), 60.0) == 120
+    # 1 unit in 60 s
+    assert adaptive.update(_module(11.4), 120.0) == 5
+    # missing readings are not movement
+    assert adaptive.update(_module(float('nan')), 125.0) == 10
+    assert adaptive.update(_module(None), 130.0) == 20
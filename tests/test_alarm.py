@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+""" Alarm state machine, edges and polling reconciliation """
+import time
+
+import pytest
+
+from iono_w1 import IonoW1
+
+@pytest.fixture
+def alarm_module(conf, monkeypatch):
+    """ IonoW1 with the alarm codes sent collected instead of delivered """
+    module = IonoW1(conf)
+    sent = []
+    monkeypatch.setattr(module, '_start_alarm', sent.append)
+    # first polling, every input closed
+    _poll(module, {})
+    yield module, sent
+    module.cleanup()
+
+def _poll(module, levels):
+    """ Polling with levels {din id: status}, the other inputs 0 """
+    sample = module.take_sample()
+    digital = tuple((levels.get(din['id'], 0), levels.get(din['id'], 0)) for din in module.digital_inputs)
+    module.analyze_alarm(sample._replace(digital=digital, monotonic=time.monotonic()))
+
+def test_unknown_inputs_not_evaluated(conf, monkeypatch):
+    """ No alarm before the first polling has set every input """
+    module = IonoW1(conf)
+    try:
+        sent = []
+        monkeypatch.setattr(module, '_start_alarm', sent.append)
+        module.alarm_levels = dict.fromkeys(module.alarm_levels)
+        module.alarm_input(1, 1)
+        assert not sent
+        assert module.alarm_cur == 0
+    finally:
+        module.cleanup()
+
+def test_door_then_new_alarm(alarm_module):
+    """ Door alarm sent once, a new alarm sent with the door bit """
+    module, sent = alarm_module
+    module.alarm_input(1, 1)
+    module.alarm_input(1, 1)
+    assert sent == [1]
+
+    module.alarm_input(2, 1)
+    assert sent == [1, 257]
+    assert module.alarm_cur == 257
+    assert module.snapshot.alarm == 257
+
+def test_reset_message_at_deadline(alarm_module):
+    """ Back to no alarm, the reset message waits the delay from the first alarm sent """
+    module, sent = alarm_module
+    module.alarm_send_reset_delay = 0.2
+    module.alarm_input(3, 1)
+    assert sent == [16]
+
+    module.alarm_input(3, 0)
+    assert sent == [16]
+    assert module.alarm_reset_at is not None
+
+    # nothing changed, the polling past the deadline sends it
+    _poll(module, {})
+    assert sent == [16]
+    time.sleep(0.25)
+    _poll(module, {})
+    assert sent == [16, 0]
+    assert not module.alarm_sent
+    assert module.alarm_reset_at is None
+
+def test_missed_edge(alarm_module):
+    """ The polling corrects a level no edge reported """
+    module, sent = alarm_module
+    _poll(module, {4: 1})
+    assert sent == [2]
+    din = module.digital_inputs[3]
+    assert din['status_ev'] == 1
+    assert module.snapshot.digital[3] == (1, 1)
+
+def test_edge_newer_than_polling(alarm_module):
+    """ A polling older than the last edge does not undo it """
+    module, sent = alarm_module
+    sample = module.take_sample()
+    module.digital_inputs[4]['last_edge'] = time.monotonic()
+    module.alarm_input(5, 1)
+    digital = tuple((0, 0) for _ in module.digital_inputs)
+    module.analyze_alarm(sample._replace(digital=digital, monotonic=time.monotonic() - 1))
+    assert sent == [8]
+    assert module.alarm_levels[5] == 1
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+""" Edge burst coalescing of chattering inputs """
+import glob
+import os
+import time
+from datetime import datetime, timedelta
+
+import reader
+from burst import EdgeBurst, RECORD, STARTED, COALESCED
+from iono_w1 import IonoW1
+
+START = datetime(2026, 10, 19, 10, 0, 0)
+
+def _edges(burst, times, status=1):
+    """ Edges at monotonic times, edge() results """
+    return [burst.edge(status, now, START + timedelta(seconds=now)) for now in times]
+
+def test_records_below_the_limit():
+    """ burst_edges edges within the interval, or more spread out, are recorded """
+    burst = EdgeBurst(3, 10)
+    assert _edges(burst, [0, 1, 2]) == [RECORD] * 3
+    assert _edges(burst, [20, 40, 60, 80]) == [RECORD] * 4
+    assert not burst.active
+
+def test_summary_mode():
+    """ One edge over the limit starts a summary, the next ones are counted """
+    burst = EdgeBurst(3, 10)
+    assert _edges(burst, [0, 1, 2, 3, 4]) == [RECORD, RECORD, RECORD, STARTED, COALESCED]
+    assert burst.active
+
+    # not before the interval is over
+    assert burst.flush(5) is None
+    summary = burst.flush(13)
+    assert (summary.edges, summary.first, summary.last) == (2, START + timedelta(seconds=3), START + timedelta(seconds=4))
+    assert summary.status == 1
+
+def test_calm_again():
+    """ Back to one row per edge after an interval with at most half the edges """
+    burst = EdgeBurst(4, 10)
+    _edges(burst, [0, 1, 2, 3, 4])
+    _edges(burst, [5, 6, 7])
+    # the interval starts at the first summarized edge
+    assert burst.flush(13) is None
+    assert burst.flush(14).edges == 4
+    # still busy, 3 edges > 4 // 2
+    _edges(burst, [15, 16, 17])
+    assert burst.flush(24).edges == 3
+    assert burst.active
+    _edges(burst, [25, 26], status=0)
+    summary = burst.flush(34)
+    assert (summary.edges, summary.status) == (2, 0)
+    assert not burst.active
+    assert _edges(burst, [35]) == [RECORD]
+
+def test_force_flush():
+    """ Shutdown, the pending summary is returned before the interval is over """
+    burst = EdgeBurst(2, 60)
+    _edges(burst, [0, 1, 2, 3])
+    assert burst.flush(4) is None
+    assert burst.flush(4, force=True).edges == 2
+    assert not burst.active
+    assert burst.flush(5, force=True) is None
+
+def test_events_file(conf, monkeypatch):
+    """ Edges then one summary row, read back as the final status """
+    conf.update(burst_edges=2, burst_interval=60)
+    module = IonoW1(conf)
+    monkeypatch.setattr(module, '_start_alarm', lambda code: None)
+    try:
+        din = module.digital_inputs[0]
+        burst = module.bursts[din['id']]
+        for level in (1, 0, 1, 0, 1):
+            din['last_edge'] = time.monotonic()
+            din['status_ev'] = level
+            module.parse_event(din)
+        assert burst.active
+        module.store_bursts(force=True)
+    finally:
+        module.cleanup()
+
+    file_name, = glob.glob(os.path.join(conf['data_path'], '*_events_*.dat'))
+    with open(file_name) as file:
+        rows = [line.rstrip('\n').split('\t') for line in file]
+    # two edge rows, the summary of three edges
+    assert [row[2] for row in rows] == ['1', '0', '1']
+    assert rows[-1][4] == '3'
+    events = reader.read_events(file_name)
+    assert list(events[din['id']]['status']) == [1, 0, 1]
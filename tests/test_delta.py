@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+""" Change only data files, DeltaFilter and the dense read back """
+import glob
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import reader
+from delta import DeltaFilter
+from iono_w1 import IonoW1
+
+def _delta_module(conf, deadband):
+    """ IonoW1 writing change only files, analog inputs and outputs """
+    conf.update(use_ai=True, data_delta=True, delta_keyframe=600, polling_time=60,
+                delta_deadband_ai=deadband, use_pc=False)
+    return IonoW1(conf)
+
+def _tick(module, date_time, value, read=None):
+    """ Polling with the first analog input at value, rows selected by the filter """
+    module.analog_inputs[0]['value'] = value
+    sample = module.take_sample(date_time, read=read)
+    return module.delta.select(module, sample, int(date_time.timestamp()), 'file')
+
+def test_keyframe_and_deadband(conf):
+    """ Keyframe first, then rows for changes past the deadband only """
+    module = _delta_module(conf, 0.5)
+    try:
+        ain = ('analog', module.analog_inputs[0]['id'])
+        start = datetime(2026, 10, 19, 10, 0, 0)
+        assert _tick(module, start, 10.0) is None
+        assert _tick(module, start + timedelta(minutes=1), 10.4) == set()
+        # compared with the value last written, 10.0
+        assert _tick(module, start + timedelta(minutes=2), 10.6) == {ain}
+        assert _tick(module, start + timedelta(minutes=3), None) == {ain}
+        assert _tick(module, start + timedelta(minutes=4), None) == set()
+        assert _tick(module, start + timedelta(minutes=5), 10.6) == {ain}
+        # every channel again after delta_keyframe
+        assert _tick(module, start + timedelta(minutes=10), 10.6) is None
+    finally:
+        module.cleanup()
+
+def test_new_file_keyframe():
+    """ The first polling of a file is a keyframe """
+    delta = DeltaFilter(3600, {})
+    assert delta.keyframe_at is None
+    delta.keyframe_at, delta.file_name = 0, 'day1'
+
+    class Module: # pylint: disable=too-few-public-methods
+        """ No section enabled """
+        conf = {key: False for key in ('use_ai', 'use_io', 'use_pc', 'use_1w', 'use_ro', 'use_oc')}
+
+    assert delta.select(Module, None, 60, 'day1') == set()
+    assert delta.select(Module, None, 120, 'day2') is None
+
+def test_not_read_channels_compared_later(conf):
+    """ A channel not acquired with a sample is compared when it is """
+    module = _delta_module(conf, 0.0)
+    try:
+        ain = ('analog', module.analog_inputs[0]['id'])
+        start = datetime(2026, 10, 19, 10, 0, 0)
+        assert _tick(module, start, 1.0) is None
+        assert _tick(module, start + timedelta(minutes=1), 2.0, read=frozenset()) == set()
+        assert _tick(module, start + timedelta(minutes=2), 2.0, read=frozenset([ain])) == {ain}
+    finally:
+        module.cleanup()
+
+def test_dense_read_back(conf):
+    """ A change only file reads back like the full one (no deadband) """
+    module = _delta_module(conf, 0.0)
+    full = {}
+    try:
+        start = datetime(2026, 10, 19, 10, 0, 0)
+        for minute in range(30):
+            module.analog_inputs[0]['value'] = 10.0 + minute // 7
+            module.analog_inputs[1]['value'] = 5.0
+            sample = module.take_sample(start + timedelta(minutes=minute))
+            module.store_data_csv([sample])
+            full[minute] = sample.analog
+    finally:
+        module.cleanup()
+
+    file_name, = glob.glob(os.path.join(conf['data_path'], '*_2026-10-19.dat'))
+    keyframes = []
+    rows = sum(len(cols['time']) for batch in reader.iter_data(file_name, keyframes=keyframes) for cols in batch.values())
+    assert len(keyframes) == 3
+    assert rows < 60
+
+    # up to the last row, minute 28 (the last change, no keyframe after it)
+    data = reader.read_data(file_name, dense=True)
+    for idx, ain in enumerate(module.analog_inputs):
+        cols = data[('analog', ain['id'])]
+        assert len(cols['time']) == 29
+        assert np.array_equal(cols['value'], [full[minute][idx] for minute in range(29)])
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+""" gpio character device backend, through bench_stubs.FakeGpioChip """
+import os
+import time
+
+import pytest
+
+import gpiocdev
+from bench_stubs import FakeGpioChip
+from iono import Iono
+from iono_w1 import IonoW1
+from conftest import wait_for
+
+def test_struct_sizes():
+    """ Same layout as linux/gpio.h """
+    assert gpiocdev.LINE_REQUEST.size == 592
+    assert gpiocdev.LINE_EVENT.size == 48
+    assert gpiocdev.LINE_VALUES.size == 16
+    assert gpiocdev.GPIO_V2_GET_LINE_IOCTL == 0xC250B407
+    assert gpiocdev.GPIO_V2_LINE_GET_VALUES_IOCTL == 0xC010B40E
+
+def test_line_request_round_trip():
+    """ Request packed by GpioChipInputs, fd written back by the kernel """
+    chip = FakeGpioChip()
+    inputs = gpiocdev.GpioChipInputs(os.devnull, [16, 19, 13], ioctl=chip.ioctl)
+    try:
+        assert chip.offsets == [16, 19, 13]
+        assert inputs.fd == chip.read_fd
+        fields = gpiocdev.LINE_REQUEST.unpack(gpiocdev.LINE_REQUEST.pack(
+            *range(64), b'pydas', *([0] * 47), 3, 64, *([0] * 5), 7))
+        assert fields[:64] == tuple(range(64))
+        assert fields[64].rstrip(b'\0') == b'pydas'
+        assert fields[-8:] == (3, 64, 0, 0, 0, 0, 0, 7)
+    finally:
+        inputs.close()
+
+def test_values_and_events():
+    """ Line values bits and kernel events back to levels """
+    chip = FakeGpioChip()
+    inputs = gpiocdev.GpioChipInputs(os.devnull, [16, 19, 13], ioctl=chip.ioctl)
+    try:
+        chip.levels = {19: 1}
+        assert inputs.get_values() == {16: 0, 19: 1, 13: 0}
+
+        chip.fire([(16, 1, 100.25), (13, 1, 100.5), (16, 0, 101.0)])
+        assert inputs.read_events() == [(16, 1, 100.25), (13, 1, 100.5), (16, 0, 101.0)]
+    finally:
+        inputs.close()
+
+def test_parse_events_skips_other_lines():
+    """ Events of lines not requested are ignored """
+    data = gpiocdev.LINE_EVENT.pack(2000000000, gpiocdev.GPIO_V2_LINE_EVENT_FALLING_EDGE, 5, 1, 1)
+    data += gpiocdev.LINE_EVENT.pack(3000000000, gpiocdev.GPIO_V2_LINE_EVENT_RISING_EDGE, 16, 2, 1)
+    assert gpiocdev.parse_events(data, [16]) == [(16, 1, 3.0)]
+
+@pytest.fixture
+def chip_module(conf, monkeypatch):
+    """ IonoW1 with digital inputs on a fake gpiochip """
+    chip = FakeGpioChip()
+    monkeypatch.setattr(Iono, 'gpiochip_ioctl', chip.ioctl)
+    conf.update(di_backend='gpiochip', gpiochip_path=os.devnull, use_pc=True, debounce_time=500)
+    module = IonoW1(conf)
+    yield module, chip
+    module.cleanup()
+
+def test_edges(chip_module):
+    """ Both edges counted, on time from the kernel timestamps """
+    module, chip = chip_module
+    din = module.digital_inputs[0]
+    start = time.monotonic()
+
+    chip.fire([(din['gpio'], 1, start)])
+    assert wait_for(lambda: din['status_ev'] == 1)
+    chip.fire([(din['gpio'], 0, start + 1.0)])
+    assert wait_for(lambda: din['status_ev'] == 0)
+
+    report = module.pulse_counters[din['id']].report(start + 2.0)
+    assert (report['rise'], report['fall']) == (1, 1)
+    assert report['on_time'] == pytest.approx(1.0)
+    assert module.snapshot.digital[0] == (0, 0)
+
+def test_bounces_skipped(chip_module):
+    """ Edges within the hold time are bounces, the level is read again when it ends """
+    module, chip = chip_module
+    din = module.digital_inputs[0]
+    start = time.monotonic()
+
+    chip.fire([(din['gpio'], 1, start), (din['gpio'], 0, start + 0.01), (din['gpio'], 1, start + 0.02)])
+    # hold time is 0.5 s
+    time.sleep(0.8)
+    assert not module.settling
+    report = module.pulse_counters[din['id']].report()
+    assert (report['rise'], report['fall']) == (1, 0)
+    assert din['status_ev'] == 1
+
+def test_short_pulse(chip_module):
+    """ A pulse shorter than the hold time is not lost """
+    module, chip = chip_module
+    din = module.digital_inputs[0]
+    start = time.monotonic()
+
+    chip.fire([(din['gpio'], 1, start), (din['gpio'], 0, start + 0.2)])
+    assert wait_for(lambda: module.pulse_counters[din['id']].fall == 1)
+    assert din['status_ev'] == 0
+    report = module.pulse_counters[din['id']].report(start + 1.0)
+    assert (report['rise'], report['fall']) == (1, 1)
+    assert report['on_time'] == pytest.approx(0.2)
+
+def test_reverse_override(conf, monkeypatch):
+    """ A reversed input starts from the reversed level """
+    chip = FakeGpioChip()
+    monkeypatch.setattr(Iono, 'gpiochip_ioctl', chip.ioctl)
+    conf.update(di_backend='gpiochip', gpiochip_path=os.devnull, use_pc=True, dr1=1)
+    module = IonoW1(conf)
+    try:
+        din = module.digital_inputs[0]
+        assert din['status_ev'] == 1
+        assert module.pulse_counters[din['id']].level == 1
+
+        chip.fire([(din['gpio'], 1, time.monotonic())])
+        assert wait_for(lambda: din['status_ev'] == 0)
+        assert module.pulse_counters[din['id']].report()['fall'] == 1
+    finally:
+        module.cleanup()
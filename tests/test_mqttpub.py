@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+""" Mqtt store and forward, through bench_stubs.FakeMqttLink """
+import os
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+import mqttpub
+from mqttpub import MqttPublisher, Spool
+from bench_stubs import FakeMqttLink
+from conftest import wait_for
+
+@pytest.fixture
+def mqtt_conf(tmp_path):
+    """ Publisher configuration """
+    return {'mqtt_topic': 'pydas', 'file_header': 'test', 'mqtt_batch': 20,
+            'mqtt_spool_size': 1024, 'data_path': str(tmp_path)}
+
+def _edges(publisher, first, last):
+    """ One edge message per number, status_ev carries it """
+    for number in range(first, last + 1):
+        publisher.on_edge({'id': 1, 'status_ev': number, 'name': 'DI 1'}, datetime.now())
+
+def _numbers(publisher, link):
+    """ Edge numbers published, batches unpacked, in order """
+    edge = publisher._topic('edge', 1) # pylint: disable=protected-access
+    messages = publisher._unpack(link.published) # pylint: disable=protected-access
+    return [json.loads(payload)['status_ev'] for topic, payload, _ in messages if topic == edge]
+
+def _spooled(publisher):
+    """ Messages waiting in the spool """
+    spool = publisher.spool
+    count = 0
+    for name in spool._segments(): # pylint: disable=protected-access
+        with open(os.path.join(spool.path, name)) as file:
+            count += sum(1 for _ in file)
+    return count
+
+def test_offline_spooling(mqtt_conf):
+    """ Broker unreachable, messages go to disk """
+    link = FakeMqttLink(online=False)
+    publisher = MqttPublisher(mqtt_conf, link=link)
+    publisher.start()
+    try:
+        _edges(publisher, 1, 5)
+        assert wait_for(lambda: _spooled(publisher) == 5)
+        assert not link.published
+    finally:
+        publisher.stop()
+
+def test_replay_in_order(mqtt_conf):
+    """ Spooled messages first, then the new ones, packed in batches """
+    mqtt_conf['mqtt_batch'] = 2
+    link = FakeMqttLink(online=False)
+    publisher = MqttPublisher(mqtt_conf, link=link)
+    publisher.start()
+    try:
+        _edges(publisher, 1, 5)
+        assert wait_for(lambda: _spooled(publisher) == 5)
+
+        link.online = True
+        _edges(publisher, 6, 8)
+        assert wait_for(lambda: len(_numbers(publisher, link)) == 8, timeout=5)
+        assert _numbers(publisher, link) == list(range(1, 9))
+        assert link.published[0] == (publisher._topic('status'), 'online', True) # pylint: disable=protected-access
+        assert _spooled(publisher) == 0
+    finally:
+        publisher.stop()
+
+def test_ack_timeout(mqtt_conf):
+    """ Messages not acknowledged stay spooled and are sent again, in order """
+    link = FakeMqttLink(online=False)
+    publisher = MqttPublisher(mqtt_conf, link=link)
+    publisher.start()
+    try:
+        _edges(publisher, 1, 6)
+        assert wait_for(lambda: _spooled(publisher) == 6)
+
+        # status message and two edges, then the ack waits time out
+        link.acks = 3
+        link.online = True
+        assert wait_for(lambda: _numbers(publisher, link) == [1, 2])
+        assert wait_for(lambda: _spooled(publisher) == 4)
+
+        link.acks = None
+        _edges(publisher, 7, 7)
+        assert wait_for(lambda: len(_numbers(publisher, link)) == 7, timeout=5)
+        assert _numbers(publisher, link) == list(range(1, 8))
+    finally:
+        publisher.stop()
+
+class _SlowLink(FakeMqttLink):
+    """ Link whose publish waits for gate, a sender lagging behind """
+
+    def __init__(self):
+        """ Constructor """
+        super().__init__()
+        self.gate = threading.Event()
+
+    def publish(self, topic, payload, retain=False):
+        """ Publish once the gate opens """
+        self.gate.wait(5)
+        return super().publish(topic, payload, retain)
+
+def test_queue_full_order(mqtt_conf):
+    """ Queue overflow spools the queued ones before the new ones, the order is kept """
+    link = _SlowLink()
+    publisher = MqttPublisher(mqtt_conf, link=link, queue_size=3)
+    publisher.start()
+    try:
+        # the sender holds the first edge, the queue overflows
+        _edges(publisher, 1, 1)
+        assert wait_for(lambda: publisher.queue.empty())
+        _edges(publisher, 2, 10)
+        assert _spooled(publisher) > 0
+
+        link.gate.set()
+        _edges(publisher, 11, 12)
+        assert wait_for(lambda: len(_numbers(publisher, link)) == 12, timeout=5)
+        assert _numbers(publisher, link) == list(range(1, 13))
+    finally:
+        link.gate.set()
+        publisher.stop()
+
+def test_spool_trimming(tmp_path, monkeypatch):
+    """ Past max_bytes the oldest segments are dropped, the newest kept """
+    monkeypatch.setattr(mqttpub, 'SEGMENT_SIZE', 200)
+    spool = Spool(str(tmp_path / 'spool'), 1000)
+    for number in range(100):
+        spool.append([('pydas/test/edge/1', json.dumps({'status_ev': number}), False)])
+
+    segments = spool._segments() # pylint: disable=protected-access
+    total = sum(os.path.getsize(os.path.join(spool.path, name)) for name in segments)
+    assert len(segments) > 1
+    assert total <= 1000
+
+    # oldest first, the last message always kept
+    numbers = []
+    while True:
+        segment = spool.oldest()
+        if segment is None:
+            break
+        name, messages = segment
+        numbers.extend(json.loads(payload)['status_ev'] for _, payload, _ in messages)
+        spool.done(name)
+    assert numbers == sorted(numbers)
+    assert numbers[0] > 0
+    assert numbers[-1] == 99
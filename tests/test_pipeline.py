@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+""" Polling pipeline stages """
+import time
+import threading
+from datetime import datetime
+
+import pipeline
+from iono_w1 import IonoW1, Sample
+from pipeline import Stage
+
+def _sample(store=False, acquired=None, number=0):
+    """ Sample with the fields the stages look at, number in seq """
+    values = dict.fromkeys(Sample._fields)
+    values.update(seq=number, date_time=datetime.now(), monotonic=0.0, store=store,
+                  acquired=time.monotonic() if acquired is None else acquired)
+    return Sample(**values)
+
+def test_max_latency():
+    """ Latency from the acquisition of the sample, not from the last digital inputs polling """
+    stage = Stage('slow', lambda sample: time.sleep(0.2))
+    stage.start()
+    stage.put(_sample())
+    stage.stop(2)
+    assert 0.2 <= stage.stats()['max_latency'] < 1.0
+
+def test_acquired_without_digital_inputs(conf):
+    """ Every sample is stamped when taken, use_io off too """
+    conf['use_io'] = False
+    module = IonoW1(conf)
+    try:
+        first = module.take_sample()
+        time.sleep(0.05)
+        second = module.take_sample()
+        assert second.monotonic == first.monotonic
+        assert second.acquired - first.acquired >= 0.05
+    finally:
+        module.cleanup()
+
+class _Blocked:
+    """ Stage function held on a gate, the samples it got """
+
+    def __init__(self):
+        """ Constructor """
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.samples = []
+
+    def __call__(self, sample):
+        """ Process a sample once the gate opens """
+        self.started.set()
+        self.gate.wait(5)
+        self.samples.append(sample)
+
+def test_full_stage_keeps_store_boundaries():
+    """ A full stage drops the oldest plain samples, never a store boundary """
+    func = _Blocked()
+    stage = Stage('blocked', func, maxsize=3)
+    stage.start()
+    try:
+        # held by the consumer
+        stage.put(_sample(number=0))
+        assert func.started.wait(2)
+
+        for number, store in ((1, True), (2, False), (3, False), (4, True), (5, False), (6, True)):
+            stage.put(_sample(store=store, number=number))
+        # full of store boundaries, a plain sample is the one dropped
+        stage.put(_sample(number=7))
+        assert stage.dropped == 4
+
+        # a store boundary waits for room
+        threading.Timer(0.2, func.gate.set).start()
+        stage.put(_sample(store=True, number=8))
+    finally:
+        func.gate.set()
+        stage.stop(2)
+
+    assert [sample.seq for sample in func.samples] == [0, 1, 4, 6, 8]
+    assert stage.stats()['dropped'] == 4
+
+def test_stuck_stage_store_boundary(monkeypatch):
+    """ Still full after BOUNDARY_WAIT, the store boundary is dropped and counted """
+    monkeypatch.setattr(pipeline, 'BOUNDARY_WAIT', 0.1)
+    func = _Blocked()
+    stage = Stage('stuck', func, maxsize=1)
+    stage.start()
+    try:
+        stage.put(_sample(number=0))
+        assert func.started.wait(2)
+        stage.put(_sample(store=True, number=1))
+        stage.put(_sample(store=True, number=2))
+        assert stage.dropped == 1
+    finally:
+        func.gate.set()
+        stage.stop(2)
+
+    assert [sample.seq for sample in func.samples] == [0, 1]
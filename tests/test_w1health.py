@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+""" 1-Wire sensor health and circuit breaker """
+import math
+import os
+import shutil
+
+import pytest
+
+import bench_stubs
+from iono import Iono
+from iono_w1 import IonoW1
+from w1health import SensorHealth
+from conftest import wait_for
+
+CONF = {'w1_fail_threshold': 3, 'w1_retry': 10, 'w1_retry_max': 30}
+
+def test_breaker_opens_at_threshold():
+    """ Failing below the threshold, skipped from it on """
+    health = SensorHealth('WI 1')
+    health.failure(0, 'crc error', CONF)
+    health.failure(1, 'crc error', CONF)
+    assert health.state == 'failing'
+    assert health.allow(2)
+
+    health.failure(2, 'crc error', CONF)
+    assert health.state == 'skipped'
+    assert not health.allow(11)
+    assert health.allow(12)
+
+def test_backoff_doubles_up_to_max():
+    """ Every failed retry doubles the wait, w1_retry_max at most """
+    health = SensorHealth('WI 1')
+    for now in range(3):
+        health.failure(now, 'device missing', CONF)
+    retries = []
+    now = 2
+    for _ in range(4):
+        now = health.retry_at
+        health.failure(now, 'device missing', CONF)
+        retries.append(health.retry)
+    assert retries == [20, 30, 30, 30]
+    assert health.report(now)['retry_in_s'] == 30
+
+def test_success_closes():
+    """ A good read closes the breaker, retry_now reads at once """
+    health = SensorHealth('WI 1')
+    for now in range(3):
+        health.failure(now, 'device missing', CONF)
+    assert not health.allow(5)
+    health.retry_now()
+    assert health.allow(5)
+
+    health.success(5)
+    report = health.report(6)
+    assert (report['state'], report['failures'], report['errors'], report['reads']) == ('ok', 0, 3, 4)
+    assert report['last_ok_s'] == 1
+    assert report['retry_in_s'] is None
+
+@pytest.fixture
+def w1_module(conf, tmp_path, monkeypatch):
+    """ IonoW1 on a fake 1-Wire tree, bus rescanned every second """
+    saved = [dict(owi) for owi in Iono.one_wire_inputs]
+    monkeypatch.setattr(Iono, 'one_wire_base_dir', bench_stubs.w1_tree(base_dir=str(tmp_path / 'w1')))
+    conf.update(use_1w=True, w1_rescan=1, **CONF)
+    module = IonoW1(conf)
+    yield module
+    module.cleanup()
+    for owi, default in zip(Iono.one_wire_inputs, saved):
+        owi.clear()
+        owi.update(default)
+
+def test_missing_device_skipped_and_back(w1_module):
+    """ Reads skipped once the breaker opens, back when the rescan finds the device """
+    module = w1_module
+    owi = module.one_wire_inputs[0]
+    assert module._read_one_wire(owi) == 23.125 # pylint: disable=protected-access
+
+    folder = os.path.join(module.one_wire_base_dir, owi['code'])
+    shutil.move(folder, folder + '.away')
+    for _ in range(5):
+        assert math.isnan(module._read_one_wire(owi)) # pylint: disable=protected-access
+    report = module.one_wire_report()[owi['id']]
+    # two reads skipped, no sysfs access
+    assert (report['state'], report['reads'], report['last_error']) == ('skipped', 4, 'device missing')
+
+    shutil.move(folder + '.away', folder)
+    assert wait_for(lambda: module.one_wire_health[owi['id']].allow(0), timeout=3)
+    assert module._read_one_wire(owi) == 23.125 # pylint: disable=protected-access
+    assert module.one_wire_report()[owi['id']]['state'] == 'ok'
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+# pylint: disable=line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : 1-Wire sensor health and circuit breaker
+#  File : w1health.py
+# ----------------------------------------------------------------------
+""" 1-Wire sensor health
+
+    One SensorHealth per 1-Wire input. After 'w1_fail_threshold' failed
+    reads in a row (device missing, crc error, read error) the sensor is
+    skipped - no sysfs access, nan at once - and read again after
+    'w1_retry' seconds, doubled at every failed retry up to 'w1_retry_max'.
+    A good read closes the breaker. The background rescan of
+    one_wire_base_dir (Iono) asks for a retry at once when the device is
+    back, or a new probe took its place.
+
+    Logging: one warning when a sensor is skipped, one info when it is back,
+    the failed reads in between at debug level.
+
+      state      'ok', 'failing' (below threshold), 'skipped' (breaker open)
+"""
+import sys
+import time
+import logging
+import threading
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+class SensorHealth:
+    """ Read statistics and breaker of one sensor """
+
+    def __init__(self, name):
+        """ Constructor """
+        self.name = name
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.errors = 0
+        self.failures = 0      # in a row
+        self.last_error = None
+        self.last_ok = None    # time.monotonic() of the last good read
+        self.retry = 0         # seconds of the current backoff, 0 breaker closed
+        self.retry_at = None   # time.monotonic() of the next read while open
+
+    @property
+    def state(self):
+        """ 'ok', 'failing' or 'skipped' """
+        if self.retry:
+            return 'skipped'
+        return 'failing' if self.failures else 'ok'
+
+    def allow(self, now):
+        """ Read the sensor now """
+        with self.lock:
+            return not self.retry or now >= self.retry_at
+
+    def retry_now(self):
+        """ Device back (rescan), read at the next polling """
+        with self.lock:
+            if self.retry:
+                self.retry_at = 0.0
+
+    def success(self, now):
+        """ Good read """
+        with self.lock:
+            self.reads += 1
+            if self.retry:
+                logging.info("1-Wire %s back after %s failed reads", self.name, self.failures)
+            self.failures = 0
+            self.retry = 0
+            self.retry_at = None
+            self.last_ok = now
+
+    def failure(self, now, error, conf):
+        """ Failed read, error text """
+        with self.lock:
+            self.reads += 1
+            self.errors += 1
+            self.failures += 1
+            self.last_error = error
+            if self.retry:
+                # retry failed, back off
+                self.retry = min(self.retry * 2, conf['w1_retry_max'])
+                logging.debug("1-Wire %s still failing (%s), next read in %s s", self.name, error, self.retry)
+            elif self.failures >= conf['w1_fail_threshold']:
+                self.retry = conf['w1_retry']
+                logging.warning("1-Wire %s failed %s times (%s), skipped - next read in %s s", self.name, self.failures, error, self.retry)
+            else:
+                logging.debug("1-Wire %s read failed (%s)", self.name, error)
+                return
+            self.retry_at = now + self.retry
+
+    def report(self, now=None):
+        """ Health figures """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            return {
+                'state': self.state,
+                'reads': self.reads,
+                'errors': self.errors,
+                'failures': self.failures,
+                'last_error': self.last_error,
+                'last_ok_s': None if self.last_ok is None else round(now - self.last_ok, 1),
+                'retry_in_s': None if not self.retry else max(0.0, round(self.retry_at - now, 1)),
+            }
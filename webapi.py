@@ -0,0 +1,265 @@
+#!/usr/bin/python3
+# pylint: disable=broad-except, line-too-long
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+#  Copyright (c) 2026, Ecometer s.n.c.
+#
+#  Desc : Live data http api
+#  File : webapi.py
+# ----------------------------------------------------------------------
+""" Live data http api
+
+    Served from memory, nothing is read from the sd card
+
+    GET /api/latest           -> last polling snapshot (json)
+    GET /api/history?n=NN     -> last NN polling snapshots (json array)
+    GET /api/events           -> server sent events stream (edge | alarm)
+
+    The LiveData object is registered as an IonoW1 listener and receives
+    on_poll(module), on_edge(din, now) and on_alarm(alarm_cur, alarm_old)
+"""
+import sys
+import json
+import math
+import queue
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+if __name__ == '__main__':
+    sys.exit(1)
+
+def _clean(value):
+    """ Json does not know about nan """
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+class LiveData:
+    """ In memory live data store """
+
+    def __init__(self, history_size=120, queue_size=256):
+        """ Constructor """
+        logging.debug("Function LiveData __init__")
+
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.latest = b'{}'                             # last snapshot, already encoded
+        self.history = deque(maxlen=history_size)       # last snapshots, already encoded
+        self.queue_size = queue_size
+        self.subscribers = set()                        # one queue per sse client
+
+    def _build_snapshot(self, module):
+        """ Build a snapshot from the module published state """
+        conf = module.conf
+        # one consistent view, whatever the other threads do meanwhile
+        sample = module.snapshot
+        snap = {
+            'seq': self.seq,
+            'sample': sample.seq,
+            'time': sample.date_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'alarm': sample.alarm,
+        }
+        if conf['use_ai']:
+            snap['analog_inputs'] = [
+                {'id': ain['id'], 'name': ain['name'], 'value': _clean(value)}
+                for ain, value in zip(module.analog_inputs, sample.analog)]
+        if conf['use_io']:
+            snap['digital_inputs'] = [
+                {'id': din['id'], 'name': din['name'], 'status': status, 'status_ev': status_ev}
+                for din, (status, status_ev) in zip(module.digital_inputs, sample.digital)]
+        if conf['use_1w']:
+            health = module.one_wire_report()
+            snap['one_wire_inputs'] = [
+                {'id': owi['id'], 'name': owi['name'], 'code': owi['code'], 'value': _clean(value), 'health': health[owi['id']]}
+                for owi, value in zip(module.one_wire_inputs, sample.one_wire)]
+        if conf['use_ro']:
+            snap['relay_outputs'] = [
+                {'id': rel['id'], 'name': rel['name'], 'status': status}
+                for rel, status in zip(module.relay_outputs, sample.relay)]
+        if conf['use_oc']:
+            snap['open_collector_outputs'] = [
+                {'id': opc['id'], 'name': opc['name'], 'status': status}
+                for opc, status in zip(module.open_collector_outputs, sample.open_collector)]
+        return snap
+
+    def _broadcast(self, event, data):
+        """ Push an event to every sse subscriber """
+        # encode once for all clients
+        message = ('event: ' + event + '\ndata: ' + json.dumps(data) + '\n\n').encode('utf-8')
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # slow client, drop it
+                logging.warning("Live data subscriber too slow, dropping it")
+                self.unsubscribe(subscriber)
+                self._close(subscriber)
+
+    @staticmethod
+    def _close(subscriber):
+        """ Wake up a subscriber telling it to quit """
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
+        subscriber.put_nowait(None)
+
+    # listener interface
+
+    def on_poll(self, module):
+        """ New polling available """
+        logging.debug("Function LiveData on_poll")
+        try:
+            with self.lock:
+                self.seq += 1
+                encoded = json.dumps(self._build_snapshot(module)).encode('utf-8')
+                self.latest = encoded
+                self.history.append(encoded)
+
+        except Exception as ex:
+            logging.error("An exception was encountered in LiveData on_poll: %s", str(ex))
+
+    def on_edge(self, din, now):
+        """ New digital input edge """
+        self._broadcast('edge', {
+            'time': now.strftime('%Y-%m-%d %H:%M:%S.%f'),
+            'id': din['id'],
+            'name': din['name'],
+            'status_ev': din['status_ev'],
+        })
+
+    def on_alarm(self, alarm_cur, alarm_old):
+        """ Alarm changed """
+        self._broadcast('alarm', {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'),
+            'alarm': alarm_cur,
+            'alarm_old': alarm_old,
+        })
+
+    # readers
+
+    def get_latest(self):
+        """ Get last encoded snapshot """
+        return self.latest
+
+    def get_history(self, count=None):
+        """ Get last count encoded snapshots as a json array """
+        with self.lock:
+            items = list(self.history)
+        if count is not None:
+            items = items[-count:] if count > 0 else []
+        return b'[' + b','.join(items) + b']'
+
+    def subscribe(self):
+        """ Add a sse subscriber """
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """ Remove a sse subscriber """
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Http request handler """
+
+    # set by LiveDataServer
+    live = None
+    keepalive = 15
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        """ Route http log to logging """
+        logging.debug("Http %s - %s", self.address_string(), format % args)
+
+    def _send_json(self, body):
+        """ Send a json body """
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_events(self):
+        """ Server sent events stream """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+        subscriber = self.live.subscribe()
+        try:
+            # let the client render something straight away
+            self.wfile.write(b'event: snapshot\ndata: ' + self.live.get_latest() + b'\n\n')
+            self.wfile.flush()
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.keepalive)
+                except queue.Empty:
+                    # comment line keeps proxies and browsers happy
+                    message = b': keepalive\n\n'
+                if message is None:
+                    break
+                self.wfile.write(message)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.live.unsubscribe(subscriber)
+
+    def do_GET(self): # pylint: disable=invalid-name
+        """ GET requests """
+        url = urlparse(self.path)
+        try:
+            if url.path == '/api/latest':
+                self._send_json(self.live.get_latest())
+            elif url.path == '/api/history':
+                params = parse_qs(url.query)
+                count = int(params['n'][0]) if 'n' in params else None
+                self._send_json(self.live.get_history(count))
+            elif url.path == '/api/events':
+                self._send_events()
+            else:
+                self.send_error(404)
+        except ValueError:
+            self.send_error(400)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class LiveDataServer:
+    """ Live data http server running on its own thread """
+
+    def __init__(self, live, host='127.0.0.1', port=8081):
+        """ Constructor """
+        logging.debug("Function LiveDataServer __init__")
+
+        handler = type('LiveDataHandler', (_Handler,), {'live': live})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def start(self):
+        """ Start serving """
+        logging.info("Starting live data api on %s:%s", *self.httpd.server_address[:2])
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """ Stop serving """
+        logging.debug("Function LiveDataServer stop")
+        try:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        except Exception as ex:
+            logging.error("An exception was encountered in LiveDataServer stop: %s", str(ex))